@@ -2,5 +2,19 @@
 export DJANGO_SETTINGS_MODULE=yivi_portal.settings.production
 
 python manage.py migrate --noinput
+python manage.py createcachetable
 python manage.py collectstatic --noinput
-uwsgi --http :8000 --wsgi-file /app/yivi_portal/wsgi.py --master --processes 4 --threads 2 --uid nobody --gid nogroup --disable-logging --static-map ${STATIC_URL}=${STATIC_ROOT} --static-map ${MEDIA_URL}=${MEDIA_ROOT}
+# uWSGI serves static and media files from offload threads, without running Python.
+# Logos and logo variants are named after the hash of their contents and may be
+# cached for good, other media (e.g. the registry snapshot) is rewritten in place.
+# With another MEDIA_SERVE_MODE, media requests go to portal_backend.views.media,
+# which sets the same headers and lets a fronting web server send the file.
+CONTENT_ADDRESSED="^${MEDIA_URL}(CACHE/images/)?[0-9a-f]{64}(/[0-9a-f]+)?\.(png|jpe?g|webp)$"
+if [ "${MEDIA_SERVE_MODE:-uwsgi}" = "uwsgi" ]; then
+    set -- --static-map "${MEDIA_URL}=${MEDIA_ROOT}" \
+        --route "${CONTENT_ADDRESSED} addheader:Cache-Control: public, max-age=31536000, immutable" \
+        --route "${CONTENT_ADDRESSED} continue:" \
+        --route "^${MEDIA_URL} addheader:Cache-Control: public, no-cache"
+fi
+uwsgi --http :8000 --wsgi-file /app/yivi_portal/wsgi.py --master --processes 4 --threads 2 --uid nobody --gid nogroup --disable-logging \
+    --static-map ${STATIC_URL}=${STATIC_ROOT} --static-gzip-all --offload-threads 2 "$@"
@@ -2,10 +2,15 @@
 
 export > /etc/env_vars.sh
 cat > /etc/cron.d/cron-schedule <<'EOF'
+* * * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons process_logos >> /var/log/cron.log 2>&1
+* * * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons dispatch_notifications >> /var/log/cron.log 2>&1
+* * * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons send_emails >> /var/log/cron.log 2>&1
 */5 * * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons new_dns >> /var/log/cron.log 2>&1
 0 1 * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons existing_dns >> /var/log/cron.log 2>&1
 0 */12 * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons trusted_aps >> /var/log/cron.log 2>&1
 0 */12 * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons trusted_rps >> /var/log/cron.log 2>&1
+30 3 * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons sweep_logos >> /var/log/cron.log 2>&1
+15 * * * * root . /etc/env_vars.sh && /usr/local/bin/python /app/manage.py run_crons sweep_idempotency_keys >> /var/log/cron.log 2>&1
 EOF
 chmod 0644 /etc/cron.d/cron-schedule
 crontab /etc/cron.d/cron-schedule
@@ -1,4 +1,5 @@
 #!/bin/sh
 
 python manage.py migrate --noinput
+python manage.py createcachetable
 poetry run python manage.py runserver 0.0.0.0:8000 --insecure
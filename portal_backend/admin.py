@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from portal_backend.models.models import (
     Organization,
+    PendingLogo,
+    QueuedEmail,
     TrustModel,
     YiviTrustModelEnv,
     RelyingPartyHostname,
@@ -10,6 +13,7 @@ from portal_backend.models.models import (
     CredentialAttribute,
     CondisconAttribute,
     RelyingParty,
+    SlackNotification,
     User,
 )
 
@@ -37,10 +41,78 @@ class CredentialAttributeAdmin(admin.ModelAdmin):
 class OrganizationAdmin(admin.ModelAdmin):
     list_display = ("name_en", "created_at", "last_updated_at")
     search_fields = ("name_en", "name_nl")
-    list_filter = ("created_at", "last_updated_at")
+    list_filter = ("is_demo", "created_at", "last_updated_at")
     prepopulated_fields = {"slug": ("name_en",)}
     readonly_fields = ("created_at", "last_updated_at")
 
+    def delete_queryset(self, request, queryset):
+        queryset.delete_cascading()
+
+
+@admin.register(PendingLogo)
+class PendingLogoAdmin(admin.ModelAdmin):
+    list_display = ("organization", "filename", "uploaded_at", "attempts")
+    search_fields = ("organization__name_en", "filename")
+    readonly_fields = ("organization", "filename", "uploaded_at", "error")
+    exclude = ("content",)
+    actions = ["retry"]
+
+    @admin.action(description="Retry processing")
+    def retry(self, request, queryset):
+        queryset.update(attempts=0, error="")
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        "subject",
+        "get_recipients",
+        "status",
+        "attempts",
+        "created_at",
+        "sent_at",
+    )
+    list_filter = ("status",)
+    search_fields = ("subject", "recipients")
+    readonly_fields = (
+        "subject",
+        "recipients",
+        "from_email",
+        "status",
+        "attempts",
+        "error",
+        "created_at",
+        "next_attempt_at",
+        "sent_at",
+    )
+    exclude = ("body", "content_subtype")
+    actions = ["retry"]
+
+    @admin.display(description="Recipients")
+    def get_recipients(self, obj):
+        return ", ".join(obj.recipients)
+
+    @admin.action(description="Retry sending")
+    def retry(self, request, queryset):
+        queryset.exclude(status=QueuedEmail.SENT).update(
+            status=QueuedEmail.QUEUED,
+            attempts=0,
+            error="",
+            next_attempt_at=timezone.now(),
+        )
+
+
+@admin.register(SlackNotification)
+class SlackNotificationAdmin(admin.ModelAdmin):
+    list_display = ("text", "kind", "source", "created_at", "attempts")
+    list_filter = ("kind", "source")
+    readonly_fields = ("kind", "source", "subject", "text", "created_at", "error")
+    actions = ["retry"]
+
+    @admin.action(description="Retry sending")
+    def retry(self, request, queryset):
+        queryset.update(attempts=0, error="", next_attempt_at=timezone.now())
+
 
 @admin.register(TrustModel)
 class TrustModelAdmin(admin.ModelAdmin):
@@ -140,6 +212,9 @@ class RelyingPartyAdmin(admin.ModelAdmin):
 
     get_hostnames.short_description = "Hostnames"
 
+    def delete_queryset(self, request, queryset):
+        queryset.delete_cascading()
+
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
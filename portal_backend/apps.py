@@ -7,4 +7,5 @@ class PortalBackendConfig(AppConfig):
 
     def ready(self):
         import portal_backend.notify  # noqa: F401 linter thinks it's unused, but it's needed to register the signals
+        import portal_backend.signals  # noqa: F401
 
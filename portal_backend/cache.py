@@ -0,0 +1,166 @@
+"""
+Shared cache for public registry data.
+
+Entries live in Django's default cache (a database table, so all uWSGI workers and
+containers share them) under keys that embed the versions of the registry
+namespaces they depend on. Saving or deleting anything in a namespace bumps its
+``RegistryVersion`` (see ``portal_backend.signals``), after which the old keys are
+never read again and simply expire.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Iterable, Optional, Sequence
+from django.core.cache import cache
+from portal_backend.models.models import RegistryVersion
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "registry"
+STATS_PREFIX = "registry-stats"
+# Versioned keys don't need to expire for correctness, only to free up space
+DEFAULT_TIMEOUT = 24 * 60 * 60
+
+_missing = object()
+
+KINDS = ("hits", "misses")
+# Names of the cached entities, as passed to get_or_compute()
+CACHE_NAMES = (
+    "trust_models",
+    "trust_model",
+    "environments",
+    "organization",
+    "catalog",
+)
+
+
+class CacheStats:
+    """
+    Hit/miss counters per cache name. Counting happens in process memory and is
+    periodically added to shared counters in the cache, so monitoring sees the
+    totals of all workers without a cache write per request.
+    """
+
+    flush_every = 100
+    flush_interval = 60
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pending: Counter = Counter()
+        self.last_flush = time.monotonic()
+
+    def record(self, name: str, hit: bool) -> None:
+        with self.lock:
+            self.pending[(name, "hits" if hit else "misses")] += 1
+            due = (
+                sum(self.pending.values()) >= self.flush_every
+                or time.monotonic() - self.last_flush >= self.flush_interval
+            )
+        if due:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Flushing cache statistics failed: %s", e)
+
+    def flush(self) -> None:
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+        keys = {
+            f"{STATS_PREFIX}:{name}:{kind}": n for (name, kind), n in pending.items()
+        }
+        # Not atomic across workers, which is acceptable for monitoring counters
+        current = cache.get_many(list(keys))
+        cache.set_many(
+            {key: current.get(key, 0) + n for key, n in keys.items()}, timeout=None
+        )
+
+    def totals(self, names: Optional[Iterable[str]] = None) -> dict:
+        """Returns {name: {"hits": n, "misses": n}} of the shared counters"""
+        self.flush()
+        names = list(names if names is not None else CACHE_NAMES)
+        keys = [f"{STATS_PREFIX}:{name}:{kind}" for name in names for kind in KINDS]
+        values = cache.get_many(keys)
+        return {
+            name: {
+                kind: values.get(f"{STATS_PREFIX}:{name}:{kind}", 0) for kind in KINDS
+            }
+            for name in names
+        }
+
+    def reset(self) -> None:
+        with self.lock:
+            self.pending.clear()
+        cache.delete_many(
+            [f"{STATS_PREFIX}:{name}:{kind}" for name in CACHE_NAMES for kind in KINDS]
+        )
+
+
+stats = CacheStats()
+
+
+def namespace_versions(request, namespaces: Sequence[str]) -> list:
+    """
+    The versions of the namespaces. RegistryConditionalGetMiddleware already loaded
+    them for the views that opted in, so those requests don't query them again.
+    """
+    loaded = {
+        namespace: version
+        for namespace, version, _ in getattr(request, "_registry_versions", ())
+    }
+    if all(namespace in loaded for namespace in namespaces):
+        return [(namespace, loaded[namespace]) for namespace in namespaces]
+    return [
+        (namespace, version)
+        for namespace, version, _ in RegistryVersion.current(namespaces)
+    ]
+
+
+def make_key(name: str, versions: list, key: str) -> str:
+    version = ".".join(f"{namespace}{v}" for namespace, v in versions)
+    # Keys can contain user input (slugs), hashing keeps them valid for any backend
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+    return f"{KEY_PREFIX}:{name}:{version}:{digest}"
+
+
+def get_or_compute(
+    request,
+    name: str,
+    namespaces: Sequence[str],
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int = DEFAULT_TIMEOUT,
+) -> Any:
+    """
+    Returns the cached value for ``key`` or computes and stores it. ``None`` results
+    (e.g. not found) are not cached. A failing cache never fails the request.
+    """
+    cache_key = make_key(name, namespace_versions(request, namespaces), key)
+    try:
+        value = cache.get(cache_key, _missing)
+    except Exception as e:
+        logger.warning("Reading %s from the cache failed: %s", cache_key, e)
+        return compute()
+
+    if value is not _missing:
+        stats.record(name, hit=True)
+        return value
+
+    stats.record(name, hit=False)
+    value = compute()
+    if value is not None:
+        try:
+            cache.set(cache_key, value, timeout)
+        except Exception as e:
+            logger.warning("Writing %s to the cache failed: %s", cache_key, e)
+    return value
+
+
+def invalidate(*namespaces: str) -> None:
+    """Drops all cached entries of the namespaces by bumping their versions"""
+    RegistryVersion.bump(*namespaces)
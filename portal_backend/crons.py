@@ -1,8 +1,12 @@
 from portal_backend.dns_verification import verify_new_dns, verify_existing_dns
-from portal_backend.models.models import RelyingPartyHostname
+from portal_backend.models.models import IdempotencyKey, RelyingPartyHostname
+from portal_backend.notify import dispatch_notifications, notification_source
 from portal_backend.scheme_utils.check_published import check_published_cron
 from portal_backend.scheme_utils.trusted_aps_import import import_aps
 from portal_backend.scheme_utils.trusted_rps_import import import_rps
+from portal_backend.services.mail import send_queued_emails
+from portal_backend.services.logos import process_pending_logos, sweep_logos
+from portal_backend.services.registry import write_registry_snapshot
 
 
 class NewDNSVerification:
@@ -23,14 +27,44 @@ class ExistingDNSVerification:
 
 class TrustedAPsImport:
     def do(self):
-        import_aps()
+        with notification_source("import"):
+            import_aps()
+        write_registry_snapshot()
 
 
 class TrustedRPsImport:
     def do(self):
-        import_rps()
+        with notification_source("import"):
+            import_rps()
+        write_registry_snapshot()
 
 
 class CheckPublishedRelyingParties:
     def do(self):
         check_published_cron()
+        write_registry_snapshot()
+
+
+class LogoProcessing:
+    def do(self):
+        process_pending_logos()
+
+
+class LogoSweep:
+    def do(self):
+        sweep_logos()
+
+
+class IdempotencyKeySweep:
+    def do(self):
+        IdempotencyKey.expired().delete()
+
+
+class NotificationDispatch:
+    def do(self):
+        dispatch_notifications()
+
+
+class EmailSending:
+    def do(self):
+        send_queued_emails()
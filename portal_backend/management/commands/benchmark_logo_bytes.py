@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.request import Request
+from portal_backend.models.models import LOGO_VARIANT_SIZES, Organization
+from portal_backend.models.value_serializers import (
+    organization_values,
+    serialize_organizations,
+)
+from portal_backend.services.organization import filter_organizations
+from portal_backend.views.renderers import FastJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the bytes transferred for a page of the organization list with the "
+        "original logos and with the scaled logo variants"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Organizations on the page"
+        )
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=64,
+            choices=LOGO_VARIANT_SIZES,
+            help="Variant width the page displays (the list shows 32px logos at 2x)",
+        )
+
+    def file_size(self, file) -> int:
+        return file.storage.size(file.name)
+
+    def handle(self, *args, **options):
+        request = Request(RequestFactory().get("/"))
+        rows = list(
+            organization_values(filter_organizations(request))[: options["limit"]]
+        )
+        if not rows:
+            raise CommandError("There are no organizations to list")
+
+        page = serialize_organizations(rows)
+        renderer = FastJSONRenderer()
+        after_json = len(renderer.render({"results": page}))
+        # The page as it was before the variant URLs were added
+        before_json = len(
+            renderer.render(
+                {
+                    "results": [
+                        {
+                            key: value
+                            for key, value in org.items()
+                            if key != "logo_variants"
+                        }
+                        for org in page
+                    ]
+                }
+            )
+        )
+
+        organizations = list(
+            Organization.objects.filter(id__in=[row["id"] for row in rows]).exclude(
+                logo=""
+            )
+        )
+        totals = {"original": 0, "webp": 0, "png": 0}
+        for organization in organizations:
+            # Variants of logos saved before they existed are written on first use
+            organization.generate_logo_variants()
+            totals["original"] += self.file_size(organization.logo)
+            variants = Organization.logo_variant_files(organization.logo)
+            for extension in ("webp", "png"):
+                totals[extension] += self.file_size(
+                    variants[extension][options["size"]]
+                )
+
+        before = before_json + totals["original"]
+        self.stdout.write(
+            f"{len(rows)} organizations, {len(organizations)} with a logo"
+        )
+        self.stdout.write(
+            f"before: {before} bytes ({before_json} JSON, "
+            f"{totals['original']} original logos)"
+        )
+        for extension in ("webp", "png"):
+            after = after_json + totals[extension]
+            self.stdout.write(
+                f"after ({extension}): {after} bytes ({after_json} JSON, "
+                f"{totals[extension]} {options['size']}px logos), "
+                f"{100 * (before - after) / before:.0f}% less"
+            )
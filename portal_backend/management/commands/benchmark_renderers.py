@@ -0,0 +1,65 @@
+import timeit
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from portal_backend.models.model_serializers import (
+    CredentialListSerializer,
+    OrganizationSerializer,
+)
+from portal_backend.models.models import Credential, Organization
+from portal_backend.views.renderers import FastJSONRenderer, PortalJSONEncoder
+
+
+class StdlibJSONRenderer(JSONRenderer):
+    encoder_class = PortalJSONEncoder
+
+
+class Command(BaseCommand):
+    help = "Compare the orjson and stdlib JSON renderers on the list endpoint payloads"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--number", type=int, default=50, help="Renders per measurement"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Measurements, the best is reported"
+        )
+
+    def payloads(self):
+        credentials = (
+            Credential.objects.select_related(
+                "attestation_provider__yivi_tme",
+                "attestation_provider__organization",
+            )
+            .prefetch_related("attributes")
+            .order_by("name_en")
+        )
+        organizations = Organization.objects.prefetch_related("trust_models")
+        return {
+            "credentials": {
+                "credentials": CredentialListSerializer(credentials, many=True).data
+            },
+            "organizations": {
+                "results": OrganizationSerializer(organizations, many=True).data
+            },
+        }
+
+    def measure(self, renderer, data, number, repeat):
+        timer = timeit.Timer(lambda: renderer.render(data))
+        return min(timer.repeat(repeat=repeat, number=number)) / number
+
+    def handle(self, *args, **options):
+        number, repeat = options["number"], options["repeat"]
+        stdlib, fast = StdlibJSONRenderer(), FastJSONRenderer()
+        for name, data in self.payloads().items():
+            output = stdlib.render(data)
+            if fast.render(data) != output:
+                raise CommandError(f"Renderers disagree on the {name} payload")
+
+            stdlib_time = self.measure(stdlib, data, number, repeat)
+            fast_time = self.measure(fast, data, number, repeat)
+            self.stdout.write(
+                f"{name}: {len(output)} bytes, "
+                f"stdlib {stdlib_time * 1000:.3f} ms, "
+                f"orjson {fast_time * 1000:.3f} ms "
+                f"({stdlib_time / fast_time:.1f}x)"
+            )
@@ -0,0 +1,54 @@
+import statistics
+import time
+import requests
+from django.core.management.base import BaseCommand
+from yivi_auth.stub import StubYiviServer
+from yivi_auth.yivi import YiviServer, make_session
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare a new connection per Yivi server call with the pooled session, "
+        "against a local stub Yivi server"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--calls", type=int, default=200, help="Login flows per measurement"
+        )
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=0.0,
+            help="Seconds the stub server takes to answer a call",
+        )
+
+    def measure(self, yivi_server, calls):
+        """Durations of a login flow: start a session, poll its status, get the result"""
+        durations = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            session = yivi_server.start_session({"disclose": []})
+            yivi_server.session_status(session["token"])
+            yivi_server.session_result(session["token"])
+            durations.append(time.perf_counter() - start)
+        return durations
+
+    def handle(self, *args, **options):
+        calls = options["calls"]
+        clients = {
+            # The requests module opens a new connection for every call, as the
+            # client did before it had a pool
+            "new connection per call": lambda url: YiviServer(url, session=requests),
+            "pooled session": lambda url: YiviServer(url, session=make_session()),
+        }
+        for name, client in clients.items():
+            with StubYiviServer(delay=options["delay"]) as stub:
+                durations = self.measure(client(stub.url), calls)
+                connections = stub.connections
+            durations.sort()
+            self.stdout.write(
+                f"{name}: {calls} flows, {connections} connections, "
+                f"mean {statistics.mean(durations) * 1000:.3f} ms, "
+                f"p95 {durations[int(len(durations) * 0.95)] * 1000:.3f} ms per flow"
+            )
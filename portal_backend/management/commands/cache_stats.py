@@ -0,0 +1,24 @@
+import json
+from django.core.management.base import BaseCommand
+from portal_backend.cache import stats
+
+
+class Command(BaseCommand):
+    help = "Show the hit/miss counters of the registry cache of all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters after showing them"
+        )
+
+    def handle(self, *args, **options):
+        totals = stats.totals()
+        for counters in totals.values():
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_ratio"] = (
+                round(counters["hits"] / lookups, 3) if lookups else None
+            )
+        self.stdout.write(json.dumps(totals, indent=2))
+
+        if options["reset"]:
+            stats.reset()
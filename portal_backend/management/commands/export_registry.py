@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from portal_backend.services.registry import get_snapshot_dir, write_registry_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write the public registry snapshot served as a static file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            help="Directory to write the snapshot to, defaults to REGISTRY_SNAPSHOT_ROOT",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output_dir"] or get_snapshot_dir()
+        if write_registry_snapshot(directory):
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote registry snapshot to {directory}")
+            )
+        else:
+            self.stdout.write("Registry snapshot is up to date")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from portal_backend.models.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored is_rp / is_ap flags of organizations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report organizations with stale flags, without updating them",
+        )
+
+    def handle(self, *args, **options):
+        stale = Organization.objects.with_stale_roles()
+        slugs = list(stale.values_list("slug", flat=True))
+
+        if options["check"]:
+            for slug in slugs:
+                self.stdout.write(f"Stale role flags: {slug}")
+            if slugs:
+                raise CommandError(f"{len(slugs)} organizations have stale role flags")
+            self.stdout.write(
+                self.style.SUCCESS("All organization role flags are up to date")
+            )
+            return
+
+        updated = Organization.objects.all().refresh_roles()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recomputed role flags of {updated} organizations, {len(slugs)} were stale"
+            )
+        )
@@ -1,8 +1,13 @@
 from django.core.management.base import BaseCommand
 from portal_backend.crons import (
     CheckPublishedRelyingParties,
+    EmailSending,
     NewDNSVerification,
     ExistingDNSVerification,
+    IdempotencyKeySweep,
+    LogoProcessing,
+    LogoSweep,
+    NotificationDispatch,
     TrustedAPsImport,
     TrustedRPsImport,
 )
@@ -22,6 +27,11 @@ class Command(BaseCommand):
             "trusted_aps": TrustedAPsImport,
             "trusted_rps": TrustedRPsImport,
             "check_published_rps": CheckPublishedRelyingParties,
+            "process_logos": LogoProcessing,
+            "sweep_logos": LogoSweep,
+            "sweep_idempotency_keys": IdempotencyKeySweep,
+            "dispatch_notifications": NotificationDispatch,
+            "send_emails": EmailSending,
         }
 
         if job_name in jobs:
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from portal_backend.services.logos import DEFAULT_GRACE_PERIOD, sweep_logos
+
+
+class Command(BaseCommand):
+    help = "Delete logo files and logo variants that no organization refers to"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the files that would be deleted",
+        )
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            default=DEFAULT_GRACE_PERIOD,
+            help="Keep files modified less than this many seconds ago",
+        )
+
+    def handle(self, *args, **options):
+        deleted = sweep_logos(options["grace_period"], options["dry_run"])
+        for name in deleted:
+            self.stdout.write(name)
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(deleted)} logo files"))
@@ -0,0 +1,65 @@
+import hashlib
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from portal_backend.models.models import RegistryVersion
+
+
+class RegistryConditionalGetMiddleware:
+    """
+    Conditional GET for the public read endpoints. Views opt in by listing the
+    registry namespaces their response depends on in ``registry_namespaces``.
+
+    The validators are derived from the namespace versions alone (a single query),
+    so ``If-None-Match`` / ``If-Modified-Since`` are answered with a 304 before the
+    view runs any query or serialization. Responses may differ per user (e.g.
+    maintainers also see draft relying parties), so authenticated requests get
+    validators bound to their token and are only cacheable privately.
+    """
+
+    safe_methods = ("GET", "HEAD")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        validators = getattr(request, "_registry_validators", None)
+        if validators is None or response.status_code not in (200, 304):
+            return response
+
+        etag, last_modified = validators
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+        if "HTTP_AUTHORIZATION" in request.META:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ("Authorization",))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, "view_class", None)
+        namespaces = getattr(view_class, "registry_namespaces", None)
+        if not namespaces or request.method not in self.safe_methods:
+            return None
+
+        versions = RegistryVersion.current(namespaces)
+        digest = hashlib.sha256()
+        for namespace, version, _ in versions:
+            digest.update(f"{namespace}:{version};".encode())
+        authorization = request.META.get("HTTP_AUTHORIZATION")
+        if authorization:
+            digest.update(authorization.encode())
+        etag = quote_etag(digest.hexdigest()[:32])
+
+        timestamps = [updated_at for _, _, updated_at in versions if updated_at]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+
+        request._registry_versions = versions
+        request._registry_validators = (etag, last_modified)
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+from django.db.models import Q
+
+TRIGRAM_INDEXES = {
+    "organization_name_en_trgm_idx": "name_en",
+    "organization_name_nl_trgm_idx": "name_nl",
+}
+
+
+def set_is_demo(apps, schema_editor):
+    Organization = apps.get_model("portal_backend", "Organization")
+    Organization.objects.filter(
+        Q(name_en__icontains="demo") | Q(name_nl__icontains="demo")
+    ).update(is_demo=True)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # Trigram indexes only exist on PostgreSQL, other backends keep scanning.
+    # The indexes are built on UPPER() because that is what Django's icontains
+    # and istartswith lookups compare against on PostgreSQL.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON portal_backend_organization "
+            f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index_name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portal_backend", "0031_credentialattribute_optional"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="is_demo",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(set_is_demo, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="organization",
+            index=models.Index(
+                fields=["is_demo", "name_en"], name="organization_demo_name_idx"
+            ),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def set_roles(apps, schema_editor):
+    Organization = apps.get_model("portal_backend", "Organization")
+    RelyingParty = apps.get_model("portal_backend", "RelyingParty")
+    AttestationProvider = apps.get_model("portal_backend", "AttestationProvider")
+    Organization.objects.filter(is_verified=True).update(
+        is_rp=Exists(
+            RelyingParty.objects.filter(organization=OuterRef("pk"), published=True)
+        ),
+        is_ap=Exists(
+            AttestationProvider.objects.filter(
+                organization=OuterRef("pk"), published=True
+            )
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portal_backend", "0032_organization_is_demo_and_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="is_ap",
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="is_rp",
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.RunPython(set_roles, migrations.RunPython.noop),
+    ]
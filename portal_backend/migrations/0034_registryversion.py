@@ -0,0 +1,42 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+NAMESPACES = [
+    "organizations",
+    "relying_parties",
+    "attestation_providers",
+    "credentials",
+    "trust_models",
+]
+
+
+def create_namespaces(apps, schema_editor):
+    RegistryVersion = apps.get_model("portal_backend", "RegistryVersion")
+    RegistryVersion.objects.bulk_create(
+        [RegistryVersion(namespace=namespace, version=1) for namespace in NAMESPACES],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portal_backend", "0033_organization_is_ap_organization_is_rp"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RegistryVersion",
+            fields=[
+                (
+                    "namespace",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                (
+                    "updated_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_namespaces, migrations.RunPython.noop),
+    ]
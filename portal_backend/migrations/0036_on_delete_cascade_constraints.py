@@ -0,0 +1,76 @@
+from django.db import migrations
+
+# Foreign keys whose rows are deleted together with the row they refer to. Django 5.2
+# can't declare this on the field, so a later AlterField of one of these foreign keys
+# recreates its constraint without ON DELETE CASCADE and must repeat this migration.
+CASCADES = [
+    ("PendingLogo", "organization"),
+    ("AttestationProvider", "organization"),
+    ("Credential", "attestation_provider"),
+    ("CredentialAttribute", "credential"),
+    ("CondisconAttribute", "credential_attribute"),
+    ("CondisconAttribute", "condiscon"),
+    ("Condiscon", "relying_party"),
+    ("RelyingPartyHostname", "relying_party"),
+    ("RelyingParty", "organization"),
+]
+M2M_CASCADES = [
+    ("User", "organizations"),
+    ("TrustModel", "organizations"),
+]
+
+
+def cascading_foreign_keys(apps):
+    for model_name, field_name in CASCADES:
+        model = apps.get_model("portal_backend", model_name)
+        yield model, model._meta.get_field(field_name)
+    for model_name, field_name in M2M_CASCADES:
+        model = apps.get_model("portal_backend", model_name)
+        through = model._meta.get_field(field_name).remote_field.through
+        yield through, through._meta.get_field("organization")
+
+
+def set_on_delete(apps, schema_editor, on_delete):
+    # Only PostgreSQL can alter a constraint in place, SQLite (development) keeps
+    # relying on the explicit deletes of delete_cascading()
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    for model, field in cascading_foreign_keys(apps):
+        table = model._meta.db_table
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT con.conname FROM pg_constraint con "
+                "JOIN pg_attribute att "
+                "ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1] "
+                "WHERE con.contype = 'f' AND con.conrelid = %s::regclass "
+                "AND att.attname = %s",
+                [table, field.column],
+            )
+            constraints = [row[0] for row in cursor.fetchall()]
+        for constraint in constraints:
+            schema_editor.execute(
+                f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(constraint)}, "
+                f"ADD CONSTRAINT {quote(constraint)} FOREIGN KEY ({quote(field.column)}) "
+                f"REFERENCES {quote(field.related_model._meta.db_table)} "
+                f"({quote(field.target_field.column)}) {on_delete} "
+                "DEFERRABLE INITIALLY DEFERRED"
+            )
+
+
+def add_on_delete_cascade(apps, schema_editor):
+    set_on_delete(apps, schema_editor, "ON DELETE CASCADE")
+
+
+def remove_on_delete_cascade(apps, schema_editor):
+    set_on_delete(apps, schema_editor, "")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portal_backend", "0035_pendinglogo"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_on_delete_cascade, remove_on_delete_cascade),
+    ]
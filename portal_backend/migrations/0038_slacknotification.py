@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal_backend", "0037_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SlackNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("organization_created", "Organization created"),
+                            ("relying_party_created", "Relying party created"),
+                            ("relying_party_ready", "Relying party ready for review"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("source", models.CharField(blank=True, default="", max_length=50)),
+                ("subject", models.CharField(max_length=255)),
+                ("text", models.TextField()),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+            ],
+        ),
+    ]
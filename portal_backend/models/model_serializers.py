@@ -1,6 +1,9 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import (
     Organization,
+    PendingLogo,
+    logo_placeholder_url,
     TrustModel,
     User,
     YiviTrustModelEnv,
@@ -27,11 +30,32 @@ class YiviTrustModelEnvSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class LogoUploadField(serializers.ImageField):
+    """An image upload that is bounded in bytes and pixels before it is processed"""
+
+    default_error_messages = {
+        "too_large": "The logo may be at most {max_size} bytes.",
+        "too_many_pixels": "The logo may have at most {max_pixels} pixels.",
+    }
+
+    def to_internal_value(self, data):
+        if getattr(data, "size", 0) > settings.LOGO_MAX_UPLOAD_SIZE:
+            self.fail("too_large", max_size=settings.LOGO_MAX_UPLOAD_SIZE)
+        # Pillow only reads the header and verifies the file, it doesn't decode it
+        file = super().to_internal_value(data)
+        width, height = file.image.size
+        if width * height > settings.LOGO_MAX_PIXELS:
+            self.fail("too_many_pixels", max_pixels=settings.LOGO_MAX_PIXELS)
+        return file
+
+
 class OrganizationSerializer(CountryFieldMixin, serializers.ModelSerializer):
     trust_models = TrustModelSerializer(many=True, read_only=True)
     is_RP = serializers.BooleanField(source="is_rp", read_only=True)
     is_AP = serializers.BooleanField(source="is_ap", read_only=True)
-    logo = serializers.ImageField(required=True)
+    logo = LogoUploadField(required=True)
+    logo_variants = serializers.SerializerMethodField()
+    logo_pending = serializers.SerializerMethodField()
 
     # Force required fields when the serializer is used in api calls
     street = serializers.CharField(required=True, allow_blank=False)
@@ -49,6 +73,8 @@ class OrganizationSerializer(CountryFieldMixin, serializers.ModelSerializer):
             "slug",
             "is_verified",
             "logo",
+            "logo_variants",
+            "logo_pending",
             "created_at",
             "last_updated_at",
             "is_RP",
@@ -63,6 +89,33 @@ class OrganizationSerializer(CountryFieldMixin, serializers.ModelSerializer):
         ]
         read_only_fields = ["is_verified"]
 
+    def get_logo_variants(self, obj: Organization) -> dict | None:
+        return Organization.logo_variant_urls(obj.logo)
+
+    def get_logo_pending(self, obj: Organization) -> bool:
+        return hasattr(obj, "pending_logo")
+
+    def to_representation(self, instance: Organization) -> dict:
+        data = super().to_representation(instance)
+        if data["logo"] is None and data["logo_pending"]:
+            data["logo"] = logo_placeholder_url()
+        return data
+
+    # Uploaded logos are processed by the process_logos cron job, not in the request
+    def create(self, validated_data: dict) -> Organization:
+        logo = validated_data.pop("logo", None)
+        organization = super().create(validated_data)
+        if logo:
+            PendingLogo.stage(organization, logo)
+        return organization
+
+    def update(self, instance: Organization, validated_data: dict) -> Organization:
+        logo = validated_data.pop("logo", None)
+        organization = super().update(instance, validated_data)
+        if logo:
+            PendingLogo.stage(organization, logo)
+        return organization
+
 
 class RelyingPartyHostnameSerializer(serializers.ModelSerializer):
     class Meta:
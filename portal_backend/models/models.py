@@ -1,12 +1,18 @@
-from django.db import models
-from django.db.models import Exists, OuterRef
+from datetime import timedelta
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Case, Exists, F, OuterRef, Value, When
 from django.core.validators import URLValidator, RegexValidator, FileExtensionValidator
 from django.core.files.storage import FileSystemStorage
 import uuid
 import os
 import hashlib
-from imagekit.models import ProcessedImageField  # type: ignore
-from django.conf import settings
+from imagekit.cachefiles import ImageCacheFile  # type: ignore
+from imagekit.cachefiles.backends import CacheFileState  # type: ignore
+from imagekit.models import ImageSpecField, ProcessedImageField  # type: ignore
+from imagekit.processors import ResizeToFit  # type: ignore
+from django.templatetags.static import static
 from django.utils import timezone
 from django.utils.text import slugify
 from django_countries.fields import CountryField  # type: ignore
@@ -16,10 +22,31 @@ from model_utils import FieldTracker  # type: ignore
 
 
 class LogoStorage(FileSystemStorage):
-    def get_available_name(self, name, **kwargs):
+    """
+    Content-addressed storage: logos are named after the hash of their contents, so
+    an existing file already has the right contents. Files are never rewritten and
+    may be shared by organizations (e.g. the importer creates organizations with the
+    same logo in several environments), so they are only deleted by the
+    ``sweep_logos`` command, once no organization has referred to them for a while.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
         if self.exists(name):
-            # If the file already exists, delete it, because we want to overwrite it
-            os.remove(os.path.join(settings.MEDIA_ROOT, name))
+            # Restarts the sweep's grace period of a file that was unreferenced
+            os.utime(self.path(name))
+            return name
+        # Write to a temporary name and link it into place, so concurrent saves of
+        # the same logo neither fail nor leave a partially written file behind
+        temporary_name = super()._save(f"{name}.{uuid.uuid4().hex}.tmp", content)
+        try:
+            os.link(self.path(temporary_name), self.path(name))
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(self.path(temporary_name))
         return name
 
     @staticmethod
@@ -37,24 +64,99 @@ class LogoStorage(FileSystemStorage):
         return f"{content_hash}{file_extension}"
 
 
+def delete_rows(*querysets: models.QuerySet) -> tuple[int, dict[str, int]]:
+    """
+    Deletes the rows of each queryset with a single DELETE, in the given order, without
+    loading them or sending delete signals. Returns counts like QuerySet.delete().
+    """
+    counts: dict[str, int] = {}
+    for queryset in querysets:
+        label = queryset.model._meta.label
+        counts[label] = counts.get(label, 0) + queryset._raw_delete(queryset.db)
+    return sum(counts.values()), counts
+
+
 class OrganizationQuerySet(models.QuerySet):
-    def with_role_annotations(self):
+    @staticmethod
+    def computed_roles() -> dict:
+        """
+        Expressions for is_rp / is_ap as derived from the related RPs and APs: a verified
+        organization with at least one published relying party / attestation provider.
+        """
+
+        def has_published(model):
+            return Case(
+                When(
+                    Exists(
+                        model.objects.filter(
+                            organization=OuterRef("pk"), published=True
+                        )
+                    ),
+                    is_verified=True,
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            )
+
+        return {
+            "is_rp": has_published(RelyingParty),
+            "is_ap": has_published(AttestationProvider),
+        }
+
+    def with_stale_roles(self):
+        """Organizations whose stored is_rp / is_ap flags disagree with their RPs and APs"""
         return self.annotate(
-            is_rp=Exists(
-                RelyingParty.objects.filter(
-                    organization=OuterRef("pk"),
-                    published=True,
-                    organization__is_verified=True,
-                )
-            ),
-            is_ap=Exists(
-                AttestationProvider.objects.filter(
-                    organization=OuterRef("pk"),
-                    published=True,
-                    organization__is_verified=True,
-                )
-            ),
-        )
+            **{f"computed_{role}": expr for role, expr in self.computed_roles().items()}
+        ).exclude(is_rp=F("computed_is_rp"), is_ap=F("computed_is_ap"))
+
+    def refresh_roles(self) -> int:
+        """Recomputes the stored is_rp / is_ap flags in a single UPDATE"""
+        updated = self.update(**self.computed_roles())
+        if updated:
+            # update() bypasses the post_save signals that normally bump the version
+            RegistryVersion.bump(RegistryVersion.ORGANIZATIONS)
+        return updated
+
+    def delete_cascading(self) -> tuple[int, dict[str, int]]:
+        """
+        Deletes the organizations and everything that cascades from them with one
+        DELETE per table, instead of loading every related row into Django's
+        collector. Delete signals aren't sent, so the registry versions are bumped
+        here. Logo files are left to the sweep_logos command.
+        """
+        with transaction.atomic(using=self.db):
+            ids = list(self.values_list("pk", flat=True))
+            if not ids:
+                return 0, {}
+
+            _, counts = RelyingParty.objects.filter(
+                organization__in=ids
+            ).delete_cascading(refresh_roles=False)
+            _, more_counts = delete_rows(
+                # Relying parties of other organizations may request their attributes
+                CondisconAttribute.objects.filter(
+                    credential_attribute__credential__attestation_provider__organization__in=ids
+                ),
+                CredentialAttribute.objects.filter(
+                    credential__attestation_provider__organization__in=ids
+                ),
+                Credential.objects.filter(attestation_provider__organization__in=ids),
+                AttestationProvider.objects.filter(organization__in=ids),
+                PendingLogo.objects.filter(organization__in=ids),
+                User.organizations.through.objects.filter(organization__in=ids),
+                TrustModel.organizations.through.objects.filter(organization__in=ids),
+                Organization.objects.filter(pk__in=ids),
+            )
+            for label, count in more_counts.items():
+                counts[label] = counts.get(label, 0) + count
+
+            RegistryVersion.bump(
+                RegistryVersion.ORGANIZATIONS,
+                RegistryVersion.ATTESTATION_PROVIDERS,
+                RegistryVersion.CREDENTIALS,
+            )
+        return sum(counts.values()), counts
 
 
 class ConvertToRGB(object):
@@ -66,6 +168,37 @@ class ConvertToRGB(object):
         return image.convert("RGB")
 
 
+# Scaled logos for lists and cards, by width and file extension
+LOGO_VARIANT_SIZES = (64, 128, 256)
+LOGO_VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 85, "method": 6}),
+    "png": ("PNG", {"optimize": True}),
+}
+
+
+# Static file served as the logo while an upload waits to be processed
+LOGO_PLACEHOLDER = "img/logo-placeholder.svg"
+
+
+def logo_placeholder_url() -> str:
+    return static(LOGO_PLACEHOLDER)
+
+
+def logo_variant(size: int, extension: str) -> ImageSpecField:
+    """
+    A logo scaled to fit size x size pixels. The file is written when the logo is
+    saved and named after the logo's content hash, so it is content-addressed too.
+    """
+    image_format, options = LOGO_VARIANT_FORMATS[extension]
+    return ImageSpecField(
+        source="logo",
+        processors=[ResizeToFit(size, size, upscale=False)],
+        format=image_format,
+        options=options,
+        cachefile_strategy="imagekit.cachefiles.strategies.Optimistic",
+    )
+
+
 class Organization(models.Model):
     objects = OrganizationQuerySet.as_manager()
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -79,6 +212,14 @@ class Organization(models.Model):
     city = models.CharField(max_length=35, null=True, blank=True)
     country = CountryField(null=True, blank=True)
     is_verified = models.BooleanField(default=False)
+    # Demo organizations are hidden from the public organization list. The flag is
+    # derived from the names on save so the list query can filter on an indexed column.
+    is_demo = models.BooleanField(default=False, editable=False)
+    # An organization is an RP / AP when it is verified and has a published relying
+    # party / attestation provider. The flags are stored so lists can filter on them,
+    # and kept up to date by the RP and AP save and delete hooks and by the importers.
+    is_rp = models.BooleanField(default=False, editable=False, db_index=True)
+    is_ap = models.BooleanField(default=False, editable=False, db_index=True)
     logo = ProcessedImageField(
         upload_to=LogoStorage.get_logo_path,
         processors=[ConvertToRGB()],
@@ -87,12 +228,69 @@ class Organization(models.Model):
         blank=True,
         validators=[FileExtensionValidator(allowed_extensions=["png", "jpg", "jpeg"])],
     )
+    logo_64_webp = logo_variant(64, "webp")
+    logo_64_png = logo_variant(64, "png")
+    logo_128_webp = logo_variant(128, "webp")
+    logo_128_png = logo_variant(128, "png")
+    logo_256_webp = logo_variant(256, "webp")
+    logo_256_png = logo_variant(256, "png")
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["is_demo", "name_en"], name="organization_demo_name_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.name_en
 
+    @staticmethod
+    def names_are_demo(name_en: str | None, name_nl: str | None) -> bool:
+        """Whether an organization with these names is a demo organization"""
+        return any("demo" in (name or "").lower() for name in (name_en, name_nl))
+
+    @classmethod
+    def logo_variant_files(cls, logo) -> dict:
+        """The scaled versions of a logo file by extension and width"""
+        return {
+            extension: {
+                size: ImageCacheFile(
+                    getattr(cls, f"logo_{size}_{extension}").get_spec(source=logo)
+                )
+                for size in LOGO_VARIANT_SIZES
+            }
+            for extension in LOGO_VARIANT_FORMATS
+        }
+
+    @classmethod
+    def logo_variant_urls(cls, logo) -> dict | None:
+        """URLs of the scaled logos, e.g. {"webp": {"64": url, ...}, "png": {...}}"""
+        if not logo:
+            return None
+        return {
+            extension: {str(size): file.url for size, file in files.items()}
+            for extension, files in cls.logo_variant_files(logo).items()
+        }
+
+    def generate_logo_variants(self, force: bool = False) -> None:
+        """Writes the scaled logos that don't exist yet, e.g. of logos saved before"""
+        if not self.logo:
+            return
+        for files in self.logo_variant_files(self.logo).values():
+            for file in files.values():
+                file.generate(force=force)
+
+    @classmethod
+    def delete_logo_variants(cls, logo) -> None:
+        for files in cls.logo_variant_files(logo).values():
+            for file in files.values():
+                file.storage.delete(file.name)
+                # The existence of generated files is cached, forget it
+                file.cachefile_backend.set_state(file, CacheFileState.DOES_NOT_EXIST)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._logo = self.logo
@@ -104,12 +302,20 @@ class Organization(models.Model):
         self._city = self.city
         self._country = self.country
 
+    def compute_roles(self) -> tuple[bool, bool]:
+        """Returns (is_rp, is_ap) as derived from the related RPs and APs"""
+        if self._state.adding or not self.is_verified:
+            return False, False
+        return (
+            self.relying_parties.filter(published=True).exists(),
+            self.attestation_providers.filter(published=True).exists(),
+        )
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name_en)
 
-        if self._logo != self.logo and self._logo:
-            self.logo.storage.delete(self._logo.path)
+        self.is_demo = self.names_are_demo(self.name_en, self.name_nl)
 
         # if any of the fields changed is_verified resets to False
         if (
@@ -124,15 +330,53 @@ class Organization(models.Model):
         ):
             self.is_verified = False
 
+        # Recompute rather than trust the in-memory flags, which may have been updated
+        # in the database by an RP or AP save since this instance was loaded
+        self.is_rp, self.is_ap = self.compute_roles()
+
         return super().save(*args, **kwargs)
 
-    # When deleting an organization, delete all associated logos
     def delete(self, *args, **kwargs):
-        if self.logo:
-            storage, path = self.logo.storage, self.logo.path
-            storage.delete(path)
+        deleted = Organization.objects.filter(pk=self.pk).delete_cascading()
+        self.pk = None
+        return deleted
+
 
-        super().delete(*args, **kwargs)
+class PendingLogo(models.Model):
+    """
+    An uploaded logo waiting to be converted and stored by the process_logos cron
+    job, so requests don't spend their time in Pillow. An organization has at most
+    one pending logo; a newer upload replaces it. The organization keeps its current
+    logo (or a placeholder) until the upload is processed.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, related_name="pending_logo"
+    )
+    filename = models.CharField(max_length=255)
+    content = models.BinaryField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    uploaded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.organization} ({self.filename})"
+
+    @classmethod
+    def stage(cls, organization: Organization, upload) -> "PendingLogo":
+        upload.seek(0)
+        pending, _ = cls.objects.update_or_create(
+            organization=organization,
+            defaults={
+                "filename": os.path.basename(upload.name),
+                "content": upload.read(),
+                "attempts": 0,
+                "error": "",
+            },
+        )
+        return pending
 
 
 class TrustModel(models.Model):
@@ -174,18 +418,71 @@ class YiviTrustModelEnv(models.Model):
     def __str__(self):
         return f"{self.trust_model.name} - {self.environment}"
 
+    SCHEME_MANAGERS = {
+        "production": "pbdf",
+        "demo": "irma-demo",
+        "development": "pbdf-staging",
+        "staging": "pbdf-staging",  # Optional: support alias
+    }
+
     @property
     def scheme_manager(self):
-        env_mapping = {
-            "production": "pbdf",
-            "demo": "irma-demo",
-            "development": "pbdf-staging",
-            "staging": "pbdf-staging",  # Optional: support alias
-        }
-        return env_mapping.get(self.environment, "unknown")
+        return self.SCHEME_MANAGERS.get(self.environment, "unknown")
+
+
+class ReviewableMixin:
+    """
+    Review bookkeeping shared by attestation providers and relying parties. Transitions
+    are detected with the model's FieldTracker, so saving doesn't re-read the row.
+    """
+
+    # Fields that are cleared when an entity is no longer ready for review
+    review_reset_fields: tuple[str, ...] = (
+        "ready_at",
+        "reviewed_accepted",
+        "reviewed_at",
+        "rejection_remarks",
+    )
+
+    def track_ready(self) -> None:
+        if self.ready and not self.ready_at:
+            self.ready_at = timezone.now()
+        elif not self.ready:
+            for field in self.review_reset_fields:
+                setattr(self, field, None)
+
+    def track_review(self) -> None:
+        """Stamps reviewed_at when the entity becomes accepted"""
+        if self.reviewed_accepted and (
+            self._state.adding or not self.tracker.previous("reviewed_accepted")
+        ):
+            self.reviewed_at = timezone.now()
 
+    def role_organization_ids(self) -> list:
+        """Organizations whose is_rp / is_ap flag may change by saving this entity"""
+        if self._state.adding:
+            return [self.organization_id] if self.published else []
+        if any(
+            self.tracker.has_changed(field)
+            for field in ("published", "organization_id")
+        ):
+            return [self.tracker.previous("organization_id"), self.organization_id]
+        return []
 
-class AttestationProvider(models.Model):
+    def save(self, *args, **kwargs):
+        organization_ids = self.role_organization_ids()
+        super().save(*args, **kwargs)
+        if organization_ids:
+            Organization.objects.filter(pk__in=organization_ids).refresh_roles()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        if self.published:
+            Organization.objects.filter(pk=self.organization_id).refresh_roles()
+        return result
+
+
+class AttestationProvider(ReviewableMixin, models.Model):
     yivi_tme = models.ForeignKey(
         YiviTrustModelEnv,
         on_delete=models.CASCADE,
@@ -210,6 +507,9 @@ class AttestationProvider(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_updated_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=False)
+    tracker = FieldTracker()
+
+    review_reset_fields = ReviewableMixin.review_reset_fields + ("published_at",)
 
     class Meta:
         constraints = [
@@ -255,32 +555,44 @@ class AttestationProvider(models.Model):
         return StatusChoices.DRAFT
 
     def save(self, *args, **kwargs):
-        if self.ready and not self.ready_at:
-            self.ready_at = timezone.now()
-        elif not self.ready:
-            self.ready_at = None
-            self.reviewed_accepted = None
-            self.reviewed_at = None
-            self.rejection_remarks = None
-            self.published_at = None
-
-        previous = (
-            AttestationProvider.objects.filter(pk=self.pk).first() if self.pk else None
-        )
+        self.track_ready()
+        self.track_review()
+        super().save(*args, **kwargs)
 
-        if previous and not previous.reviewed_accepted and self.reviewed_accepted:
-            self.reviewed_at = timezone.now()
-        elif not previous and self.reviewed_accepted:
-            self.reviewed_at = timezone.now()
 
-        super().save(*args, **kwargs)
+class RelyingPartyQuerySet(models.QuerySet):
+    def delete_cascading(
+        self, refresh_roles: bool = True
+    ) -> tuple[int, dict[str, int]]:
+        """
+        Deletes the relying parties with their hostnames, condiscons and condiscon
+        attributes with one DELETE per table. Delete signals aren't sent, so the
+        registry version is bumped and the organizations' roles refreshed here.
+        """
+        with transaction.atomic(using=self.db):
+            rows = list(self.values_list("pk", "organization_id", "published"))
+            ids = [pk for pk, _, _ in rows]
+            if not ids:
+                return 0, {}
+            deleted = delete_rows(
+                CondisconAttribute.objects.filter(condiscon__relying_party__in=ids),
+                Condiscon.objects.filter(relying_party__in=ids),
+                RelyingPartyHostname.objects.filter(relying_party__in=ids),
+                RelyingParty.objects.filter(pk__in=ids),
+            )
+            RegistryVersion.bump(RegistryVersion.RELYING_PARTIES)
+            organization_ids = {org_id for _, org_id, published in rows if published}
+            if refresh_roles and organization_ids:
+                Organization.objects.filter(pk__in=organization_ids).refresh_roles()
+        return deleted
 
 
-class RelyingParty(models.Model):
+class RelyingParty(ReviewableMixin, models.Model):
     class Meta:
         verbose_name = "Relying Party"
         verbose_name_plural = "Relying Parties"
 
+    objects = RelyingPartyQuerySet.as_manager()
     rp_slug = models.SlugField(unique=True, null=True, blank=True)
     yivi_tme = models.ForeignKey(
         YiviTrustModelEnv, on_delete=models.CASCADE, related_name="relying_parties"
@@ -329,19 +641,17 @@ class RelyingParty(models.Model):
     def save(self, *args, skip_import_approve=False, **kwargs):
 
         if self.pk:  # If this record already exists
-            if self.ready and not self.ready_at:
-                self.ready_at = timezone.now()
-
-            elif not self.ready:  # When it is not ready anymore
-                self.ready_at = None
-                self.rejection_remarks = None
-                self.reviewed_accepted = None
-                self.reviewed_at = None
-
+            self.track_ready()
             self.last_updated_at = timezone.now()
 
+        self.track_review()
         super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        deleted = RelyingParty.objects.filter(pk=self.pk).delete_cascading()
+        self.pk = None
+        return deleted
+
 
 class StatusChoices(models.TextChoices):
     """Choices for the status of a Relying Party or Attestation Provider."""
@@ -470,3 +780,161 @@ class User(models.Model):
 
     def __str__(self):
         return f"{self.email} - {self.role}"
+
+
+class RegistryVersion(models.Model):
+    """
+    Change counters of the public registry, one per namespace. They are bumped when
+    anything in the namespace is saved or deleted and serve as cheap validators for
+    conditional requests on the public endpoints.
+    """
+
+    ORGANIZATIONS = "organizations"
+    RELYING_PARTIES = "relying_parties"
+    ATTESTATION_PROVIDERS = "attestation_providers"
+    CREDENTIALS = "credentials"
+    TRUST_MODELS = "trust_models"
+
+    namespace = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.namespace} - {self.version}"
+
+    @classmethod
+    def bump(cls, *namespaces: str) -> None:
+        """Bumps the namespaces once the current transaction commits"""
+        transaction.on_commit(lambda: cls._increment(namespaces))
+
+    @classmethod
+    def _increment(cls, namespaces) -> None:
+        now = timezone.now()
+        updated = cls.objects.filter(namespace__in=namespaces).update(
+            version=F("version") + 1, updated_at=now
+        )
+        if updated < len(set(namespaces)):
+            for namespace in namespaces:
+                cls.objects.get_or_create(
+                    namespace=namespace, defaults={"version": 1, "updated_at": now}
+                )
+
+    @classmethod
+    def current(cls, namespaces) -> list:
+        """Returns (namespace, version, updated_at) for each namespace in one query"""
+        rows = dict(
+            (namespace, (version, updated_at))
+            for namespace, version, updated_at in cls.objects.filter(
+                namespace__in=namespaces
+            ).values_list("namespace", "version", "updated_at")
+        )
+        return [
+            (namespace, *rows.get(namespace, (0, None))) for namespace in namespaces
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    The outcome of a create request that was sent with an Idempotency-Key header, so
+    that a retry of the same request gets the same response instead of running again.
+    A key without a status code belongs to a request that is still running, or to one
+    whose worker died, which is given up after IDEMPOTENCY_KEY_LEASE seconds.
+    """
+
+    key = models.CharField(max_length=255)
+    email = models.EmailField(max_length=255)
+    path = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["email", "path", "key"], name="idempotency_key_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.email} {self.path} {self.key}"
+
+    @classmethod
+    def expired(cls) -> models.QuerySet:
+        cutoff = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        return cls.objects.filter(created_at__lt=cutoff)
+
+    @classmethod
+    def abandoned(cls) -> models.QuerySet:
+        cutoff = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE)
+        return cls.objects.filter(status_code__isnull=True, created_at__lt=cutoff)
+
+
+class SlackNotification(models.Model):
+    """
+    A Slack message waiting in the outbox. Notifications are written in the
+    transaction of the change they are about and sent by the dispatch_notifications
+    cron job, which combines bursts of one kind into a digest message. Failing
+    notifications are retried with backoff up to MAX_ATTEMPTS times and then left for
+    an admin to look at.
+    """
+
+    MAX_ATTEMPTS = 8
+
+    ORGANIZATION_CREATED = "organization_created"
+    RELYING_PARTY_CREATED = "relying_party_created"
+    RELYING_PARTY_READY = "relying_party_ready"
+    KIND_CHOICES = [
+        (ORGANIZATION_CREATED, "Organization created"),
+        (RELYING_PARTY_CREATED, "Relying party created"),
+        (RELYING_PARTY_READY, "Relying party ready for review"),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    # What made the change, e.g. "import", shown in digest messages
+    source = models.CharField(max_length=50, blank=True, default="")
+    # Name of the organization or relying party, listed in digest messages
+    subject = models.CharField(max_length=255)
+    text = models.TextField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.text
+
+
+class QueuedEmail(models.Model):
+    """
+    An email waiting to be sent by the send_emails cron job, which sends the queue
+    over one SMTP connection. Emails are queued in the transaction of the change they
+    are about, so a slow mail relay doesn't hold up or roll back the request. Failing
+    emails are retried with backoff up to MAX_ATTEMPTS times.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    QUEUED = "queued"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    content_subtype = models.CharField(max_length=20, default="html")
+    from_email = models.CharField(max_length=255, blank=True, default="")
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)}"
@@ -0,0 +1,222 @@
+"""
+Read-only list serialization from ``values()`` projections.
+
+The public list endpoints return hundreds of rows, and instantiating a serializer
+field graph and model instance per row dominates their response time. The functions
+here build the same dicts as ``OrganizationSerializer`` and ``CredentialListSerializer``
+from plain column values, with the related rows fetched in one extra query each.
+Keep them in sync with those serializers; ``test_value_serializers`` compares the
+rendered output of both.
+"""
+
+from collections import defaultdict
+from typing import Iterable, List
+from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models.fields.files import ImageFieldFile
+from rest_framework import serializers
+from .models import (
+    CredentialAttribute,
+    Organization,
+    PendingLogo,
+    TrustModel,
+    YiviTrustModelEnv,
+    logo_placeholder_url,
+)
+
+# Field instances are reused for their formatting, which honours the DRF settings
+datetime_field = serializers.DateTimeField()
+date_field = serializers.DateField()
+
+ORGANIZATION_VALUES = (
+    "id",
+    "name_en",
+    "name_nl",
+    "slug",
+    "is_verified",
+    "logo",
+    "created_at",
+    "last_updated_at",
+    "is_rp",
+    "is_ap",
+    "contact_number",
+    "country",
+    "house_number",
+    "street",
+    "postal_code",
+    "city",
+)
+
+CREDENTIAL_VALUES = (
+    "id",
+    "name_en",
+    "name_nl",
+    "attestation_provider__organization__slug",
+    "attestation_provider__organization__name_en",
+    "attestation_provider__ap_slug",
+    "attestation_provider__yivi_tme__environment",
+    "credential_id",
+    "description_en",
+    "description_nl",
+    "issue_url",
+    "deprecated_since",
+)
+
+
+def as_str(value):
+    return None if value is None else str(value)
+
+
+def organization_values(queryset: QuerySet) -> QuerySet:
+    """Projects an organization queryset onto the listed columns and its ordering"""
+    ordering = [
+        str(field).lstrip("-")
+        for field in queryset.query.order_by
+        if str(field).lstrip("-") not in ORGANIZATION_VALUES
+    ]
+    return (
+        queryset.prefetch_related(None)
+        .annotate(
+            logo_pending=Exists(
+                PendingLogo.objects.filter(organization_id=OuterRef("pk"))
+            )
+        )
+        .values(*ORGANIZATION_VALUES, "logo_pending", *ordering)
+    )
+
+
+def serialize_organizations(rows: Iterable[dict]) -> List[dict]:
+    """Equivalent to ``OrganizationSerializer(organizations, many=True).data``"""
+    rows = list(rows)
+    trust_models = defaultdict(list)
+    for organization_id, *trust_model in (
+        TrustModel.organizations.through.objects.filter(
+            organization_id__in=[row["id"] for row in rows]
+        )
+        .order_by("trustmodel_id")
+        .values_list(
+            "organization_id",
+            "trustmodel__id",
+            "trustmodel__name",
+            "trustmodel__description",
+            "trustmodel__eudi_compliant",
+        )
+    ):
+        trust_models[organization_id].append(
+            dict(zip(("id", "name", "description", "eudi_compliant"), trust_model))
+        )
+
+    logo_field = Organization._meta.get_field("logo")
+    placeholder = logo_placeholder_url()
+
+    def logo_variants(name):
+        if not name:
+            return None
+        return Organization.logo_variant_urls(ImageFieldFile(None, logo_field, name))
+
+    return [
+        {
+            "id": str(row["id"]),
+            "name_en": row["name_en"],
+            "name_nl": row["name_nl"],
+            "slug": row["slug"],
+            "is_verified": row["is_verified"],
+            "logo": (
+                logo_field.storage.url(row["logo"])
+                if row["logo"]
+                else placeholder if row["logo_pending"] else None
+            ),
+            "logo_variants": logo_variants(row["logo"]),
+            "logo_pending": row["logo_pending"],
+            "created_at": datetime_field.to_representation(row["created_at"]),
+            "last_updated_at": datetime_field.to_representation(row["last_updated_at"]),
+            "is_RP": row["is_rp"],
+            "is_AP": row["is_ap"],
+            "trust_models": trust_models[row["id"]],
+            "contact_number": as_str(row["contact_number"]),
+            "country": row["country"] or "",
+            "house_number": as_str(row["house_number"]),
+            "street": as_str(row["street"]),
+            "postal_code": as_str(row["postal_code"]),
+            "city": as_str(row["city"]),
+        }
+        for row in rows
+    ]
+
+
+def serialize_credentials(queryset: QuerySet) -> List[dict]:
+    """Equivalent to ``CredentialListSerializer(credentials, many=True).data``"""
+    rows = list(queryset.prefetch_related(None).values_list(*CREDENTIAL_VALUES))
+    attributes = defaultdict(list)
+    for credential_id, *attribute in (
+        CredentialAttribute.objects.filter(credential_id__in=[row[0] for row in rows])
+        .order_by("id")
+        .values_list(
+            "credential_id",
+            "id",
+            "credential_attribute_tag",
+            "name_en",
+            "name_nl",
+            "description_en",
+            "description_nl",
+            "optional",
+        )
+    ):
+        attributes[credential_id].append(attribute)
+
+    credentials = []
+    for (
+        pk,
+        name_en,
+        name_nl,
+        org_slug,
+        org_name,
+        ap_slug,
+        environment,
+        credential_id,
+        description_en,
+        description_nl,
+        issue_url,
+        deprecated_since,
+    ) in rows:
+        # Credential.full_path, without loading the related objects
+        scheme = YiviTrustModelEnv.SCHEME_MANAGERS.get(environment, "unknown")
+        full_path = f"{scheme}.{org_slug}.{credential_id}"
+        credentials.append(
+            {
+                "id": pk,
+                "name_en": name_en,
+                "name_nl": name_nl,
+                "org_slug": org_slug,
+                "org_name": org_name,
+                "ap_slug": ap_slug,
+                "environment": environment,
+                "credential_id": credential_id,
+                "attributes": [
+                    {
+                        "id": attribute_id,
+                        "credential_attribute_tag": tag,
+                        "name_en": attribute_name_en,
+                        "name_nl": attribute_name_nl,
+                        "description_en": attribute_description_en,
+                        "description_nl": attribute_description_nl,
+                        "full_path": f"{full_path}.{tag}",
+                        "optional": optional,
+                    }
+                    for (
+                        attribute_id,
+                        tag,
+                        attribute_name_en,
+                        attribute_name_nl,
+                        attribute_description_en,
+                        attribute_description_nl,
+                        optional,
+                    ) in attributes[pk]
+                ],
+                "description_en": description_en,
+                "description_nl": description_nl,
+                "full_path": full_path,
+                "issue_url": issue_url,
+                "deprecated_since": date_field.to_representation(deprecated_since),
+            }
+        )
+    return credentials
@@ -1,42 +1,182 @@
+import contextvars
 import os
 import requests
 import logging
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from portal_backend.models.models import Organization, RelyingParty
+from django.utils import timezone
+from portal_backend.models.models import (
+    Organization,
+    RelyingParty,
+    SlackNotification,
+)
 
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL")
 YIVI_PORTAL_URL = os.environ.get("YIVI_PORTAL_URL")
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for Slack
+TIMEOUT = 10
+# Notifications of one kind that are sent as one digest message from this many on
+DIGEST_MIN_SIZE = 3
+# Names listed in a digest message
+DIGEST_NAMES = 10
+DIGEST_SUBJECTS = {
+    SlackNotification.ORGANIZATION_CREATED: "organizations created",
+    SlackNotification.RELYING_PARTY_CREATED: "relying parties created",
+    SlackNotification.RELYING_PARTY_READY: "relying parties ready for review",
+}
+# Seconds before the first retry, doubled for every next one
+RETRY_BACKOFF = 60
+MAX_RETRY_BACKOFF = 60 * 60
+# Seconds a run has to send the notifications it claimed before another run may take
+# them, longer than posting all messages of a run takes with TIMEOUT
+CLAIM_LEASE = 10 * 60
+
+_source = contextvars.ContextVar("notification_source", default="")
+
+
+@contextmanager
+def notification_source(source: str):
+    """Marks the notifications of the changes made in this block, e.g. as "import" """
+    token = _source.set(source)
+    try:
+        yield
+    finally:
+        _source.reset(token)
+
 
 def notify_slack(text, webhook_url):
     payload = {"text": text}
-    requests.post(webhook_url, json=payload)
+    response = requests.post(webhook_url, json=payload, timeout=TIMEOUT)
+    response.raise_for_status()
 
 
-def slack_notify_handler(input: str) -> None | Exception:
-    try:
-        notify_slack(input, SLACK_WEBHOOK_URL)
-    except Exception as e:
-        logger.warning(
-            "Couldn't send Slack notification for organization creation due to an error: %s",
-            e,
+def slack_notify_handler(kind: str, subject: str, text: str) -> None:
+    """Adds a notification to the outbox, in the transaction of the change"""
+    if not SLACK_WEBHOOK_URL:
+        return
+    SlackNotification.objects.create(
+        kind=kind, source=_source.get(), subject=subject, text=text
+    )
+
+
+def notify_relying_parties_created(relying_parties, source: str) -> None:
+    """Adds the notifications of relying parties inserted in bulk, without post_save"""
+    if not SLACK_WEBHOOK_URL:
+        return
+    SlackNotification.objects.bulk_create(
+        SlackNotification(
+            kind=SlackNotification.RELYING_PARTY_CREATED,
+            source=source,
+            subject=relying_party.rp_slug,
+            text=f"New relying party created: {relying_party.rp_slug} on {YIVI_PORTAL_URL} (ID: {relying_party.id}) ",
+        )
+        for relying_party in relying_parties
+    )
+
+
+def digest_text(kind: str, source: str, notifications) -> str:
+    names = [notification.subject for notification in notifications]
+    listed = ", ".join(names[:DIGEST_NAMES])
+    if len(names) > DIGEST_NAMES:
+        listed += f" and {len(names) - DIGEST_NAMES} more"
+    by = f" by {source}" if source else ""
+    return f"{len(names)} {DIGEST_SUBJECTS[kind]}{by} on {YIVI_PORTAL_URL}: {listed}"
+
+
+def messages(notifications):
+    """Yields the text of each message and the notifications it covers"""
+    groups = {}
+    for notification in notifications:
+        key = (notification.kind, notification.source)
+        groups.setdefault(key, []).append(notification)
+    for (kind, source), group in groups.items():
+        if len(group) >= DIGEST_MIN_SIZE:
+            yield digest_text(kind, source, group), group
+        else:
+            for notification in group:
+                yield notification.text, [notification]
+
+
+def claim_due_notifications() -> list:
+    """
+    Claims the due notifications, oldest first, by moving their next attempt past the
+    lease, so other runs skip them while this run sends them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = list(
+            SlackNotification.objects.select_for_update(skip_locked=True)
+            .filter(
+                attempts__lt=SlackNotification.MAX_ATTEMPTS,
+                next_attempt_at__lte=now,
+            )
+            .order_by("created_at")
         )
+        SlackNotification.objects.filter(
+            id__in=[notification.id for notification in due]
+        ).update(next_attempt_at=now + timedelta(seconds=CLAIM_LEASE))
+    return due
+
+
+def dispatch_notifications() -> int:
+    """
+    Sends the due notifications of the outbox, oldest first, and returns the number
+    of messages sent. Failed messages are retried by later runs with backoff. No
+    transaction is open while Slack is waited for.
+    """
+    if not SLACK_WEBHOOK_URL:
+        return 0
+    sent = 0
+    sent_ids = []
+    failed_notifications = []
+    for text, notifications in messages(claim_due_notifications()):
+        try:
+            notify_slack(text, SLACK_WEBHOOK_URL)
+        except Exception as e:
+            logger.warning("Couldn't send Slack notification: %s", e)
+            for notification in notifications:
+                notification.attempts += 1
+                notification.error = str(e)
+                backoff = RETRY_BACKOFF * 2 ** (notification.attempts - 1)
+                notification.next_attempt_at = timezone.now() + timedelta(
+                    seconds=min(backoff, MAX_RETRY_BACKOFF)
+                )
+            failed_notifications.extend(notifications)
+        else:
+            sent_ids.extend(notification.id for notification in notifications)
+            sent += 1
+
+    with transaction.atomic():
+        SlackNotification.objects.filter(id__in=sent_ids).delete()
+        SlackNotification.objects.bulk_update(
+            failed_notifications, ["attempts", "error", "next_attempt_at"]
+        )
+    return sent
 
 
 @receiver(post_save, sender=Organization)
 def notify_organization_creation(sender, instance, created, **kwargs):
     if created:
         text = f"New organization created: {instance.name_en} on {YIVI_PORTAL_URL} (ID: {instance.id})  "
-        slack_notify_handler(text)
+        slack_notify_handler(
+            SlackNotification.ORGANIZATION_CREATED, instance.name_en, text
+        )
 
 
 @receiver(post_save, sender=RelyingParty)
 def notify_relying_party_creation(sender, instance, created, **kwargs):
     if created:
         text = f"New relying party created: {instance.rp_slug} on {YIVI_PORTAL_URL} (ID: {instance.id}) "
-        slack_notify_handler(text)
+        slack_notify_handler(
+            SlackNotification.RELYING_PARTY_CREATED, instance.rp_slug, text
+        )
     if instance.tracker.has_changed("ready") and instance.ready:
         text = f"Relying party '{instance.rp_slug}' is now READY FOR REVIEW on {YIVI_PORTAL_URL} (ID: {instance.id})"
-        slack_notify_handler(text)
+        slack_notify_handler(
+            SlackNotification.RELYING_PARTY_READY, instance.rp_slug, text
+        )
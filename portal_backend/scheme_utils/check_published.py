@@ -1,7 +1,7 @@
 import logging
 from django.utils import timezone
 from .import_utils import load_config, download_extract_repo, load_json_to_dict
-from ..models.models import RelyingParty
+from ..models.models import Organization, RelyingParty
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +23,9 @@ def check_published_rps(rps_dict: dict) -> None:
             db_rp.published_at = timezone.now()
             db_rp.save()
 
+    # The saves above keep the role flags current, this catches any drift
+    Organization.objects.with_stale_roles().refresh_roles()
+
 
 def check_published_cron() -> None:
 
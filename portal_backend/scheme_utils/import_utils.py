@@ -75,6 +75,8 @@ def create_org(slug: str, name_en: str, name_nl: str, logo_path: str) -> Organiz
         )
 
         org.trust_models.add(trust_model)
+        # New logos got their variants when saved, this fills in those of older ones
+        org.generate_logo_variants()
 
         logger.info(f"{'Created' if org_created else 'Updated'} Organization: {slug}")
     except Exception as org_error:
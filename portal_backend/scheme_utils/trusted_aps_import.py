@@ -3,12 +3,15 @@ import json
 import os
 from dotenv import load_dotenv  # type: ignore
 from portal_backend.models.models import (
+    Organization,
     TrustModel,
     YiviTrustModelEnv,
     AttestationProvider,
     Credential,
     CredentialAttribute,
+    RegistryVersion,
 )
+from portal_backend import cache as registry_cache
 from django.db import transaction
 import logging
 import portal_backend.scheme_utils.import_utils as import_utils
@@ -407,5 +410,14 @@ def import_aps(config_file=CONFIG_FILE) -> None:
             convert_xml_to_json(repo_name, branch)
             create_update_APs(env)
 
+        Organization.objects.with_stale_roles().refresh_roles()
+        # Signals cover the individual saves, this also drops anything they missed
+        registry_cache.invalidate(
+            RegistryVersion.ORGANIZATIONS,
+            RegistryVersion.TRUST_MODELS,
+            RegistryVersion.ATTESTATION_PROVIDERS,
+            RegistryVersion.CREDENTIALS,
+        )
+
     except Exception as e:
         raise Exception(f"Failed to import Attestation Providers: {e}")
@@ -2,9 +2,12 @@ import os
 from dotenv import load_dotenv
 from django.db import transaction
 from portal_backend.models.models import (
+    Organization,
     RelyingParty,
     RelyingPartyHostname,
+    RegistryVersion,
 )
+from portal_backend import cache as registry_cache
 from django.utils import timezone
 import logging
 import portal_backend.scheme_utils.import_utils as import_utils
@@ -156,6 +159,11 @@ def import_rps() -> None:
 
         all_RPs_dict = import_utils.load_json_to_dict(f"{repo_path}/requestors.json")
         create_org_rp(all_RPs_dict, "production", repo_path)
+        Organization.objects.with_stale_roles().refresh_roles()
+        # Signals cover the individual saves, this also drops anything they missed
+        registry_cache.invalidate(
+            RegistryVersion.ORGANIZATIONS, RegistryVersion.RELYING_PARTIES
+        )
 
     except Exception as e:
         raise Exception(f"Failed to import relying parties: {e}")
@@ -0,0 +1,137 @@
+import logging
+import os
+import re
+import time
+from io import BytesIO
+from typing import Optional
+from django.conf import settings
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.fields.files import ImageFieldFile
+from portal_backend.models.models import Organization, PendingLogo
+
+logger = logging.getLogger(__name__)
+
+LOGO_NAME = re.compile(r"^([0-9a-f]{64})\.(png|jpe?g)$")
+# Left behind by LogoStorage._save when the process died while writing
+TEMPORARY_NAME = re.compile(r"^[0-9a-f]{64}\.(?:png|jpe?g)\.[0-9a-f]{32}\.tmp$")
+VARIANT_DIR = re.compile(r"^[0-9a-f]{64}$")
+LOGO_EXTENSIONS = ("png", "jpg", "jpeg")
+# Files this young may belong to a save that hasn't committed yet
+DEFAULT_GRACE_PERIOD = 24 * 60 * 60
+
+
+def process_pending_logos(limit: Optional[int] = None) -> int:
+    """
+    Converts and stores staged logo uploads and generates their variants, oldest
+    first. Failing uploads are retried by later runs up to PendingLogo.MAX_ATTEMPTS
+    times and then left for an admin to look at. Returns the number of processed
+    logos.
+    """
+    pending_ids = (
+        PendingLogo.objects.filter(attempts__lt=PendingLogo.MAX_ATTEMPTS)
+        .order_by("uploaded_at")
+        .values_list("id", flat=True)
+    )
+    processed = 0
+    for pending_id in list(pending_ids[:limit] if limit else pending_ids):
+        with transaction.atomic():
+            # Skip uploads another run is processing, or that were replaced since
+            pending = (
+                PendingLogo.objects.select_for_update(skip_locked=True)
+                .select_related("organization")
+                .filter(id=pending_id)
+                .first()
+            )
+            if pending is None:
+                continue
+            try:
+                with transaction.atomic():
+                    organization = pending.organization
+                    organization.logo = ImageFile(
+                        BytesIO(bytes(pending.content)), name=pending.filename
+                    )
+                    organization.save()
+                    pending.delete()
+            except Exception as e:
+                logger.error(
+                    f"Failed to process the logo of {pending.organization}: {e}"
+                )
+                pending.attempts += 1
+                pending.error = str(e)
+                pending.save(update_fields=["attempts", "error"])
+            else:
+                processed += 1
+    return processed
+
+
+def is_stale(storage, name: str, cutoff: float) -> bool:
+    return os.path.getmtime(storage.path(name)) < cutoff
+
+
+def sweep_logos(
+    grace_period: int = DEFAULT_GRACE_PERIOD, dry_run: bool = False
+) -> list[str]:
+    """
+    Deletes logo files and logo variant directories that no organization refers to,
+    e.g. after an organization changed its logo or was deleted. Files are kept for a
+    grace period, as a save that reuses them may not have committed yet. Returns the
+    deleted names.
+    """
+    logo_field = Organization._meta.get_field("logo")
+    storage = logo_field.storage
+    referenced = set(
+        Organization.objects.exclude(logo="")
+        .exclude(logo__isnull=True)
+        .values_list("logo", flat=True)
+    )
+    referenced_hashes = {os.path.splitext(name)[0] for name in referenced}
+    cutoff = time.time() - grace_period
+    deleted = []
+
+    _, files = storage.listdir("")
+    for name in files:
+        orphan = LOGO_NAME.match(name) and name not in referenced
+        if (orphan or TEMPORARY_NAME.match(name)) and is_stale(storage, name, cutoff):
+            deleted.append(name)
+            if not dry_run:
+                storage.delete(name)
+
+    # Variants are stored by imagekit in a directory named after the logo's hash
+    variants_dir = settings.IMAGEKIT_CACHEFILE_DIR
+    if default_storage.exists(variants_dir):
+        directories, _ = default_storage.listdir(variants_dir)
+        for logo_hash in directories:
+            if not VARIANT_DIR.match(logo_hash) or logo_hash in referenced_hashes:
+                continue
+            # The logo may have been uploaded again, see LogoStorage._save
+            if any(
+                storage.exists(name) and not is_stale(storage, name, cutoff)
+                for name in (f"{logo_hash}.{ext}" for ext in LOGO_EXTENSIONS)
+            ):
+                continue
+            directory = f"{variants_dir}/{logo_hash}"
+            _, variants = default_storage.listdir(directory)
+            names = [f"{directory}/{variant}" for variant in variants]
+            if not all(is_stale(default_storage, name, cutoff) for name in names):
+                continue
+            deleted.append(directory)
+            if dry_run:
+                continue
+            for extension in LOGO_EXTENSIONS:
+                # Also forgets imagekit's cached existence of the variants
+                Organization.delete_logo_variants(
+                    ImageFieldFile(None, logo_field, f"{logo_hash}.{extension}")
+                )
+            for name in names:
+                default_storage.delete(name)
+            default_storage.delete(directory)
+
+    if deleted:
+        logger.info(
+            "%s %d unreferenced logo files",
+            "Found" if dry_run else "Deleted",
+            len(deleted),
+        )
+    return deleted
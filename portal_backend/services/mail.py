@@ -0,0 +1,145 @@
+import functools
+import logging
+from datetime import timedelta
+from typing import List, Optional
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template import Template
+from django.template.loader import get_template
+from django.utils import timezone
+from portal_backend.models.models import Organization, QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+MAINTAINER_ADDED_SUBJECT = "Yivi Portal - You have been added as a maintainer"
+# Seconds before the first retry, doubled for every next one
+RETRY_BACKOFF = 60
+MAX_RETRY_BACKOFF = 60 * 60
+# Emails sent per connection
+BATCH_SIZE = 100
+# Seconds a run has to send the emails it claimed before another run may take them,
+# longer than sending a batch takes with EMAIL_TIMEOUT
+CLAIM_LEASE = 30 * 60
+
+
+@functools.lru_cache(maxsize=None)
+def cached_template(name: str) -> Template:
+    """A template that is loaded and compiled once per process"""
+    return get_template(name)
+
+
+def queue_email(
+    subject: str, body: str, recipients: List[str], content_subtype: str = "html"
+) -> QueuedEmail:
+    """Queues an email in the current transaction, it is sent by the send_emails job"""
+    return QueuedEmail.objects.create(
+        subject=subject,
+        body=body,
+        content_subtype=content_subtype,
+        from_email=settings.EMAIL_FROM or "",
+        recipients=recipients,
+    )
+
+
+def queue_maintainer_added_email(
+    email: str, organization: Organization, added_by: str
+) -> QueuedEmail:
+    html_content = cached_template("email-template.html").render(
+        {
+            "added_by": added_by,
+            "organization_name": organization.name_en,
+            "portal_url": "https://" + settings.YIVI_PORTAL_URL,
+        }
+    )
+    return queue_email(MAINTAINER_ADDED_SUBJECT, html_content, [email])
+
+
+def to_message(queued: QueuedEmail, connection) -> EmailMessage:
+    message = EmailMessage(
+        queued.subject,
+        queued.body,
+        queued.from_email or None,
+        queued.recipients,
+        connection=connection,
+    )
+    message.content_subtype = queued.content_subtype
+    return message
+
+
+def failed(queued: QueuedEmail, error: Exception) -> None:
+    logger.warning(f"Failed to send email {queued.id}: {error}")
+    queued.attempts += 1
+    queued.error = str(error)
+    if queued.attempts >= QueuedEmail.MAX_ATTEMPTS:
+        queued.status = QueuedEmail.FAILED
+    backoff = RETRY_BACKOFF * 2 ** (queued.attempts - 1)
+    queued.next_attempt_at = timezone.now() + timedelta(
+        seconds=min(backoff, MAX_RETRY_BACKOFF)
+    )
+
+
+def claim_due_emails(limit: Optional[int]) -> List[QueuedEmail]:
+    """
+    Claims the due queued emails, oldest first, by moving their next attempt past the
+    lease, so other runs skip them while this run sends them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+            status=QueuedEmail.QUEUED, next_attempt_at__lte=now
+        )
+        queued_emails = list(due.order_by("created_at")[:limit])
+        QueuedEmail.objects.filter(
+            id__in=[queued.id for queued in queued_emails]
+        ).update(next_attempt_at=now + timedelta(seconds=CLAIM_LEASE))
+    return queued_emails
+
+
+def send_queued_emails(limit: Optional[int] = BATCH_SIZE) -> int:
+    """
+    Sends the due queued emails, oldest first, over one SMTP connection and returns
+    the number sent. Failed emails are retried by later runs with backoff. No
+    transaction is open while the relay is waited for.
+    """
+    queued_emails = claim_due_emails(limit)
+    if not queued_emails:
+        return 0
+
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        # The relay is unreachable, all emails of the batch are retried later
+        for queued in queued_emails:
+            failed(queued, e)
+    else:
+        try:
+            for i, queued in enumerate(queued_emails):
+                try:
+                    connection.send_messages([to_message(queued, connection)])
+                except Exception as e:
+                    failed(queued, e)
+                    # The connection may be broken, open a new one for the next emails
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        for unsent in queued_emails[i + 1 :]:
+                            failed(unsent, e)
+                        break
+                else:
+                    queued.status = QueuedEmail.SENT
+                    queued.sent_at = timezone.now()
+                    queued.error = ""
+                    sent += 1
+        finally:
+            connection.close()
+
+    with transaction.atomic():
+        QueuedEmail.objects.bulk_update(
+            queued_emails,
+            ["status", "attempts", "error", "next_attempt_at", "sent_at"],
+        )
+    return sent
@@ -1,5 +1,5 @@
 from typing import Optional
-from django.db.models import Q, QuerySet
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
 from portal_backend.models.models import (
     Organization,
 )
@@ -17,6 +17,33 @@ def to_nullable_bool(value: Optional[str]) -> Optional[bool]:
     return None
 
 
+def rank_search_matches(queryset: QuerySet, search_query: str) -> QuerySet:
+    """Filter organizations on a search query and rank exact and prefix matches first"""
+
+    return queryset.filter(
+        Q(name_en__icontains=search_query) | Q(name_nl__icontains=search_query)
+    ).annotate(
+        search_rank=Case(
+            When(
+                Q(name_en__iexact=search_query) | Q(name_nl__iexact=search_query),
+                then=Value(0),
+            ),
+            When(
+                Q(name_en__istartswith=search_query)
+                | Q(name_nl__istartswith=search_query),
+                then=Value(1),
+            ),
+            When(
+                Q(name_en__icontains=f" {search_query}")
+                | Q(name_nl__icontains=f" {search_query}"),
+                then=Value(2),
+            ),
+            default=Value(3),
+            output_field=IntegerField(),
+        )
+    )
+
+
 def filter_organizations(
     request: Request,
 ) -> QuerySet:
@@ -27,16 +54,13 @@ def filter_organizations(
     select_aps: Optional[bool] = to_nullable_bool(request.query_params.get("ap"))
     select_rps: Optional[bool] = to_nullable_bool(request.query_params.get("rp"))
 
-    queryset = Organization.objects.all().with_role_annotations()
+    queryset = Organization.objects.filter(is_demo=False)
+    # id breaks ties between equal names so keyset pagination has a total order
+    ordering = ["name_en", "id"]
 
     if search_query:
-        queryset = queryset.filter(
-            Q(name_en__icontains=search_query) | Q(name_nl__icontains=search_query)
-        )
-
-    queryset = queryset.exclude(
-        Q(name_en__icontains="demo") | Q(name_nl__icontains="demo")
-    )
+        queryset = rank_search_matches(queryset, search_query)
+        ordering = ["search_rank", *ordering]
 
     if trust_model:
         queryset = queryset.filter(trust_models__name=trust_model)
@@ -50,4 +74,4 @@ def filter_organizations(
     else:
         queryset = queryset.filter(Q(is_ap=True) | Q(is_rp=True))
 
-    return queryset.prefetch_related("trust_models").distinct().order_by("name_en")
+    return queryset.prefetch_related("trust_models").distinct().order_by(*ordering)
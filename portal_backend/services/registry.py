@@ -0,0 +1,195 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import uuid
+from typing import Any, Optional
+import brotli
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+from portal_backend.models.models import (
+    AttestationProvider,
+    Credential,
+    Organization,
+    RelyingParty,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the structure of the snapshot changes in a way consumers must notice
+SCHEMA_VERSION = 1
+SNAPSHOT_NAME = "registry.json"
+
+
+def get_snapshot_dir() -> str:
+    return settings.REGISTRY_SNAPSHOT_ROOT or os.path.join(
+        settings.MEDIA_ROOT, "registry"
+    )
+
+
+def build_registry() -> dict:
+    """
+    Collects the public registry: verified organizations with their published
+    relying parties (and hostnames) and published attestation providers (with
+    credentials and attributes). Lists are sorted so the output is deterministic.
+    """
+    credentials = Credential.objects.prefetch_related("attributes").order_by(
+        "credential_id"
+    )
+    attestation_providers = (
+        AttestationProvider.objects.filter(published=True)
+        .select_related("yivi_tme")
+        .prefetch_related(Prefetch("credentials", queryset=credentials))
+        .order_by("yivi_tme__environment", "ap_slug")
+    )
+    relying_parties = (
+        RelyingParty.objects.filter(published=True)
+        .select_related("yivi_tme")
+        .prefetch_related("hostnames")
+        .order_by("yivi_tme__environment", "rp_slug")
+    )
+    organizations = (
+        Organization.objects.filter(is_verified=True, is_demo=False)
+        .prefetch_related(
+            Prefetch("attestation_providers", queryset=attestation_providers),
+            Prefetch("relying_parties", queryset=relying_parties),
+        )
+        .order_by("slug")
+    )
+
+    return {
+        "organizations": [
+            {
+                "slug": org.slug,
+                "name_en": org.name_en,
+                "name_nl": org.name_nl,
+                "logo": org.logo.url if org.logo and org.logo.name else None,
+                "is_rp": org.is_rp,
+                "is_ap": org.is_ap,
+                "relying_parties": [
+                    {
+                        "rp_slug": rp.rp_slug,
+                        "environment": rp.yivi_tme.environment,
+                        "published_at": rp.published_at,
+                        "hostnames": sorted(h.hostname for h in rp.hostnames.all()),
+                    }
+                    for rp in org.relying_parties.all()
+                ],
+                "attestation_providers": [
+                    {
+                        "ap_slug": ap.ap_slug,
+                        "environment": ap.yivi_tme.environment,
+                        "full_path": f"{ap.yivi_tme.scheme_manager}.{ap.ap_slug}",
+                        "shortname_en": ap.shortname_en,
+                        "shortname_nl": ap.shortname_nl,
+                        "contact_email": ap.contact_email,
+                        "contact_address": ap.contact_address,
+                        "deprecated_since": ap.deprecated_since,
+                        "credentials": [
+                            serialize_credential(credential, ap, org)
+                            for credential in ap.credentials.all()
+                        ],
+                    }
+                    for ap in org.attestation_providers.all()
+                ],
+            }
+            for org in organizations
+        ]
+    }
+
+
+def serialize_credential(
+    credential: Credential, ap: AttestationProvider, org: Organization
+) -> dict:
+    # Equivalent to Credential.full_path, without fetching the AP and organization again
+    full_path = f"{ap.yivi_tme.scheme_manager}.{org.slug}.{credential.credential_id}"
+    return {
+        "credential_id": credential.credential_id,
+        "full_path": full_path,
+        "name_en": credential.name_en,
+        "name_nl": credential.name_nl,
+        "description_en": credential.description_en,
+        "description_nl": credential.description_nl,
+        "issue_url": credential.issue_url,
+        "deprecated_since": credential.deprecated_since,
+        "attributes": [
+            {
+                "tag": attr.credential_attribute_tag,
+                "full_path": f"{full_path}.{attr.credential_attribute_tag}",
+                "name_en": attr.name_en,
+                "name_nl": attr.name_nl,
+                "description_en": attr.description_en,
+                "description_nl": attr.description_nl,
+                "optional": attr.optional,
+            }
+            for attr in sorted(
+                credential.attributes.all(), key=lambda a: a.credential_attribute_tag
+            )
+        ],
+    }
+
+
+def dump(data: Any) -> bytes:
+    return json.dumps(
+        data, ensure_ascii=False, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def read_snapshot_version(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def write_atomic(path: str, content: bytes) -> None:
+    """Replaces a file in one step, so a static file server never sees a partial write"""
+    # A temporary file per writer, as the import jobs and export_registry may overlap
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_registry_snapshot(directory: Optional[str] = None) -> bool:
+    """
+    Writes the registry snapshot with precompressed .gz and .br variants.
+
+    The version of a snapshot is the hash of its contents. When nothing changed
+    since the previous snapshot the files are left alone, so their modification
+    time (and with that Last-Modified/ETag of the static file server) only moves
+    when the registry does. Returns whether a new snapshot was written.
+    """
+    directory = directory or get_snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, SNAPSHOT_NAME)
+
+    registry = build_registry()
+    version = hashlib.sha256(dump([SCHEMA_VERSION, registry])).hexdigest()
+    if read_snapshot_version(path) == version:
+        logger.info("Registry snapshot %s is up to date", version)
+        return False
+
+    content = dump(
+        {
+            "schema_version": SCHEMA_VERSION,
+            "version": version,
+            "generated_at": timezone.now(),
+            **registry,
+        }
+    )
+    # The compressed variants are written first, so they are never older than the JSON
+    write_atomic(f"{path}.gz", gzip.compress(content, compresslevel=9, mtime=0))
+    write_atomic(f"{path}.br", brotli.compress(content))
+    write_atomic(path, content)
+
+    logger.info("Wrote registry snapshot %s", version)
+    return True
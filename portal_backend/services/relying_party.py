@@ -1,13 +1,9 @@
-from typing import List
+from typing import Iterable, List, Optional
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from portal_backend.services.helpers import (
-    extract_hostnames,
-    hostname_exists,
-    validate_and_save,
-)
+from portal_backend.services.helpers import validate_and_save
 
 from ..models.models import (
     Organization,
@@ -17,6 +13,7 @@ from ..models.models import (
     Condiscon,
     CondisconAttribute,
     CredentialAttribute,
+    RegistryVersion,
 )
 from ..dns_verification import generate_dns_challenge
 from ..types import (
@@ -53,168 +50,319 @@ def create_relying_party(
     return relying_party
 
 
-def parse_and_validate_hostnames(hostnames: HostnameEntry) -> List[str]:
-    new_hostnames = extract_hostnames(hostnames)
-    duplicates = [h for h in new_hostnames if hostname_exists(h)]
-    if duplicates:
-        raise ValidationError(
-            {"hostnames": [f"Hostname already exists: {h}" for h in duplicates]}
-        )
-    return new_hostnames
+def reconcile_hostnames(
+    relying_party: RelyingParty, submitted_hostnames: List[HostnameEntry]
+) -> List[RelyingPartyHostname]:
+    """
+    Makes the hostnames of a relying party match the submitted entries. An entry with
+    the id of one of its hostnames renames that hostname, an entry without adds one,
+    and hostnames that aren't submitted are deleted. Conflicts are checked with one
+    query for the submitted names only, and the changes are applied in bulk.
+    Returns the hostnames in the submitted order.
+    """
+    existing = {str(h.id): h for h in relying_party.hostnames.all()}
+    errors = []
+    submitted = set()
+    hostnames, added, renamed = [], [], []
 
+    for entry in submitted_hostnames:
+        if not isinstance(entry, dict):
+            continue
+        hostname_str = (entry.get("hostname") or "").strip()
+        if not hostname_str:
+            continue
+        if hostname_str in submitted:
+            errors.append(f"Hostname submitted more than once: {hostname_str}")
+            continue
+        submitted.add(hostname_str)
 
-def create_hostname_objects(
-    hostnames: List[str], relying_party: RelyingParty
-) -> List[RelyingPartyHostname]:
-    created = []
-    for hostname in hostnames:
-        obj = RelyingPartyHostname(
-            relying_party=relying_party,
-            hostname=hostname,
-            dns_challenge=generate_dns_challenge(),
-            dns_challenge_created_at=timezone.now(),
-            dns_challenge_verified=False,
+        hostname_obj = existing.pop(str(entry.get("id")), None)
+        if hostname_obj is None:
+            hostname_obj = RelyingPartyHostname(
+                relying_party=relying_party,
+                hostname=hostname_str,
+                dns_challenge=generate_dns_challenge(),
+                dns_challenge_created_at=timezone.now(),
+                dns_challenge_verified=False,
+            )
+            added.append(hostname_obj)
+        elif hostname_obj.hostname != hostname_str:
+            hostname_obj.hostname = hostname_str
+            hostname_obj.dns_challenge = generate_dns_challenge()
+            hostname_obj.manually_verified = False
+            hostname_obj.dns_challenge_created_at = timezone.now()
+            hostname_obj.dns_challenge_verified = False
+            renamed.append(hostname_obj)
+        hostnames.append(hostname_obj)
+
+    deleted_ids = [h.id for h in existing.values()]
+    changed = added + renamed
+    for hostname_obj in changed:
+        try:
+            # Uniqueness is checked below for all hostnames at once
+            hostname_obj.full_clean(exclude=["relying_party"], validate_unique=False)
+        except ValidationError as e:
+            errors.extend(f"{hostname_obj.hostname}: {m}" for m in e.messages)
+    if changed:
+        # Names of hostnames that are deleted by this request may be reused
+        taken = (
+            RelyingPartyHostname.objects.filter(
+                hostname__in=[h.hostname for h in changed]
+            )
+            .exclude(id__in=deleted_ids)
+            .values_list("hostname", flat=True)
+        )
+        errors.extend(f"Hostname already exists: {h}" for h in taken)
+    if errors:
+        raise ValidationError({"hostnames": errors})
+
+    if deleted_ids:
+        RelyingPartyHostname.objects.filter(id__in=deleted_ids).delete()
+    if renamed:
+        RelyingPartyHostname.objects.bulk_update(
+            renamed,
+            [
+                "hostname",
+                "dns_challenge",
+                "manually_verified",
+                "dns_challenge_created_at",
+                "dns_challenge_verified",
+            ],
         )
-        created.append(validate_and_save(obj))
-    return created
+    if added:
+        RelyingPartyHostname.objects.bulk_create(added)
+    if changed:
+        # bulk_update and bulk_create don't send post_save
+        RegistryVersion.bump(RegistryVersion.RELYING_PARTIES)
+    return hostnames
 
 
 def create_hostnames(
     hostnames: List[HostnameEntry], relying_party: RelyingParty
 ) -> List[RelyingPartyHostname]:
-    new_hostnames = parse_and_validate_hostnames(hostnames)
-    return create_hostname_objects(new_hostnames, relying_party)
+    return reconcile_hostnames(relying_party, hostnames)
+
+
+def credential_attribute_key(attr: AttributeEntry) -> Optional[tuple[int, str]]:
+    """The (credential id, attribute name) an attribute entry requests, if well-formed"""
+    try:
+        return int(attr["credential_id"]), attr["credential_attribute_tag"]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def fetch_credential_attributes(
+    attributes_data: Iterable[AttributeEntry],
+) -> dict[tuple[int, str], CredentialAttribute]:
+    """Fetches the credential attributes of any number of attribute entries in one query"""
+    requested = {credential_attribute_key(attr) for attr in attributes_data}
+    requested.discard(None)
+    if not requested:
+        return {}
+    # Over-fetches at most the other attributes of the requested credentials
+    return {
+        (cred_attr.credential_id, cred_attr.name_en): cred_attr
+        for cred_attr in CredentialAttribute.objects.filter(
+            credential_id__in={cred_id for cred_id, _ in requested},
+            name_en__in={name for _, name in requested},
+        )
+    }
+
+
+def resolve_credential_attributes(
+    attributes_data: List[AttributeEntry],
+    found: Optional[dict[tuple[int, str], CredentialAttribute]] = None,
+) -> List[CredentialAttribute]:
+    """
+    Looks up the credential attributes of the requested attributes in one query, or in
+    the already fetched ones, and returns them in the same order. Raises a
+    ValidationError that lists every requested attribute that is malformed or doesn't
+    exist.
+    """
+    if found is None:
+        found = fetch_credential_attributes(attributes_data)
+    keys = [credential_attribute_key(attr) for attr in attributes_data]
+
+    errors = []
+    seen = set()
+    for index, key in enumerate(keys):
+        if key is None:
+            errors.append(
+                f"Attribute {index}: a credential_id and credential_attribute_tag are required."
+            )
+        elif key not in found:
+            errors.append(
+                f"Attribute {index}: credential {key[0]} has no attribute {key[1]}."
+            )
+        elif key in seen:
+            errors.append(
+                f"Attribute {index}: attribute {key[1]} of credential {key[0]} is requested more than once."
+            )
+        seen.add(key)
+    if errors:
+        raise ValidationError({"attributes": errors})
+    return [found[key] for key in keys]
 
 
 # TODO: right now we are making a condiscon with OR for each credential type, we will need a more advanced
 # condiscon maker that can handle full possibilities of the condiscon supported by the frontend
 def make_condiscon_json(
-    attributes_data: List[AttributeEntry],
+    credential_attributes: List[CredentialAttribute],
 ) -> CondisconJSON:
     condiscon_json = {
         "@context": "https://irma.app/ld/request/disclosure/v2",
         "disclose": [],
     }
-    credential_attributes: CredentialAttributesEntry = {}
+    attributes_per_credential: CredentialAttributesEntry = {}
 
-    for attr in attributes_data:
-        cred_attr = get_object_or_404(
-            CredentialAttribute,
-            name_en=attr["credential_attribute_tag"],
-            credential__id=attr["credential_id"],
+    for cred_attr in credential_attributes:
+        attributes_per_credential.setdefault(cred_attr.credential_id, []).append(
+            cred_attr.name_en
         )
-        cred_id = cred_attr.credential.id
-        credential_attributes.setdefault(cred_id, []).append(cred_attr.name_en)
 
-    for attr_list in credential_attributes.values():
+    for attr_list in attributes_per_credential.values():
         condiscon_json["disclose"].append([attr_list])
 
     return condiscon_json
 
 
 def create_condiscon(
-    attributes: List[AttributeEntry],
+    credential_attributes: List[CredentialAttribute],
     contexts: dict[str, str],
     relying_party: RelyingParty,
 ) -> Condiscon:
-
-    condiscon_json = make_condiscon_json(attributes)
-    condiscon = Condiscon.objects.create(
-        condiscon=condiscon_json,
+    condiscon = Condiscon(
+        condiscon=make_condiscon_json(credential_attributes),
         relying_party=relying_party,
         context_description_en=contexts["en"],
         context_description_nl=contexts["nl"],
     )
-    condiscon.full_clean()
-    condiscon.save()
-    return condiscon
+    return validate_and_save(condiscon)
+
+
+def clean_condiscon_attributes(condiscon_attributes: dict[int, CondisconAttribute]):
+    """
+    Validates condiscon attributes, keyed by the index of their entry in the request,
+    and raises a ValidationError that lists the errors of every entry.
+    """
+    errors = []
+    for index, obj in sorted(condiscon_attributes.items()):
+        try:
+            # The foreign keys are known to exist, so don't query them again
+            obj.full_clean(exclude=["credential_attribute", "condiscon"])
+        except ValidationError as e:
+            for field, messages in e.message_dict.items():
+                errors.append(f"Attribute {index}: {field}: {' '.join(messages)}")
+    if errors:
+        raise ValidationError({"attributes": errors})
 
 
 def create_condiscon_attributes(
     condiscon: Condiscon,
     attributes_data: List[AttributeEntry],
-) -> None:
-    for attr in attributes_data:
-        cred_attr = get_object_or_404(
-            CredentialAttribute,
-            name_en=attr["credential_attribute_tag"],
-            credential__id=attr["credential_id"],
-        )
-        obj = CondisconAttribute(
+    credential_attributes: List[CredentialAttribute],
+) -> List[CondisconAttribute]:
+    """
+    Validates and inserts the condiscon attributes in one query. The credential
+    attributes are the resolved ones of attributes_data, in the same order.
+    """
+    objs = [
+        CondisconAttribute(
             credential_attribute=cred_attr,
             condiscon=condiscon,
-            reason_en=attr["reason_en"],
-            reason_nl=attr["reason_nl"],
+            reason_en=attr.get("reason_en", ""),
+            reason_nl=attr.get("reason_nl", ""),
         )
-        validate_and_save(obj)
+        for attr, cred_attr in zip(attributes_data, credential_attributes)
+    ]
+    clean_condiscon_attributes(dict(enumerate(objs)))
+    # bulk_create doesn't send post_save; saving the condiscon already bumped the
+    # relying parties' registry version
+    return CondisconAttribute.objects.bulk_create(objs)
+
+
+def create_condiscon_with_attributes(
+    attributes_data: List[AttributeEntry],
+    contexts: dict[str, str],
+    relying_party: RelyingParty,
+) -> Condiscon:
+    credential_attributes = resolve_credential_attributes(attributes_data)
+    condiscon = create_condiscon(credential_attributes, contexts, relying_party)
+    create_condiscon_attributes(condiscon, attributes_data, credential_attributes)
+    return condiscon
 
 
 def update_relying_party_hostnames(
     relying_party: RelyingParty, submitted_hostnames: List[HostnameEntry]
 ) -> List[dict[str, str]]:
-    rp_existing_hostnames = {
-        str(h.id): h
-        for h in RelyingPartyHostname.objects.filter(relying_party=relying_party)
-    }
-    all_hostnames_set = set(
-        RelyingPartyHostname.objects.values_list("hostname", flat=True)
-    )
-    update_or_add = []
-
     if not submitted_hostnames:
         raise ValidationError("Cannot delete all hostnames.")
-
-    for entry in submitted_hostnames:
-        hostname_str = entry.get("hostname", "").strip()
-        if not hostname_str:
-            continue
-        hostname_id = entry.get("id")
-        # Update
-        if str(hostname_id) in rp_existing_hostnames:
-            hostname_obj = rp_existing_hostnames.pop(str(hostname_id))
-            if hostname_obj.hostname != hostname_str:
-                hostname_obj.hostname = hostname_str
-                hostname_obj.dns_challenge = generate_dns_challenge()
-                hostname_obj.manually_verified = False
-                hostname_obj.dns_challenge_created_at = timezone.now()
-                hostname_obj.dns_challenge_verified = False
-                validate_and_save(hostname_obj)
-            update_or_add.append(hostname_obj)
-        # Add new
-        elif hostname_str in all_hostnames_set:
-            raise ValidationError(
-                {"hostnames": [f"Hostname already exists: {hostname_str}"]}
-            )
-        else:
-            new_obj = RelyingPartyHostname(
-                relying_party=relying_party,
-                hostname=hostname_str,
-                dns_challenge=generate_dns_challenge(),
-                dns_challenge_created_at=timezone.now(),
-                dns_challenge_verified=False,
-            )
-            update_or_add.append(validate_and_save(new_obj))
-            all_hostnames_set.add(hostname_str)
-    # Delete old
-    for h in rp_existing_hostnames.values():
-        h.delete()
+    hostnames = reconcile_hostnames(relying_party, submitted_hostnames)
+    if not hostnames:
+        raise ValidationError("Cannot delete all hostnames.")
     return [
-        {"hostname": h.hostname, "dns_challenge": h.dns_challenge}
-        for h in update_or_add
+        {"hostname": h.hostname, "dns_challenge": h.dns_challenge} for h in hostnames
     ]
 
 
 def update_condiscon_attributes(
     condiscon: Condiscon, attributes_data: List[AttributeEntry]
 ) -> None:
+    """
+    Matches the stored condiscon attributes with the submitted ones by credential
+    attribute. Only new attributes, attributes with other reasons and attributes
+    that are no longer requested are written, in bulk, and the condiscon JSON is only
+    saved when it changes.
+    """
     if condiscon.condiscon is None:
         raise ValidationError("Condiscon JSON is not set.")
-    condiscon.condiscon = make_condiscon_json(attributes_data)
-    condiscon.full_clean()
-    condiscon.save()
-    # Delete existing attributes and create new ones
-    CondisconAttribute.objects.filter(condiscon=condiscon).delete()
-    create_condiscon_attributes(condiscon, attributes_data)
+    credential_attributes = resolve_credential_attributes(attributes_data)
+
+    stored = {}
+    removed = []
+    for obj in CondisconAttribute.objects.filter(condiscon=condiscon):
+        if obj.credential_attribute_id in stored:
+            removed.append(obj)  # requested twice before this was prevented
+        else:
+            stored[obj.credential_attribute_id] = obj
+
+    added, changed = {}, {}
+    for index, (attr, cred_attr) in enumerate(
+        zip(attributes_data, credential_attributes)
+    ):
+        reason_en = attr.get("reason_en", "")
+        reason_nl = attr.get("reason_nl", "")
+        obj = stored.pop(cred_attr.id, None)
+        if obj is None:
+            added[index] = CondisconAttribute(
+                credential_attribute=cred_attr,
+                condiscon=condiscon,
+                reason_en=reason_en,
+                reason_nl=reason_nl,
+            )
+        elif (obj.reason_en, obj.reason_nl) != (reason_en, reason_nl):
+            obj.reason_en = reason_en
+            obj.reason_nl = reason_nl
+            changed[index] = obj
+    removed.extend(stored.values())
+    clean_condiscon_attributes({**added, **changed})
+
+    if removed:
+        CondisconAttribute.objects.filter(id__in=[obj.id for obj in removed]).delete()
+    if changed:
+        CondisconAttribute.objects.bulk_update(
+            changed.values(), ["reason_en", "reason_nl"]
+        )
+    if added:
+        CondisconAttribute.objects.bulk_create(added.values())
+
+    condiscon_json = make_condiscon_json(credential_attributes)
+    if condiscon_json != condiscon.condiscon:
+        condiscon.condiscon = condiscon_json
+        condiscon.save(update_fields=["condiscon"])
+    elif added or changed:
+        # bulk_update and bulk_create don't send post_save
+        RegistryVersion.bump(RegistryVersion.RELYING_PARTIES)
 
 
 def update_condiscon_context(condiscon: Condiscon, data: RelyingPartyResponse) -> None:
@@ -0,0 +1,302 @@
+"""
+Onboarding of many relying parties of one organization from a JSON Lines or CSV upload.
+
+Every line of a JSON Lines upload is one relying party, in the format of the create
+endpoint. A CSV upload has one row per hostname and/or requested attribute, and rows
+with the same rp_slug form one relying party:
+
+    rp_slug,hostname,credential_id,credential_attribute_tag,reason_en,reason_nl,context_description_en,context_description_nl
+
+The whole upload is validated with one query per kind of lookup (slugs, hostnames,
+credential attributes) and the valid relying parties are inserted in bulk.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from ..dns_verification import generate_dns_challenge
+from ..models.models import (
+    Condiscon,
+    CondisconAttribute,
+    Organization,
+    RegistryVersion,
+    RelyingParty,
+    RelyingPartyHostname,
+    YiviTrustModelEnv,
+)
+from ..notify import notify_relying_parties_created
+from ..types import AttributeEntry
+from .relying_party import (
+    clean_condiscon_attributes,
+    fetch_credential_attributes,
+    make_condiscon_json,
+    resolve_credential_attributes,
+)
+
+MAX_RELYING_PARTIES = 500
+CSV_ATTRIBUTE_COLUMNS = (
+    "credential_id",
+    "credential_attribute_tag",
+    "reason_en",
+    "reason_nl",
+)
+
+
+@dataclass
+class BatchItem:
+    """One relying party of an upload, with everything that is created for it"""
+
+    line: int
+    rp_slug: str = ""
+    hostnames: List[str] = field(default_factory=list)
+    attributes: List[AttributeEntry] = field(default_factory=list)
+    context_description_en: str = ""
+    context_description_nl: str = ""
+    errors: List[str] = field(default_factory=list)
+    relying_party: Optional[RelyingParty] = None
+    hostname_objs: List[RelyingPartyHostname] = field(default_factory=list)
+    condiscon: Optional[Condiscon] = None
+    condiscon_attributes: List[CondisconAttribute] = field(default_factory=list)
+
+    def result(self, created: bool) -> dict:
+        result = {"line": self.line, "rp_slug": self.rp_slug}
+        if created:
+            result["status"] = "created"
+            result["hostnames"] = [
+                {"hostname": h.hostname, "dns_challenge": h.dns_challenge}
+                for h in self.hostname_objs
+            ]
+        elif self.errors:
+            result["status"] = "error"
+            result["errors"] = self.errors
+        else:
+            result["status"] = "skipped"
+        return result
+
+
+def validation_messages(error: ValidationError) -> List[str]:
+    if hasattr(error, "error_dict"):
+        return [
+            f"{name}: {message}" if name != "__all__" else message
+            for name, messages in error.message_dict.items()
+            for message in messages
+        ]
+    return error.messages
+
+
+def parse_json_lines(content: str) -> List[BatchItem]:
+    items = []
+    for line, text in enumerate(content.splitlines(), start=1):
+        if not text.strip():
+            continue
+        item = BatchItem(line=line)
+        items.append(item)
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            item.errors.append(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            item.errors.append("Expected a JSON object.")
+            continue
+        item.rp_slug = str(data.get("rp_slug") or "").strip()
+        item.context_description_en = data.get("context_description_en") or ""
+        item.context_description_nl = data.get("context_description_nl") or ""
+        hostnames = data.get("hostnames") or []
+        attributes = data.get("attributes") or []
+        if not isinstance(hostnames, list) or not isinstance(attributes, list):
+            item.errors.append("hostnames and attributes must be lists.")
+            continue
+        # Hostnames may be given as in the create endpoint or as plain strings
+        item.hostnames = [
+            str((h.get("hostname") or "") if isinstance(h, dict) else h).strip()
+            for h in hostnames
+        ]
+        item.attributes = attributes
+    return items
+
+
+def parse_csv(content: str) -> List[BatchItem]:
+    reader = csv.DictReader(io.StringIO(content))
+    if "rp_slug" not in (reader.fieldnames or []):
+        raise ValidationError("The CSV upload needs an rp_slug column.")
+    items: dict[str, BatchItem] = {}
+    for row in reader:
+        row = {key: (value or "").strip() for key, value in row.items() if key}
+        rp_slug = row.get("rp_slug", "")
+        if not any(row.values()):
+            continue
+        item = items.get(rp_slug)
+        if item is None:
+            # Line of the row, counting the header
+            item = items[rp_slug] = BatchItem(line=reader.line_num, rp_slug=rp_slug)
+        if row.get("hostname"):
+            item.hostnames.append(row["hostname"])
+        if row.get("credential_id") or row.get("credential_attribute_tag"):
+            item.attributes.append(
+                {column: row.get(column, "") for column in CSV_ATTRIBUTE_COLUMNS}
+            )
+        for language in ("en", "nl"):
+            context = f"context_description_{language}"
+            if row.get(context) and not getattr(item, context):
+                setattr(item, context, row[context])
+    return list(items.values())
+
+
+def parse_upload(upload) -> List[BatchItem]:
+    """Parses an uploaded .jsonl/.ndjson or .csv file into batch items"""
+    name = (upload.name or "").lower()
+    try:
+        content = upload.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValidationError("The upload must be UTF-8 encoded.")
+    if name.endswith((".jsonl", ".ndjson")):
+        items = parse_json_lines(content)
+    elif name.endswith(".csv"):
+        items = parse_csv(content)
+    else:
+        raise ValidationError("Upload a .jsonl, .ndjson or .csv file.")
+    if not items:
+        raise ValidationError("The upload contains no relying parties.")
+    if len(items) > MAX_RELYING_PARTIES:
+        raise ValidationError(
+            f"An upload may contain at most {MAX_RELYING_PARTIES} relying parties."
+        )
+    return items
+
+
+def build_item(
+    item: BatchItem, organization: Organization, yivi_tme: YiviTrustModelEnv, found
+) -> None:
+    """Builds and validates the rows of an item without querying the database"""
+    if not item.rp_slug:
+        item.errors.append("rp_slug is required.")
+    item.relying_party = RelyingParty(
+        rp_slug=item.rp_slug, organization=organization, yivi_tme=yivi_tme
+    )
+    try:
+        item.relying_party.full_clean(
+            exclude=["organization", "yivi_tme"], validate_unique=False
+        )
+    except ValidationError as e:
+        item.errors += validation_messages(e)
+
+    if not any(item.hostnames):
+        item.errors.append("At least one hostname is required.")
+    for hostname in filter(None, item.hostnames):
+        hostname_obj = RelyingPartyHostname(
+            relying_party=item.relying_party,
+            hostname=hostname,
+            dns_challenge=generate_dns_challenge(),
+            dns_challenge_created_at=timezone.now(),
+            dns_challenge_verified=False,
+        )
+        try:
+            hostname_obj.full_clean(exclude=["relying_party"], validate_unique=False)
+        except ValidationError as e:
+            item.errors += [f"{hostname}: {m}" for m in e.messages]
+        item.hostname_objs.append(hostname_obj)
+
+    try:
+        credential_attributes = resolve_credential_attributes(item.attributes, found)
+    except ValidationError as e:
+        item.errors += validation_messages(e)
+        return
+    item.condiscon = Condiscon(
+        condiscon=make_condiscon_json(credential_attributes),
+        relying_party=item.relying_party,
+        context_description_en=item.context_description_en,
+        context_description_nl=item.context_description_nl,
+    )
+    try:
+        item.condiscon.full_clean(exclude=["relying_party"])
+    except ValidationError as e:
+        item.errors += validation_messages(e)
+    item.condiscon_attributes = [
+        CondisconAttribute(
+            credential_attribute=cred_attr,
+            condiscon=item.condiscon,
+            reason_en=attr.get("reason_en", ""),
+            reason_nl=attr.get("reason_nl", ""),
+        )
+        for attr, cred_attr in zip(item.attributes, credential_attributes)
+    ]
+    try:
+        clean_condiscon_attributes(dict(enumerate(item.condiscon_attributes)))
+    except ValidationError as e:
+        item.errors += validation_messages(e)
+
+
+def check_conflicts(items: List[BatchItem]) -> None:
+    """Reports slugs and hostnames that exist already or occur twice in the upload"""
+    slugs = {item.rp_slug for item in items if item.rp_slug}
+    hostnames = {h.hostname for item in items for h in item.hostname_objs}
+    taken_slugs = set(
+        RelyingParty.objects.filter(rp_slug__in=slugs).values_list("rp_slug", flat=True)
+    )
+    taken_hostnames = set(
+        RelyingPartyHostname.objects.filter(hostname__in=hostnames).values_list(
+            "hostname", flat=True
+        )
+    )
+    seen_slugs, seen_hostnames = set(), set()
+    for item in items:
+        if item.rp_slug in taken_slugs:
+            item.errors.append(f"Relying party already exists: {item.rp_slug}")
+        elif item.rp_slug in seen_slugs:
+            item.errors.append(f"rp_slug occurs more than once: {item.rp_slug}")
+        seen_slugs.add(item.rp_slug)
+        for hostname_obj in item.hostname_objs:
+            hostname = hostname_obj.hostname
+            if hostname in taken_hostnames:
+                item.errors.append(f"Hostname already exists: {hostname}")
+            elif hostname in seen_hostnames:
+                item.errors.append(f"Hostname occurs more than once: {hostname}")
+            seen_hostnames.add(hostname)
+
+
+def create_relying_parties(
+    organization: Organization, items: List[BatchItem], atomic: bool = False
+) -> List[dict]:
+    """
+    Validates the items and creates the valid ones with one INSERT per table. With
+    atomic, nothing is created unless every item is valid. Returns a result per item.
+    """
+    yivi_tme = get_object_or_404(
+        YiviTrustModelEnv, environment="production", trust_model__name__iexact="yivi"
+    )
+    found = fetch_credential_attributes(
+        attr for item in items for attr in item.attributes
+    )
+    for item in items:
+        if not item.errors:
+            build_item(item, organization, yivi_tme, found)
+    check_conflicts([item for item in items if item.relying_party])
+
+    valid = [item for item in items if not item.errors]
+    if atomic and len(valid) < len(items):
+        valid = []
+    if valid:
+        with transaction.atomic():
+            RelyingParty.objects.bulk_create(item.relying_party for item in valid)
+            RelyingPartyHostname.objects.bulk_create(
+                h for item in valid for h in item.hostname_objs
+            )
+            Condiscon.objects.bulk_create(item.condiscon for item in valid)
+            CondisconAttribute.objects.bulk_create(
+                attr for item in valid for attr in item.condiscon_attributes
+            )
+            # The bulk inserts don't send post_save
+            RegistryVersion.bump(RegistryVersion.RELYING_PARTIES)
+            notify_relying_parties_created(
+                [item.relying_party for item in valid], source="batch upload"
+            )
+
+    created = {id(item) for item in valid}
+    return [item.result(id(item) in created) for item in items]
@@ -0,0 +1,44 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from portal_backend.models.models import (
+    AttestationProvider,
+    Condiscon,
+    CondisconAttribute,
+    Credential,
+    CredentialAttribute,
+    Organization,
+    PendingLogo,
+    RegistryVersion,
+    RelyingParty,
+    RelyingPartyHostname,
+    TrustModel,
+    YiviTrustModelEnv,
+)
+
+# The registry namespaces whose public representation changes with each model
+REGISTRY_NAMESPACES = {
+    Organization: (RegistryVersion.ORGANIZATIONS,),
+    Organization.trust_models.through: (RegistryVersion.ORGANIZATIONS,),
+    PendingLogo: (RegistryVersion.ORGANIZATIONS,),
+    TrustModel: (RegistryVersion.TRUST_MODELS,),
+    YiviTrustModelEnv: (RegistryVersion.TRUST_MODELS,),
+    RelyingParty: (RegistryVersion.RELYING_PARTIES,),
+    RelyingPartyHostname: (RegistryVersion.RELYING_PARTIES,),
+    Condiscon: (RegistryVersion.RELYING_PARTIES,),
+    CondisconAttribute: (RegistryVersion.RELYING_PARTIES,),
+    AttestationProvider: (RegistryVersion.ATTESTATION_PROVIDERS,),
+    Credential: (RegistryVersion.CREDENTIALS,),
+    CredentialAttribute: (RegistryVersion.CREDENTIALS,),
+}
+
+
+def bump_registry_version(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        RegistryVersion.bump(*REGISTRY_NAMESPACES[sender])
+
+
+for model in REGISTRY_NAMESPACES:
+    if model is Organization.trust_models.through:
+        m2m_changed.connect(bump_registry_version, sender=model)
+    else:
+        post_save.connect(bump_registry_version, sender=model)
+        post_delete.connect(bump_registry_version, sender=model)
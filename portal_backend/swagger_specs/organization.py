@@ -3,6 +3,33 @@ from drf_yasg.utils import swagger_auto_schema  # type: ignore
 from portal_backend.models.model_serializers import OrganizationSerializer  # type: ignore
 
 
+organization_list_schema = swagger_auto_schema(
+    manual_parameters=[
+        openapi.Parameter(
+            "pagination",
+            openapi.IN_QUERY,
+            description="Set to 'cursor' to use keyset pagination instead of limit/offset",
+            type=openapi.TYPE_STRING,
+            enum=["cursor"],
+        ),
+        openapi.Parameter(
+            "cursor",
+            openapi.IN_QUERY,
+            description="Opaque cursor taken from the 'next' or 'previous' link",
+            type=openapi.TYPE_STRING,
+        ),
+        openapi.Parameter(
+            "total",
+            openapi.IN_QUERY,
+            description="Set to 'approximate' to include an estimated count in cursor mode",
+            type=openapi.TYPE_STRING,
+            enum=["approximate"],
+        ),
+    ],
+    responses={200: "Success", 404: "Not Found"},
+)
+
+
 organization_create_schema = swagger_auto_schema(
     request_body=OrganizationSerializer,
     responses={
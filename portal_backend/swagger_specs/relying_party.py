@@ -46,6 +46,37 @@ relying_party_create_schema = swagger_auto_schema(
     ),
 )
 
+relying_party_batch_create_schema = swagger_auto_schema(
+    responses={
+        201: "All relying parties were created",
+        207: "Some relying parties were created, see the results",
+        400: "Bad Request, or no relying party was created",
+        401: "Unauthorized",
+        404: "Not Found",
+    },
+    manual_parameters=[
+        openapi.Parameter(
+            "file",
+            openapi.IN_FORM,
+            type=openapi.TYPE_FILE,
+            required=True,
+            description=(
+                "A .jsonl/.ndjson file with one relying party per line, in the format "
+                "of the create endpoint, or a .csv file with the columns rp_slug, "
+                "hostname, credential_id, credential_attribute_tag, reason_en, "
+                "reason_nl, context_description_en and context_description_nl, where "
+                "rows with the same rp_slug form one relying party"
+            ),
+        ),
+        openapi.Parameter(
+            "atomic",
+            openapi.IN_FORM,
+            type=openapi.TYPE_BOOLEAN,
+            description="Create nothing unless every relying party is valid",
+        ),
+    ],
+)
+
 relying_party_patch_schema = swagger_auto_schema(
     responses={
         200: "Success",
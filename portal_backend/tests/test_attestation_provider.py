@@ -0,0 +1,81 @@
+from django.test import TestCase
+from portal_backend.models.models import (
+    AttestationProvider,
+    Organization,
+    RelyingParty,
+    TrustModel,
+    YiviTrustModelEnv,
+)
+
+
+class ReviewTransitionTest(TestCase):
+    """Ensure that review transitions are detected without re-reading the row."""
+
+    def setUp(self):
+        trust_model = TrustModel.objects.create(
+            name="Yivi", description="Yivi Trust Model"
+        )
+        self.yivi_tme = YiviTrustModelEnv.objects.create(
+            trust_model=trust_model,
+            environment="production",
+            timestamp_server="https://timestamp.example.com",
+            contact_website="https://contact.example.com",
+            name_en="Production",
+            name_nl="Productie",
+            description_en="Production environment",
+            description_nl="Productie omgeving",
+            url="https://yivi.example.com",
+        )
+        self.organization = Organization.objects.create(
+            name_en="Test Organization",
+            name_nl="Test Organisatie",
+            slug="test-organization",
+        )
+        self.ap = AttestationProvider.objects.create(
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+            ap_slug="test-ap",
+            version="1.0",
+            ready=True,
+            reviewed_accepted=None,
+        )
+
+    def test_attestation_provider_accept_sets_reviewed_at(self):
+        """Test that accepting an AP stamps reviewed_at in a single UPDATE."""
+        self.assertIsNone(self.ap.reviewed_at)
+
+        self.ap.reviewed_accepted = True
+        with self.assertNumQueries(1):
+            self.ap.save()
+        self.assertIsNotNone(self.ap.reviewed_at)
+
+        reviewed_at = self.ap.reviewed_at
+        self.ap.version = "2.0"
+        self.ap.save()
+        self.assertEqual(self.ap.reviewed_at, reviewed_at)
+
+    def test_attestation_provider_not_ready_resets_review(self):
+        """Test that an AP that is no longer ready loses its review state."""
+        self.ap.reviewed_accepted = True
+        self.ap.save()
+
+        self.ap.ready = False
+        self.ap.save()
+        self.ap.refresh_from_db()
+        self.assertIsNone(self.ap.reviewed_accepted)
+        self.assertIsNone(self.ap.reviewed_at)
+        self.assertIsNone(self.ap.ready_at)
+
+    def test_relying_party_accept_sets_reviewed_at(self):
+        """Test that relying parties share the review transition logic."""
+        rp = RelyingParty.objects.create(
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+            rp_slug="test-rp",
+            ready=True,
+        )
+        self.assertIsNone(rp.reviewed_at)
+
+        rp.reviewed_accepted = True
+        rp.save()
+        self.assertIsNotNone(rp.reviewed_at)
@@ -0,0 +1,68 @@
+import json
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from portal_backend.cache import stats
+from portal_backend.models.models import Organization, TrustModel
+
+
+class RegistryCacheTest(APITestCase):
+    """Ensure that public registry data is cached and invalidated by model changes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        stats.reset()
+        self.trust_model = TrustModel.objects.create(
+            name="Yivi", description="Yivi Trust Model"
+        )
+        self.url = reverse("portal_backend:trust-model-list")
+
+    def test_second_request_is_served_from_cache(self):
+        """Test that a repeated request only reads the versions and the cache entry."""
+        self.client.get(self.url)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()[0]["name"], "Yivi")
+        self.assertEqual(
+            stats.totals(["trust_models"])["trust_models"], {"hits": 1, "misses": 1}
+        )
+
+    def test_model_change_invalidates_cache(self):
+        """Test that saving a trust model makes the next request see the change."""
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.trust_model.description = "Changed"
+            self.trust_model.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()[0]["description"], "Changed")
+        self.assertEqual(stats.totals(["trust_models"])["trust_models"]["misses"], 2)
+
+    def test_unverified_organization_is_not_cached(self):
+        """Test that not found results are not cached."""
+        Organization.objects.create(
+            name_en="Test Organization", name_nl="Test Organisatie", slug="test"
+        )
+        url = reverse("portal_backend:organization-detail", args=["test"])
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(
+            stats.totals(["organization"])["organization"], {"hits": 0, "misses": 2}
+        )
+
+    def test_cache_stats_command(self):
+        """Test that the counters are reported and can be reset."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        out = StringIO()
+        call_command("cache_stats", "--reset", stdout=out)
+        totals = json.loads(out.getvalue())
+        self.assertEqual(totals["trust_models"]["hit_ratio"], 0.5)
+        self.assertEqual(stats.totals(["trust_models"])["trust_models"]["hits"], 0)
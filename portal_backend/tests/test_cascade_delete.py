@@ -0,0 +1,193 @@
+from django.db import connection, models
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from portal_backend.models.models import (
+    AttestationProvider,
+    Condiscon,
+    CondisconAttribute,
+    Credential,
+    CredentialAttribute,
+    Organization,
+    RelyingParty,
+    RelyingPartyHostname,
+    TrustModel,
+    User,
+    YiviTrustModelEnv,
+)
+
+
+class CascadeDeleteTest(TestCase):
+    """Ensure that organizations and relying parties are deleted table by table."""
+
+    def setUp(self):
+        self.trust_model = TrustModel.objects.create(name="yivi", description="Yivi")
+        self.yivi_tme = YiviTrustModelEnv.objects.create(
+            trust_model=self.trust_model,
+            environment="production",
+            timestamp_server="https://timestamp.example.com",
+            keyshare_server="https://keyshare.example.com",
+            keyshare_website="https://keyshare-website.example.com",
+            keyshare_attribute="test_keyshare_attribute",
+            contact_website="https://contact.example.com",
+            minimum_android_version="1.0",
+            minimum_ios_version="1.0",
+            description_en="Description",
+            description_nl="Beschrijving",
+            url="https://yivi.example.com",
+        )
+        self.issuer = self.create_organization("issuer")
+        self.other = self.create_organization("other")
+        self.trust_model.organizations.add(self.issuer, self.other)
+        User.objects.create(
+            email="test@example.com", role="maintainer"
+        ).organizations.add(self.issuer, self.other)
+
+        attestation_provider = AttestationProvider.objects.create(
+            organization=self.issuer,
+            yivi_tme=self.yivi_tme,
+            version="1.0",
+            shortname_en="Issuer",
+            shortname_nl="Issuer",
+            contact_email="ap@example.com",
+        )
+        self.attributes = []
+        for i in range(5):
+            credential = Credential.objects.create(
+                attestation_provider=attestation_provider,
+                name_en=f"Credential {i}",
+                name_nl=f"Credential {i}",
+                shortname_en=f"Cred{i}",
+                shortname_nl=f"Cred{i}",
+                credential_id=f"cred-{i}",
+                issue_url="https://issue.example.com",
+                description_en="Description",
+                description_nl="Beschrijving",
+            )
+            self.attributes += CredentialAttribute.objects.bulk_create(
+                CredentialAttribute(
+                    credential=credential,
+                    credential_attribute_tag=f"attr-{j}",
+                    name_en=f"Attribute {j}",
+                    name_nl=f"Kenmerk {j}",
+                    description_en="Description",
+                    description_nl="Beschrijving",
+                )
+                for j in range(10)
+            )
+
+        for i in range(5):
+            self.create_relying_party(self.issuer, f"issuer-rp-{i}")
+        self.other_rp = self.create_relying_party(self.other, "other-rp")
+
+    def create_organization(self, slug):
+        return Organization.objects.create(name_en=slug, name_nl=slug, slug=slug)
+
+    def create_relying_party(self, organization, slug):
+        relying_party = RelyingParty.objects.create(
+            rp_slug=slug, organization=organization, yivi_tme=self.yivi_tme
+        )
+        RelyingPartyHostname.objects.bulk_create(
+            RelyingPartyHostname(relying_party=relying_party, hostname=f"{i}.{slug}.nl")
+            for i in range(3)
+        )
+        condiscon = Condiscon.objects.create(
+            condiscon={"disclose": []}, relying_party=relying_party
+        )
+        CondisconAttribute.objects.bulk_create(
+            CondisconAttribute(
+                credential_attribute=attribute,
+                condiscon=condiscon,
+                reason_en="Reason",
+                reason_nl="Reden",
+            )
+            for attribute in self.attributes[:20]
+        )
+        return relying_party
+
+    def test_delete_organization(self):
+        """Test that everything of an organization is deleted without loading it."""
+        with CaptureQueriesContext(connection) as queries:
+            deleted, counts = self.issuer.delete()
+
+        self.assertIsNone(self.issuer.pk)
+        self.assertLessEqual(len(queries), 20)
+        # The collector would have selected every related row
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if query["sql"].startswith("SELECT")
+                and "relyingpartyhostname" in query["sql"]
+            ]
+        )
+        self.assertEqual(counts["portal_backend.Organization"], 1)
+        self.assertEqual(counts["portal_backend.RelyingPartyHostname"], 15)
+        self.assertEqual(counts["portal_backend.CredentialAttribute"], 50)
+        # 5 condiscons of the issuer plus the other organization's requests
+        self.assertEqual(counts["portal_backend.CondisconAttribute"], 120)
+        self.assertEqual(deleted, sum(counts.values()))
+
+        self.assertFalse(RelyingParty.objects.filter(organization__slug="issuer"))
+        self.assertFalse(AttestationProvider.objects.exists())
+        self.assertFalse(CredentialAttribute.objects.exists())
+        self.assertEqual(list(User.objects.get().organizations.all()), [self.other])
+        self.assertEqual(list(self.trust_model.organizations.all()), [self.other])
+        # The other organization's relying party only loses its requests
+        self.assertEqual(self.other_rp.hostnames.count(), 3)
+        self.assertFalse(
+            CondisconAttribute.objects.filter(
+                condiscon__relying_party=self.other_rp
+            ).exists()
+        )
+
+    def test_delete_relying_party(self):
+        """Test that a relying party's rows are deleted and the roles refreshed."""
+        Organization.objects.filter(pk=self.other.pk).update(is_verified=True)
+        self.other_rp.published = True
+        self.other_rp.save()
+        self.other.refresh_from_db()
+        self.assertTrue(self.other.is_rp)
+
+        deleted, counts = self.other_rp.delete()
+
+        self.assertEqual(counts["portal_backend.RelyingParty"], 1)
+        self.assertEqual(counts["portal_backend.RelyingPartyHostname"], 3)
+        self.assertEqual(counts["portal_backend.CondisconAttribute"], 20)
+        self.assertFalse(RelyingParty.objects.filter(rp_slug="other-rp").exists())
+        # The issuer's hostnames are kept
+        self.assertEqual(RelyingPartyHostname.objects.count(), 15)
+        self.other.refresh_from_db()
+        self.assertFalse(self.other.is_rp)
+
+    def cascaded_models(self, model, found=None):
+        """The models of the rows that are deleted along with rows of a model"""
+        found = set() if found is None else found
+        for field in model._meta.many_to_many:
+            found.add(field.remote_field.through)
+        for relation in model._meta.related_objects:
+            if relation.many_to_many:
+                found.add(relation.through)
+                continue
+            self.assertIs(
+                relation.on_delete,
+                models.CASCADE,
+                f"delete_cascading only deletes {relation.related_model.__name__}",
+            )
+            if relation.related_model not in found:
+                found.add(relation.related_model)
+                self.cascaded_models(relation.related_model, found)
+        return found
+
+    def test_every_relation_is_deleted(self):
+        """Test that delete_cascading covers every model that refers to the rows."""
+        for instance in (self.other_rp, self.issuer):
+            model = type(instance)
+            with self.subTest(model=model.__name__):
+                _, counts = model.objects.filter(pk=instance.pk).delete_cascading()
+                for related in self.cascaded_models(model):
+                    self.assertIn(
+                        related._meta.label,
+                        counts,
+                        f"{model.__name__} rows are referred to by {related.__name__}, "
+                        "add it to delete_cascading",
+                    )
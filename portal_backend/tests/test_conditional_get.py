@@ -0,0 +1,98 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
+from portal_backend.models.models import Organization, RegistryVersion, TrustModel
+
+User = get_user_model()
+
+
+class ConditionalGetTest(APITestCase):
+    """Ensure that public endpoints answer conditional requests without doing work."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(
+            name_en="Test Organization",
+            name_nl="Test Organisatie",
+            slug="test-organization",
+        )
+        TrustModel.objects.create(name="Yivi", description="Yivi Trust Model")
+        self.url = reverse("portal_backend:organization-list")
+
+    def test_response_has_validators(self):
+        """Test that public responses carry an ETag, Last-Modified and Cache-Control."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response.headers)
+        self.assertIn("Last-Modified", response.headers)
+        self.assertIn("public", response.headers["Cache-Control"])
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+        self.assertIn("Authorization", response.headers["Vary"])
+
+    def test_if_none_match_returns_not_modified(self):
+        """Test that a matching ETag is answered with a 304 from a single query."""
+        etag = self.client.get(self.url).headers["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_returns_not_modified(self):
+        """Test that Last-Modified can be used as a validator as well."""
+        last_modified = self.client.get(self.url).headers["Last-Modified"]
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_invalidates_etag(self):
+        """Test that saving an organization changes the ETag once committed."""
+        etag = self.client.get(self.url).headers["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.name_en = "Renamed Organization"
+            self.organization.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_unrelated_change_keeps_etag(self):
+        """Test that only the namespaces an endpoint depends on affect its ETag."""
+        url = reverse("portal_backend:trust-model-list")
+        etag = self.client.get(url).headers["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.organization.name_en = "Renamed Organization"
+            self.organization.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(
+            RegistryVersion.objects.get(
+                namespace=RegistryVersion.ORGANIZATIONS
+            ).version,
+            2,
+        )
+
+    def test_authenticated_response_is_private(self):
+        """Test that authenticated responses get their own ETag and are not shared."""
+        anonymous_etag = self.client.get(self.url).headers["ETag"]
+
+        user = User.objects.create_user(username="test@gmail.com", password="test")
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {str(AccessToken.for_user(user))}"
+        )
+        response = self.client.get(self.url)
+        self.assertIn("private", response.headers["Cache-Control"])
+        self.assertNotEqual(response.headers["ETag"], anonymous_etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_write_endpoints_have_no_validators(self):
+        """Test that endpoints that did not opt in are left alone."""
+        response = self.client.post(reverse("portal_backend:organization-create"))
+        self.assertNotIn("ETag", response.headers)
@@ -0,0 +1,177 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
+from portal_backend.crons import IdempotencyKeySweep
+from portal_backend.models.models import (
+    AttestationProvider,
+    Credential,
+    CredentialAttribute,
+    IdempotencyKey,
+    Organization,
+    RelyingParty,
+    TrustModel,
+    YiviTrustModelEnv,
+)
+from portal_backend.models.models import User as OrgUser
+
+User = get_user_model()
+
+
+class IdempotencyKeyTest(APITestCase):
+    """Ensure that a create request retried with the same Idempotency-Key runs once."""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(
+            email="test@gmail.com", username="test@gmail.com"
+        )
+        self.organization = Organization.objects.create(
+            name_en="Test Organization", name_nl="Test Organization", slug="test-name"
+        )
+        trust_model = TrustModel.objects.create(name="yivi", description="Yivi")
+        trust_model.organizations.add(self.organization)
+        yivi_tme = YiviTrustModelEnv.objects.create(
+            trust_model=trust_model,
+            environment="production",
+            timestamp_server="https://timestamp.example.com",
+            keyshare_server="https://keyshare.example.com",
+            keyshare_website="https://keyshare-website.example.com",
+            keyshare_attribute="test_keyshare_attribute",
+            contact_website="https://contact.example.com",
+            minimum_android_version="1.0",
+            minimum_ios_version="1.0",
+            description_en="Description",
+            description_nl="Beschrijving",
+            url="https://yivi.example.com",
+        )
+        attestation_provider = AttestationProvider.objects.create(
+            organization=self.organization,
+            yivi_tme=yivi_tme,
+            version="1.0",
+            shortname_en="TestAP",
+            shortname_nl="TestAP",
+            contact_email="ap@example.com",
+        )
+        credential = Credential.objects.create(
+            attestation_provider=attestation_provider,
+            name_en="Test Credential",
+            name_nl="Test Credential",
+            shortname_en="TestCred",
+            shortname_nl="TestCred",
+            credential_id="test-cred-id",
+            issue_url="https://issue.example.com",
+            description_en="Description",
+            description_nl="Beschrijving",
+        )
+        CredentialAttribute.objects.create(
+            credential=credential,
+            credential_attribute_tag="attr-1",
+            name_en="Attribute",
+            name_nl="Kenmerk",
+            description_en="Description",
+            description_nl="Beschrijving",
+        )
+        self.data = {
+            "rp_slug": "test-relying-party",
+            "hostnames": [{"hostname": "test-relying-party.com"}],
+            "context_description_en": "Description",
+            "context_description_nl": "Beschrijving",
+            "attributes": [
+                {
+                    "credential_id": credential.id,
+                    "credential_attribute_tag": "Attribute",
+                    "reason_en": "Reason",
+                    "reason_nl": "Reden",
+                }
+            ],
+        }
+        self.url = reverse("portal_backend:rp-create", args=[self.organization.slug])
+
+        orguser = OrgUser.objects.create(email="test@gmail.com", role="maintainer")
+        orguser.organizations.add(self.organization)
+        token = AccessToken.for_user(user)
+        token["organizationSlugs"] = [self.organization.slug]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token)}")
+
+    def post(self, data, key="retry-1"):
+        return self.client.post(self.url, data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_response(self):
+        """Test that a retry gets the stored response without creating twice."""
+        first = self.post(self.data)
+        second = self.post(self.data)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertNotIn("Idempotent-Replayed", first)
+        self.assertEqual(RelyingParty.objects.count(), 1)
+
+        # Another key is another request
+        third = self.post(self.data, key="retry-2")
+        self.assertEqual(third.status_code, 400)
+        self.assertNotIn("Idempotent-Replayed", third)
+
+    def test_key_reused_for_other_request(self):
+        """Test that a key can't be reused for a different request body."""
+        self.post(self.data)
+        response = self.post({**self.data, "rp_slug": "other-relying-party"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(RelyingParty.objects.filter(rp_slug="other-relying-party"))
+
+    def test_in_progress_key(self):
+        """Test that a retry of a request that is still running is rejected."""
+        self.post(self.data)
+        IdempotencyKey.objects.update(status_code=None, response=None)
+
+        response = self.post(self.data)
+        self.assertEqual(response.status_code, 409)
+
+    def test_abandoned_key_is_reclaimed(self):
+        """Test that a key of a request whose worker died can be used again."""
+        IdempotencyKey.objects.create(
+            key="retry-1",
+            email="test@gmail.com",
+            path=self.url,
+            fingerprint="x",
+            created_at=timezone.now() - timedelta(minutes=10),
+        )
+
+        response = self.post(self.data)
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 201)
+
+    def test_server_error_not_stored(self):
+        """Test that a request that failed with a server error can be retried."""
+        with patch(
+            "portal_backend.views.relying_party.create_condiscon_with_attributes",
+            side_effect=RuntimeError("Simulated error"),
+        ):
+            first = self.post(self.data)
+        self.assertEqual(first.status_code, 500)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertFalse(RelyingParty.objects.exists())
+
+        second = self.post(self.data)
+        self.assertEqual(second.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", second)
+
+    def test_expired_keys_are_swept(self):
+        """Test that expired keys are removed and can be used again."""
+        self.post(self.data)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        IdempotencyKey.objects.create(
+            key="recent", email="test@gmail.com", path=self.url, fingerprint="x"
+        )
+
+        IdempotencyKeySweep().do()
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["recent"]
+        )
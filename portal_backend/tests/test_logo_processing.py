@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
+from portal_backend.models.model_serializers import OrganizationSerializer
+from portal_backend.models.models import (
+    Organization,
+    PendingLogo,
+    logo_placeholder_url,
+)
+from portal_backend.services.logos import process_pending_logos
+
+
+def png_upload(width=200, height=200):
+    content = BytesIO()
+    Image.new("RGB", (width, height), (0, 0, 255)).save(content, "PNG")
+    return SimpleUploadedFile("logo.png", content.getvalue(), "image/png")
+
+
+class LogoProcessingTest(APITestCase):
+    """Ensure that uploaded logos are processed by the cron job, not the request."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="test@gmail.com", username="test@gmail.com"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.data = {
+            "name_en": "Test Organization",
+            "name_nl": "Test Organisatie",
+            "slug": "test-organization",
+            "country": "NL",
+            "house_number": "1A",
+            "street": "Test Street",
+            "postal_code": "1234AB",
+            "city": "Test City",
+        }
+
+    def create(self, logo):
+        return self.client.post(
+            reverse("portal_backend:organization-create"),
+            {**self.data, "logo": logo},
+            format="multipart",
+        )
+
+    def test_upload_is_staged_and_processed(self):
+        """Test that the request only stages the logo and the job stores it."""
+        self.assertEqual(self.create(png_upload()).status_code, 201)
+        organization = Organization.objects.get(slug="test-organization")
+        self.assertFalse(organization.logo)
+        self.assertTrue(PendingLogo.objects.filter(organization=organization).exists())
+
+        data = OrganizationSerializer(organization).data
+        self.assertTrue(data["logo_pending"])
+        self.assertEqual(data["logo"], logo_placeholder_url())
+        self.assertIsNone(data["logo_variants"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(process_pending_logos(), 1)
+        organization = Organization.objects.get(slug="test-organization")
+        self.assertTrue(os.path.exists(organization.logo.path))
+        self.assertTrue(
+            organization.logo_64_webp.storage.exists(organization.logo_64_webp.name)
+        )
+        self.assertFalse(PendingLogo.objects.exists())
+        self.assertFalse(OrganizationSerializer(organization).data["logo_pending"])
+
+    def test_update_keeps_current_logo_until_processed(self):
+        """Test that a new upload doesn't replace the logo in the request."""
+        self.create(png_upload())
+        process_pending_logos()
+        organization = Organization.objects.get(slug="test-organization")
+        old_logo = organization.logo.name
+        token = AccessToken.for_user(self.user)
+        token["organizationSlugs"] = [organization.slug]
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token)}")
+
+        response = self.client.patch(
+            reverse("portal_backend:organization-update", args=[organization.slug]),
+            {"logo": png_upload(300, 100)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        organization.refresh_from_db()
+        self.assertEqual(organization.logo.name, old_logo)
+        self.assertTrue(OrganizationSerializer(organization).data["logo_pending"])
+
+        process_pending_logos()
+        organization.refresh_from_db()
+        self.assertNotEqual(organization.logo.name, old_logo)
+
+    @override_settings(LOGO_MAX_UPLOAD_SIZE=100)
+    def test_upload_size_is_limited(self):
+        """Test that large uploads are rejected before they are opened."""
+        response = self.create(png_upload())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("at most 100 bytes", response.json()["logo"][0])
+
+    @override_settings(LOGO_MAX_PIXELS=100 * 100)
+    def test_pixel_count_is_limited(self):
+        """Test that uploads with too many pixels are rejected."""
+        self.assertEqual(self.create(png_upload(100, 100)).status_code, 201)
+        response = self.create(png_upload(101, 100))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("at most 10000 pixels", response.json()["logo"][0])
+
+    def test_failing_uploads_are_retried_and_given_up(self):
+        """Test that an upload that can't be processed is left for an admin."""
+        organization = Organization.objects.create(
+            name_en="Broken", name_nl="Broken", slug="broken"
+        )
+        pending = PendingLogo.objects.create(
+            organization=organization, filename="logo.png", content=b"not a png"
+        )
+
+        for _ in range(PendingLogo.MAX_ATTEMPTS):
+            self.assertEqual(process_pending_logos(), 0)
+        pending.refresh_from_db()
+        self.assertEqual(pending.attempts, PendingLogo.MAX_ATTEMPTS)
+        self.assertTrue(pending.error)
+
+        with self.assertNumQueries(1):
+            process_pending_logos()
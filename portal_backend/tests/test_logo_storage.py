@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import time
+from django.test import TestCase, override_settings
+from portal_backend.models.models import Organization
+from portal_backend.scheme_utils.import_utils import load_logo_if_exists
+from portal_backend.services.logos import sweep_logos
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class LogoStorageTest(TestCase):
+    """Ensure that identical logos are stored once and deleted when unreferenced."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        self.first = self.create("first")
+        self.second = self.create("second")
+        self.path = self.first.logo.path
+
+    def create(self, slug):
+        return Organization.objects.create(
+            name_en=slug,
+            name_nl=slug,
+            slug=slug,
+            logo=load_logo_if_exists(os.path.join(current_dir, "test_logo.png")),
+        )
+
+    def variant_paths(self, logo):
+        files = Organization.logo_variant_files(logo)
+        return [
+            file.storage.path(file.name)
+            for extension in files.values()
+            for file in extension.values()
+        ]
+
+    def age(self, *paths):
+        old = time.time() - 2 * 24 * 60 * 60
+        for path in paths:
+            os.utime(path, (old, old))
+
+    def test_identical_logos_share_one_file(self):
+        """Test that an existing logo file is reused, not rewritten."""
+        self.assertEqual(self.first.logo.name, self.second.logo.name)
+        inode = os.stat(self.path).st_ino
+
+        self.create("third")
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(os.listdir(self.media_root).count(self.first.logo.name), 1)
+        self.assertFalse(
+            [name for name in os.listdir(self.media_root) if name.endswith(".tmp")]
+        )
+
+    def test_deleted_logo_is_left_to_sweep(self):
+        """Test that deleting the last organization with a logo keeps its files."""
+        variants = self.variant_paths(self.first.logo)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.delete()
+            self.second.delete()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertTrue(all(os.path.exists(path) for path in variants))
+
+        self.age(self.path, *variants)
+        self.assertEqual(len(sweep_logos()), 2)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_reused_logo_is_not_swept(self):
+        """Test that uploading an unreferenced logo again restarts its grace period."""
+        variants = self.variant_paths(self.first.logo)
+        Organization.objects.all().delete()
+        self.age(self.path, *variants)
+
+        # E.g. a save that hasn't committed yet when the sweep runs
+        self.create("again").delete()
+        self.assertEqual(sweep_logos(), [])
+        self.assertTrue(os.path.exists(self.path))
+        self.assertTrue(all(os.path.exists(path) for path in variants))
+
+    def test_sweep_deletes_unreferenced_files(self):
+        """Test that the sweep removes stale orphans and keeps everything else."""
+        variants = self.variant_paths(self.first.logo)
+        # A bulk delete doesn't release the logo
+        Organization.objects.all().delete()
+
+        self.assertEqual(sweep_logos(), [])  # still within the grace period
+        self.age(self.path, *variants)
+        self.assertEqual(len(sweep_logos(dry_run=True)), 2)
+        self.assertTrue(os.path.exists(self.path))
+
+        self.assertEqual(len(sweep_logos()), 2)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(any(os.path.exists(path) for path in variants))
+
+        # Uploading the logo again writes the file and its variants again
+        self.create("again")
+        self.assertTrue(os.path.exists(self.path))
+        self.assertTrue(all(os.path.exists(path) for path in variants))
+
+    def test_sweep_keeps_referenced_files(self):
+        """Test that logos in use are never swept."""
+        self.age(self.path, *self.variant_paths(self.first.logo))
+        self.assertEqual(sweep_logos(), [])
+        self.assertTrue(os.path.exists(self.path))
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from django.core.files.images import ImageFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from portal_backend.models.model_serializers import OrganizationSerializer
+from portal_backend.models.models import (
+    LOGO_VARIANT_FORMATS,
+    LOGO_VARIANT_SIZES,
+    Organization,
+)
+from portal_backend.scheme_utils.import_utils import load_logo_if_exists
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class LogoVariantsTest(TestCase):
+    """Ensure that scaled logos are written when a logo is saved."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        self.org = Organization.objects.create(
+            name_en="Test Organization",
+            name_nl="Test Organisatie",
+            slug="test",
+            logo=load_logo_if_exists(os.path.join(current_dir, "test_logo.png")),
+        )
+
+    def variant_files(self, logo):
+        files = Organization.logo_variant_files(logo)
+        return [file for extension in files.values() for file in extension.values()]
+
+    def test_variants_are_generated_on_save(self):
+        """Test that every size and format exists and fits its size."""
+        files = Organization.logo_variant_files(self.org.logo)
+        self.assertEqual(set(files), set(LOGO_VARIANT_FORMATS))
+        for extension, sizes in files.items():
+            self.assertEqual(list(sizes), list(LOGO_VARIANT_SIZES))
+            for size, file in sizes.items():
+                self.assertTrue(file.name.endswith(f".{extension}"))
+                self.assertTrue(file.storage.exists(file.name))
+                with Image.open(file.storage.path(file.name)) as image:
+                    self.assertLessEqual(max(image.size), size)
+                    self.assertEqual(image.format, extension.upper())
+
+    def test_variants_are_content_addressed(self):
+        """Test that the variant names derive from the logo's content hash."""
+        logo_hash = os.path.splitext(self.org.logo.name)[0]
+        for file in self.variant_files(self.org.logo):
+            self.assertIn(logo_hash, file.name)
+
+    def test_serializer_exposes_variant_urls(self):
+        """Test that the serializer lists the variant URLs by format and width."""
+        variants = OrganizationSerializer(self.org).data["logo_variants"]
+        self.assertEqual(variants["webp"]["64"], self.org.logo_64_webp.url)
+        self.assertEqual(
+            set(variants["png"]), {str(size) for size in LOGO_VARIANT_SIZES}
+        )
+
+        self.org.logo = None
+        self.assertIsNone(OrganizationSerializer(self.org).data["logo_variants"])
+
+    def test_changing_logo_writes_new_variants(self):
+        """Test that a new logo gets variants and the old ones are left to the sweep."""
+        old_logo = self.org.logo
+        old_files = self.variant_files(old_logo)
+
+        content = BytesIO()
+        Image.new("RGB", (300, 100), (255, 0, 0)).save(content, "PNG")
+        self.org.logo = ImageFile(content, name="logo.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.org.save()
+
+        for file in old_files:
+            self.assertTrue(file.storage.exists(file.name))
+        for file in self.variant_files(self.org.logo):
+            self.assertTrue(file.storage.exists(file.name))
+
+    def test_missing_variants_are_generated(self):
+        """Test that variants of logos saved before are filled in."""
+        files = self.variant_files(self.org.logo)
+        Organization.delete_logo_variants(self.org.logo)
+
+        self.org.generate_logo_variants()
+        for file in files:
+            self.assertTrue(file.storage.exists(file.name))
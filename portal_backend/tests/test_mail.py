@@ -0,0 +1,101 @@
+import smtplib
+from unittest.mock import patch
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+from django.utils import timezone
+from portal_backend.models.models import QueuedEmail
+from portal_backend.services.mail import queue_email, send_queued_emails
+
+
+class QueuedEmailTest(TestCase):
+    """Ensure that queued emails are sent in batches and retried on failures."""
+
+    def test_batch_uses_one_connection(self):
+        """Test that all due emails are sent over one connection."""
+        for i in range(3):
+            queue_email(f"Subject {i}", "<p>Body</p>", [f"user{i}@example.com"])
+
+        with patch(
+            "portal_backend.services.mail.get_connection", wraps=mail.get_connection
+        ) as get_connection:
+            self.assertEqual(send_queued_emails(), 3)
+
+        get_connection.assert_called_once()
+        self.assertEqual(
+            [message.subject for message in mail.outbox],
+            ["Subject 0", "Subject 1", "Subject 2"],
+        )
+        self.assertEqual(mail.outbox[0].content_subtype, "html")
+        self.assertEqual(QueuedEmail.objects.filter(status=QueuedEmail.SENT).count(), 3)
+        self.assertEqual(send_queued_emails(), 0)
+
+    def test_failures_are_retried(self):
+        """Test that a refused email is retried later and the others are sent."""
+        queue_email("Refused", "Body", ["refused@example.com"])
+        queue_email("Accepted", "Body", ["accepted@example.com"])
+        send_messages = EmailBackend.send_messages
+
+        def refuse(backend, messages):
+            if messages[0].subject == "Refused":
+                raise smtplib.SMTPRecipientsRefused({})
+            return send_messages(backend, messages)
+
+        with patch.object(EmailBackend, "send_messages", refuse):
+            self.assertEqual(send_queued_emails(), 1)
+
+        refused = QueuedEmail.objects.get(subject="Refused")
+        self.assertEqual(refused.status, QueuedEmail.QUEUED)
+        self.assertEqual(refused.attempts, 1)
+        self.assertGreater(refused.next_attempt_at, timezone.now())
+        self.assertEqual([message.subject for message in mail.outbox], ["Accepted"])
+
+        # Not due yet
+        self.assertEqual(send_queued_emails(), 0)
+
+        QueuedEmail.objects.filter(pk=refused.pk).update(
+            attempts=QueuedEmail.MAX_ATTEMPTS - 1, next_attempt_at=timezone.now()
+        )
+        with patch.object(EmailBackend, "send_messages", refuse):
+            self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(
+            QueuedEmail.objects.get(pk=refused.pk).status, QueuedEmail.FAILED
+        )
+
+    def test_connection_is_reopened_after_failure(self):
+        """Test that a failed send opens a new connection once for the next emails."""
+        for subject in ("Refused", "First", "Second"):
+            queue_email(subject, "Body", [f"{subject.lower()}@example.com"])
+        send_messages = EmailBackend.send_messages
+        opened = []
+
+        def refuse(backend, messages):
+            if messages[0].subject == "Refused":
+                raise smtplib.SMTPServerDisconnected()
+            return send_messages(backend, messages)
+
+        with patch.object(EmailBackend, "send_messages", refuse), patch.object(
+            EmailBackend, "open", lambda backend: opened.append(backend)
+        ):
+            self.assertEqual(send_queued_emails(), 2)
+        self.assertEqual(len(opened), 2)
+
+        # A relay that can't be reached again leaves the rest for a later run
+        QueuedEmail.objects.filter(subject="Refused").update(
+            next_attempt_at=timezone.now()
+        )
+        queue_email("Third", "Body", ["third@example.com"])
+
+        def unreachable(backend):
+            if opened:
+                raise ConnectionRefusedError()
+            opened.append(backend)
+
+        opened.clear()
+        with patch.object(EmailBackend, "send_messages", refuse), patch.object(
+            EmailBackend, "open", unreachable
+        ):
+            self.assertEqual(send_queued_emails(), 0)
+        third = QueuedEmail.objects.get(subject="Third")
+        self.assertEqual(third.attempts, 1)
+        self.assertGreater(third.next_attempt_at, timezone.now())
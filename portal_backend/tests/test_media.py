@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from portal_backend.views.media import serve_media
+
+LOGO = "0" * 63 + "a.png"
+
+
+class ServeMediaTest(SimpleTestCase):
+    """Ensure that media is served with the right caching and offload headers."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_SERVE_MODE="django"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.write(LOGO, b"png")
+        self.write("CACHE/images/" + "0" * 63 + "a/abc123.webp", b"webp")
+        self.write("registry/registry.json", b"{}")
+        self.write("registry/registry.json.gz", b"gzip")
+        self.write("registry/registry.json.br", b"br")
+
+    def write(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def get(self, path, **headers):
+        return serve_media(self.factory.get(f"/media/{path}", headers=headers), path)
+
+    def test_content_addressed_files_are_immutable(self):
+        """Test that logos and logo variants may be cached for a year."""
+        for path in (LOGO, "CACHE/images/" + "0" * 63 + "a/abc123.webp"):
+            response = self.get(path)
+            self.assertEqual(
+                response.headers["Cache-Control"],
+                "public, max-age=31536000, immutable",
+            )
+        self.assertEqual(b"".join(response.streaming_content), b"webp")
+        self.assertEqual(response.headers["Content-Type"], "image/webp")
+
+    def test_other_files_are_revalidated(self):
+        """Test that files rewritten under the same name are not cached blindly."""
+        response = self.get("registry/registry.json")
+        self.assertEqual(response.headers["Cache-Control"], "public, no-cache")
+
+    def test_precompressed_variant(self):
+        """Test that the preferred precompressed sibling is sent when accepted."""
+        response = self.get("registry/registry.json", accept_encoding="gzip, br")
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertEqual(response.headers["Content-Type"], "application/json")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(b"".join(response.streaming_content), b"br")
+
+        response = self.get("registry/registry.json", accept_encoding="gzip, br;q=0")
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(b"".join(response.streaming_content), b"gzip")
+
+        response = self.get("registry/registry.json")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(b"".join(response.streaming_content), b"{}")
+
+    def test_not_modified_and_missing(self):
+        """Test conditional requests and missing files."""
+        last_modified = self.get(LOGO).headers["Last-Modified"]
+        response = self.get(LOGO, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("immutable", response.headers["Cache-Control"])
+
+        with self.assertRaises(Http404):
+            self.get("missing.png")
@@ -0,0 +1,96 @@
+from unittest.mock import DEFAULT, patch
+import requests
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from portal_backend.models.models import Organization, SlackNotification
+from portal_backend.notify import (
+    claim_due_notifications,
+    dispatch_notifications,
+    notification_source,
+)
+
+
+@patch("portal_backend.notify.SLACK_WEBHOOK_URL", "https://hooks.slack.test/x")
+@patch("portal_backend.notify.YIVI_PORTAL_URL", "portal.yivi.app")
+@patch("portal_backend.notify.requests.post")
+class SlackNotificationTest(TestCase):
+    """Ensure that Slack notifications go through the outbox."""
+
+    def create_organization(self, slug):
+        return Organization.objects.create(name_en=slug, name_nl=slug, slug=slug)
+
+    def test_saving_does_not_call_slack(self, post):
+        """Test that a save only writes the outbox, in its own transaction."""
+        self.create_organization("first")
+        try:
+            with transaction.atomic():
+                self.create_organization("rolled-back")
+                raise ValueError
+        except ValueError:
+            pass
+
+        post.assert_not_called()
+        self.assertEqual(
+            list(SlackNotification.objects.values_list("subject", "kind")),
+            [("first", SlackNotification.ORGANIZATION_CREATED)],
+        )
+
+    def test_bursts_are_digested(self, post):
+        """Test that a burst of one kind is sent as one digest message."""
+        self.create_organization("manual")
+        with notification_source("import"):
+            for i in range(12):
+                self.create_organization(f"imported-{i}")
+
+        self.assertEqual(dispatch_notifications(), 2)
+
+        texts = [call.kwargs["json"]["text"] for call in post.call_args_list]
+        self.assertIn("New organization created: manual", texts[0])
+        self.assertEqual(
+            texts[1],
+            "12 organizations created by import on portal.yivi.app: "
+            + ", ".join(f"imported-{i}" for i in range(10))
+            + " and 2 more",
+        )
+        self.assertFalse(SlackNotification.objects.exists())
+
+    def test_failures_are_retried_with_backoff(self, post):
+        """Test that a failed message is kept and only retried after a while."""
+        self.create_organization("first")
+        post.side_effect = requests.ConnectionError("Slack is down")
+
+        self.assertEqual(dispatch_notifications(), 0)
+        notification = SlackNotification.objects.get()
+        self.assertEqual(notification.attempts, 1)
+        self.assertEqual(notification.error, "Slack is down")
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+
+        post.side_effect = None
+        self.assertEqual(dispatch_notifications(), 0)
+        self.assertEqual(post.call_count, 1)
+
+        SlackNotification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(dispatch_notifications(), 1)
+        self.assertFalse(SlackNotification.objects.exists())
+
+        # Notifications that failed too often are left for an admin
+        self.create_organization("second")
+        SlackNotification.objects.update(attempts=SlackNotification.MAX_ATTEMPTS)
+        self.assertEqual(dispatch_notifications(), 0)
+        self.assertTrue(SlackNotification.objects.exists())
+
+    def test_claimed_notifications_are_skipped(self, post):
+        """Test that a run doesn't send the notifications another run is sending."""
+        self.create_organization("first")
+        claimed_meanwhile = []
+
+        def claim_while_posting(*args, **kwargs):
+            claimed_meanwhile.extend(claim_due_notifications())
+            return DEFAULT
+
+        post.side_effect = claim_while_posting
+        self.assertEqual(dispatch_notifications(), 1)
+        self.assertEqual(claimed_meanwhile, [])
+        self.assertEqual(post.call_count, 1)
+        self.assertFalse(SlackNotification.objects.exists())
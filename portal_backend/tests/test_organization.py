@@ -1,14 +1,27 @@
+import base64
+import json
 import os
+from io import StringIO
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
-from portal_backend.models.models import Organization
+from portal_backend.models.models import (
+    AttestationProvider,
+    Organization,
+    QueuedEmail,
+    RelyingParty,
+    TrustModel,
+    YiviTrustModelEnv,
+)
 from portal_backend.models.models import User as OrgUser
 from django.contrib.auth import get_user_model
 from portal_backend.scheme_utils.import_utils import load_logo_if_exists
+from portal_backend.services.mail import send_queued_emails
 from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
 from unittest.mock import patch
 from django.db import IntegrityError
 from django.core import mail
+from django.core.management import CommandError, call_command
+from django.utils.text import slugify
 
 
 User = get_user_model()
@@ -159,10 +172,15 @@ class OrganizationMaintainerActionsTest(APITestCase):
                 email="testemail@gmail.com", role="maintainer"
             ).exists()
         )
+        # The email is queued and sent by the send_emails job
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(send_queued_emails(), 1)
         self.assertEqual(len(mail.outbox), 1)  # check if test email was sent
         self.assertEqual(
             mail.outbox[0].subject, "Yivi Portal - You have been added as a maintainer"
         )
+        self.assertEqual(mail.outbox[0].to, ["testemail@gmail.com"])
+        self.assertEqual(QueuedEmail.objects.get().status, QueuedEmail.SENT)
 
     def test_add_maintainer_invalid_email(self):
         """Test should fail when adding a maintainer with an invalid email."""
@@ -253,3 +271,251 @@ class OrganizationMaintainerActionsTest(APITestCase):
 
         self.assertEqual(response.status_code, 400)
         self.assertTrue(user.organizations.filter(slug=self.organization.slug).exists())
+
+
+class OrganizationListSearchTest(APITestCase):
+    """Ensure that the organization list hides demo organizations and ranks matches."""
+
+    def setUp(self):
+        trust_model = TrustModel.objects.create(
+            name="Yivi", description="Yivi Trust Model"
+        )
+        self.yivi_tme = YiviTrustModelEnv.objects.create(
+            trust_model=trust_model,
+            environment="production",
+            timestamp_server="https://timestamp.example.com",
+            contact_website="https://contact.example.com",
+            name_en="Production",
+            name_nl="Productie",
+            description_en="Production environment",
+            description_nl="Productie omgeving",
+            url="https://yivi.example.com",
+        )
+        for name in [
+            "Bank of Utrecht",
+            "Utrecht",
+            "Gemeente Utrecht",
+            "Utrechtse Bank",
+            "Demo Utrecht",
+        ]:
+            organization = Organization.objects.create(
+                name_en=name,
+                name_nl=name,
+                slug=slugify(name),
+                is_verified=True,
+            )
+            AttestationProvider.objects.create(
+                organization=organization,
+                yivi_tme=self.yivi_tme,
+                ap_slug=slugify(name),
+                version="1.0",
+                published=True,
+            )
+
+    def test_demo_organizations_are_flagged(self):
+        """Test that organizations with demo in their name are flagged on save."""
+        self.assertTrue(Organization.objects.get(slug="demo-utrecht").is_demo)
+        self.assertFalse(Organization.objects.get(slug="utrecht").is_demo)
+
+    def test_list_excludes_demo_organizations(self):
+        """Test that demo organizations are not listed."""
+        response = self.client.get(reverse("portal_backend:organization-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [org["slug"] for org in response.data["results"]],
+            ["bank-of-utrecht", "gemeente-utrecht", "utrecht", "utrechtse-bank"],
+        )
+
+    def test_search_ranks_exact_and_prefix_matches_first(self):
+        """Test that exact matches come before prefix and substring matches."""
+        response = self.client.get(
+            reverse("portal_backend:organization-list"), {"search": "utrecht"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [org["slug"] for org in response.data["results"]],
+            ["utrecht", "utrechtse-bank", "bank-of-utrecht", "gemeente-utrecht"],
+        )
+
+    def test_cursor_pagination_walks_pages(self):
+        """Test that cursor pagination visits every organization in both directions."""
+        url = reverse("portal_backend:organization-list")
+        response = self.client.get(url, {"pagination": "cursor", "limit": 2})
+        first_page = [org["slug"] for org in response.data["results"]]
+        self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"])
+        second_page = [org["slug"] for org in response.data["results"]]
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(
+            first_page + second_page,
+            ["bank-of-utrecht", "gemeente-utrecht", "utrecht", "utrechtse-bank"],
+        )
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([org["slug"] for org in response.data["results"]], first_page)
+        self.assertIsNone(response.data["previous"])
+
+    def test_cursor_pagination_stable_under_inserts(self):
+        """Test that rows inserted before the cursor do not shift the next page."""
+        url = reverse("portal_backend:organization-list")
+        response = self.client.get(url, {"pagination": "cursor", "limit": 2})
+        organization = Organization.objects.create(
+            name_en="Aardvark Utrecht",
+            name_nl="Aardvark Utrecht",
+            slug="aardvark-utrecht",
+            is_verified=True,
+        )
+        AttestationProvider.objects.create(
+            organization=organization,
+            yivi_tme=self.yivi_tme,
+            ap_slug="aardvark-utrecht",
+            version="1.0",
+            published=True,
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [org["slug"] for org in response.data["results"]],
+            ["utrecht", "utrechtse-bank"],
+        )
+
+    def test_cursor_pagination_with_search_and_total(self):
+        """Test that cursors follow the search ranking and include a total."""
+        url = reverse("portal_backend:organization-list")
+        response = self.client.get(
+            url,
+            {
+                "search": "utrecht",
+                "pagination": "cursor",
+                "limit": 3,
+                "total": "approximate",
+            },
+        )
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(
+            [org["slug"] for org in response.data["results"]],
+            ["utrecht", "utrechtse-bank", "bank-of-utrecht"],
+        )
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [org["slug"] for org in response.data["results"]], ["gemeente-utrecht"]
+        )
+
+    def test_cursor_pagination_invalid_cursor(self):
+        """Test that a tampered cursor is rejected."""
+        response = self.client.get(
+            reverse("portal_backend:organization-list"), {"cursor": "not-a-cursor"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_pagination_cursor_values(self):
+        """Test that a cursor with values that don't fit the ordering is rejected."""
+        url = reverse("portal_backend:organization-list")
+        for position in (["a", "abc"], [None, None], ["a", {"b": 1}]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({"d": "next", "p": position}).encode()
+            ).decode()
+            response = self.client.get(url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, position)
+
+        response = self.client.get(url, {"pagination": "cursor", "limit": "-1"})
+        self.assertEqual(len(response.data["results"]), 4)
+
+
+class OrganizationRoleFlagsTest(APITestCase):
+    """Ensure that the stored is_rp / is_ap flags follow the published RPs and APs."""
+
+    def setUp(self):
+        trust_model = TrustModel.objects.create(
+            name="Yivi", description="Yivi Trust Model"
+        )
+        self.yivi_tme = YiviTrustModelEnv.objects.create(
+            trust_model=trust_model,
+            environment="production",
+            timestamp_server="https://timestamp.example.com",
+            contact_website="https://contact.example.com",
+            name_en="Production",
+            name_nl="Productie",
+            description_en="Production environment",
+            description_nl="Productie omgeving",
+            url="https://yivi.example.com",
+        )
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.organization = Organization.objects.create(
+            name_en="Test Organization",
+            name_nl="Test Organisatie",
+            slug="test-organization",
+            logo=load_logo_if_exists(os.path.join(current_dir, "test_logo.png")),
+            is_verified=True,
+        )
+
+    def test_publishing_attestation_provider(self):
+        """Test that publishing and unpublishing an AP toggles is_ap."""
+        ap = AttestationProvider.objects.create(
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+            version="1.0",
+            published=True,
+        )
+        self.organization.refresh_from_db()
+        self.assertTrue(self.organization.is_ap)
+        self.assertFalse(self.organization.is_rp)
+
+        ap.published = False
+        ap.save()
+        self.organization.refresh_from_db()
+        self.assertFalse(self.organization.is_ap)
+
+    def test_publishing_and_deleting_relying_party(self):
+        """Test that publishing and deleting an RP toggles is_rp."""
+        rp = RelyingParty.objects.create(
+            organization=self.organization, yivi_tme=self.yivi_tme, rp_slug="rp"
+        )
+        self.organization.refresh_from_db()
+        self.assertFalse(self.organization.is_rp)
+
+        rp.published = True
+        rp.save()
+        self.organization.refresh_from_db()
+        self.assertTrue(self.organization.is_rp)
+
+        rp.delete()
+        self.organization.refresh_from_db()
+        self.assertFalse(self.organization.is_rp)
+
+    def test_unverified_organization_has_no_roles(self):
+        """Test that roles only count once the organization is verified."""
+        self.organization.is_verified = False
+        self.organization.save()
+        RelyingParty.objects.create(
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+            rp_slug="rp",
+            published=True,
+        )
+        self.organization.refresh_from_db()
+        self.assertFalse(self.organization.is_rp)
+
+        self.organization.is_verified = True
+        self.organization.save()
+        self.organization.refresh_from_db()
+        self.assertTrue(self.organization.is_rp)
+
+    def test_refresh_command_repairs_stale_flags(self):
+        """Test that the management command detects and repairs stale flags."""
+        AttestationProvider.objects.create(
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+            version="1.0",
+            published=True,
+        )
+        Organization.objects.update(is_ap=False)
+
+        with self.assertRaises(CommandError):
+            call_command("refresh_organization_roles", "--check", stdout=StringIO())
+
+        call_command("refresh_organization_roles", stdout=StringIO())
+        self.organization.refresh_from_db()
+        self.assertTrue(self.organization.is_ap)
+        self.assertFalse(Organization.objects.with_stale_roles().exists())
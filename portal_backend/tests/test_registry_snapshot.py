@@ -0,0 +1,175 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+import brotli
+from django.core.management import call_command
+from django.test import TestCase
+from portal_backend.models.models import (
+    AttestationProvider,
+    Credential,
+    CredentialAttribute,
+    Organization,
+    RelyingParty,
+    RelyingPartyHostname,
+    TrustModel,
+    YiviTrustModelEnv,
+)
+from portal_backend.scheme_utils.import_utils import load_logo_if_exists
+from portal_backend.services.registry import (
+    SNAPSHOT_NAME,
+    write_atomic,
+    write_registry_snapshot,
+)
+
+
+class RegistrySnapshotTest(TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.path = os.path.join(self.output_dir, SNAPSHOT_NAME)
+
+        trust_model = TrustModel.objects.create(
+            name="Yivi", description="Yivi Trust Model"
+        )
+        yivi_tme = YiviTrustModelEnv.objects.create(
+            trust_model=trust_model,
+            environment="production",
+            timestamp_server="https://timestamp.example.com",
+            contact_website="https://contact.example.com",
+            name_en="Production",
+            name_nl="Productie",
+            description_en="Production environment",
+            description_nl="Productie omgeving",
+            url="https://yivi.example.com",
+        )
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.organization = Organization.objects.create(
+            name_en="Test Organization",
+            name_nl="Test Organisatie",
+            slug="test-organization",
+            logo=load_logo_if_exists(os.path.join(current_dir, "test_logo.png")),
+            is_verified=True,
+        )
+        Organization.objects.create(
+            name_en="Unverified Organization",
+            name_nl="Ongeverifieerde Organisatie",
+            slug="unverified-organization",
+        )
+
+        self.rp = RelyingParty.objects.create(
+            organization=self.organization,
+            yivi_tme=yivi_tme,
+            rp_slug="test-rp",
+            published=True,
+        )
+        RelyingPartyHostname.objects.create(
+            relying_party=self.rp, hostname="test.example.com"
+        )
+        RelyingParty.objects.create(
+            organization=self.organization, yivi_tme=yivi_tme, rp_slug="draft-rp"
+        )
+
+        ap = AttestationProvider.objects.create(
+            organization=self.organization,
+            yivi_tme=yivi_tme,
+            ap_slug="test-ap",
+            version="1.0",
+            published=True,
+        )
+        credential = Credential.objects.create(
+            attestation_provider=ap, credential_id="test-credential", name_en="Test"
+        )
+        CredentialAttribute.objects.create(
+            credential=credential,
+            credential_attribute_tag="name",
+            name_en="Name",
+            name_nl="Naam",
+            description_en="Your name",
+            description_nl="Je naam",
+        )
+
+    def read_snapshot(self):
+        with open(self.path, "rb") as f:
+            return json.load(f)
+
+    def test_snapshot_contains_public_registry(self):
+        """Test that only verified organizations and published entities are exported."""
+        self.assertTrue(write_registry_snapshot(self.output_dir))
+
+        snapshot = self.read_snapshot()
+        self.assertEqual(snapshot["schema_version"], 1)
+        self.assertEqual(
+            [org["slug"] for org in snapshot["organizations"]], ["test-organization"]
+        )
+        org = snapshot["organizations"][0]
+        self.assertTrue(org["is_rp"])
+        self.assertTrue(org["is_ap"])
+        self.assertEqual(org["relying_parties"][0]["hostnames"], ["test.example.com"])
+        self.assertEqual(len(org["relying_parties"]), 1)
+        credential = org["attestation_providers"][0]["credentials"][0]
+        self.assertEqual(
+            credential["full_path"], "pbdf.test-organization.test-credential"
+        )
+        self.assertEqual(
+            credential["attributes"][0]["full_path"],
+            "pbdf.test-organization.test-credential.name",
+        )
+
+    def test_compressed_variant_matches(self):
+        """Test that the compressed variants decompress to the JSON snapshot."""
+        write_registry_snapshot(self.output_dir)
+
+        with open(self.path, "rb") as f, open(f"{self.path}.gz", "rb") as gz:
+            self.assertEqual(gzip.decompress(gz.read()), f.read())
+        with open(self.path, "rb") as f, open(f"{self.path}.br", "rb") as br:
+            self.assertEqual(brotli.decompress(br.read()), f.read())
+
+    def test_concurrent_writers(self):
+        """Test that a writer that overlaps with another doesn't break its write."""
+        replace = os.replace
+        overlapped = []
+
+        def overlapping_replace(src, dst):
+            # Another writer, e.g. export_registry, writes while this one replaces
+            if not overlapped:
+                overlapped.append(dst)
+                write_atomic(self.path, b"second")
+            replace(src, dst)
+
+        with patch("portal_backend.services.registry.os.replace", overlapping_replace):
+            write_atomic(self.path, b"first")
+
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"first")
+        self.assertEqual(os.listdir(self.output_dir), [SNAPSHOT_NAME])
+
+    def test_unchanged_registry_is_not_rewritten(self):
+        """Test that the snapshot only changes when the registry does."""
+        write_registry_snapshot(self.output_dir)
+        version = self.read_snapshot()["version"]
+        mtime = os.stat(self.path).st_mtime_ns
+
+        self.assertFalse(write_registry_snapshot(self.output_dir))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, mtime)
+
+        RelyingPartyHostname.objects.create(
+            relying_party=self.rp, hostname="other.example.com"
+        )
+        self.assertTrue(write_registry_snapshot(self.output_dir))
+        self.assertNotEqual(self.read_snapshot()["version"], version)
+
+    def test_export_registry_command(self):
+        """Test that the management command writes the snapshot."""
+        out = StringIO()
+        call_command("export_registry", output_dir=self.output_dir, stdout=out)
+        self.assertIn("Wrote registry snapshot", out.getvalue())
+        self.assertTrue(os.path.exists(f"{self.path}.gz"))
+        self.assertTrue(os.path.exists(f"{self.path}.br"))
+
+        out = StringIO()
+        call_command("export_registry", output_dir=self.output_dir, stdout=out)
+        self.assertIn("up to date", out.getvalue())
@@ -1,3 +1,5 @@
+import json
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
@@ -17,7 +19,8 @@ from portal_backend.models.models import User as OrgUser
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
 from unittest.mock import patch
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
@@ -191,6 +194,83 @@ class RelyingPartyCreateTest(APITestCase):
                 ).exists()
             )
 
+    def test_create_relying_party_query_budget(self):
+        """Test that the number of queries doesn't grow with the attributes."""
+        url = reverse("portal_backend:rp-create", args=[self.organization.slug])
+        attributes = CredentialAttribute.objects.bulk_create(
+            CredentialAttribute(
+                credential=self.credential,
+                credential_attribute_tag=f"attr-{i}",
+                name_en=f"Attribute {i}",
+                name_nl=f"Kenmerk {i}",
+                description_en="Description",
+                description_nl="Beschrijving",
+            )
+            for i in range(2, 52)
+        )
+        data = {
+            **self.relying_party_data,
+            "attributes": [
+                {
+                    "credential_id": self.credential.id,
+                    "credential_attribute_tag": attr.name_en,
+                    "reason_en": "Reason",
+                    "reason_nl": "Reden",
+                }
+                for attr in attributes
+            ],
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertLessEqual(len(queries), 25)
+        self.assertEqual(
+            sum("portal_backend_credentialattribute" in q["sql"] for q in queries), 1
+        )
+        condiscon = Condiscon.objects.get(relying_party__rp_slug="test-relying-party")
+        self.assertEqual(
+            CondisconAttribute.objects.filter(condiscon=condiscon).count(), 50
+        )
+        self.assertEqual(
+            condiscon.condiscon["disclose"],
+            [[[attr.name_en for attr in attributes]]],
+        )
+
+    def test_create_relying_party_invalid_attributes(self):
+        """Test that every invalid attribute is reported."""
+        url = reverse("portal_backend:rp-create", args=[self.organization.slug])
+        valid = self.relying_party_data["attributes"][0]
+        data = {
+            **self.relying_party_data,
+            "attributes": [
+                valid,
+                {**valid, "credential_attribute_tag": "Unknown"},
+                {**valid, "credential_id": "not a number"},
+            ],
+        }
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        error = response.data["error"]
+        self.assertIn(
+            f"Attribute 1: credential {self.credential.id} has no attribute Unknown.",
+            error,
+        )
+        self.assertIn("Attribute 2: a credential_id", error)
+        self.assertNotIn("Attribute 0", error)
+
+        data["attributes"] = [{**valid, "reason_en": ""}]
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Attribute 0: reason_en", response.data["error"])
+        self.assertFalse(
+            RelyingParty.objects.filter(rp_slug="test-relying-party").exists()
+        )
+
     def test_patch_relying_party_success(self):
         """Test updating a relying party with valid data."""
 
@@ -326,6 +406,46 @@ class RelyingPartyCreateTest(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
 
+    def test_permission_resolved_from_token_claims(self):
+        """Test that the role claim avoids looking up the maintainer on every check."""
+        token = AccessToken.for_user(self.user)
+        token["role"] = "maintainer"
+        token["organizationSlugs"] = [self.organization.slug]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token)}")
+        url = reverse(
+            "portal_backend:rp-detail",
+            args=[
+                self.existing_rp.organization.slug,
+                self.existing_rp.yivi_tme.environment,
+                self.existing_rp.rp_slug,
+            ],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            any("portal_backend_user" in query["sql"] for query in queries)
+        )
+
+    def test_admin_role_claim_grants_access(self):
+        """Test that an admin can view unpublished relying parties of any organization."""
+        token = AccessToken.for_user(self.user)
+        token["role"] = "admin"
+        token["organizationSlugs"] = []
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {str(token)}")
+        url = reverse(
+            "portal_backend:rp-detail",
+            args=[
+                self.existing_rp.organization.slug,
+                self.existing_rp.yivi_tme.environment,
+                self.existing_rp.rp_slug,
+            ],
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
     def test_hostname_validation_malformed(self):
         """Test various invalid hostnames"""
         url = reverse("portal_backend:rp-create", args=[self.organization.slug])
@@ -376,3 +496,340 @@ class RelyingPartyCreateTest(APITestCase):
                 self.assertTrue(
                     RelyingParty.objects.filter(rp_slug=new_data["rp_slug"]).exists()
                 )
+
+    def test_patch_hostnames_reconciles_in_bulk(self):
+        """Test that hostnames are renamed, added and deleted in one request."""
+        keep, rename, delete = RelyingPartyHostname.objects.bulk_create(
+            RelyingPartyHostname(relying_party=self.existing_rp, hostname=hostname)
+            for hostname in ("keep.example.com", "rename.example.com", "gone.nl")
+        )
+        other_rp = RelyingParty.objects.create(
+            rp_slug="other-relying-party",
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+        )
+        RelyingPartyHostname.objects.bulk_create(
+            RelyingPartyHostname(relying_party=other_rp, hostname=f"other{i}.nl")
+            for i in range(20)
+        )
+        url = reverse(
+            "portal_backend:rp-update",
+            args=[self.organization.slug, self.existing_rp.rp_slug],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                url,
+                {
+                    "hostnames": [
+                        {"id": keep.id, "hostname": "keep.example.com"},
+                        {"id": rename.id, "hostname": "renamed.example.com"},
+                        # The name of a deleted hostname may be reused
+                        {"hostname": "gone.nl"},
+                    ]
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [h["hostname"] for h in response.data["hostnames"]],
+            ["keep.example.com", "renamed.example.com", "gone.nl"],
+        )
+        self.assertEqual(
+            set(self.existing_rp.hostnames.values_list("hostname", flat=True)),
+            {"keep.example.com", "renamed.example.com", "gone.nl"},
+        )
+        self.assertFalse(RelyingPartyHostname.objects.filter(id=delete.id).exists())
+        self.assertEqual(
+            RelyingPartyHostname.objects.get(id=keep.id).dns_challenge, None
+        )
+        # Only this relying party's hostnames and the submitted names are read
+        for query in queries:
+            sql = query["sql"]
+            if sql.startswith("SELECT") and "relyingpartyhostname" in sql:
+                self.assertIn("WHERE", sql)
+
+    def test_patch_hostnames_conflicts(self):
+        """Test that every hostname of another relying party is reported."""
+        other_rp = RelyingParty.objects.create(
+            rp_slug="other-relying-party",
+            organization=self.organization,
+            yivi_tme=self.yivi_tme,
+        )
+        RelyingPartyHostname.objects.bulk_create(
+            RelyingPartyHostname(relying_party=other_rp, hostname=hostname)
+            for hostname in ("taken.nl", "also-taken.nl")
+        )
+        url = reverse(
+            "portal_backend:rp-update",
+            args=[self.organization.slug, self.existing_rp.rp_slug],
+        )
+
+        response = self.client.patch(
+            url,
+            {
+                "hostnames": [
+                    {"hostname": "taken.nl"},
+                    {"hostname": "also-taken.nl"},
+                    {"hostname": "free.nl"},
+                    {"hostname": "free.nl"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        error = response.data["error"]
+        self.assertIn("Hostname already exists: taken.nl", error)
+        self.assertIn("Hostname already exists: also-taken.nl", error)
+        self.assertIn("Hostname submitted more than once: free.nl", error)
+        self.assertFalse(self.existing_rp.hostnames.exists())
+
+    def test_patch_attributes_writes_only_changes(self):
+        """Test that unchanged condiscon attributes are left alone."""
+        extra = CredentialAttribute.objects.bulk_create(
+            CredentialAttribute(
+                credential=self.credential,
+                credential_attribute_tag=f"attr-{i}",
+                name_en=f"Attribute {i}",
+                name_nl=f"Kenmerk {i}",
+                description_en="Description",
+                description_nl="Beschrijving",
+            )
+            for i in range(2, 5)
+        )
+        attributes = [
+            {
+                "credential_id": self.credential.id,
+                "credential_attribute_tag": attr.name_en,
+                "reason_en": "Reason",
+                "reason_nl": "Reden",
+            }
+            for attr in [self.credential_attribute, *extra]
+        ]
+        create_url = reverse("portal_backend:rp-create", args=[self.organization.slug])
+        data = {**self.relying_party_data, "attributes": attributes[:3]}
+        self.assertEqual(
+            self.client.post(create_url, data, format="json").status_code, 201
+        )
+        condiscon = Condiscon.objects.get(relying_party__rp_slug="test-relying-party")
+        stored = dict(
+            CondisconAttribute.objects.filter(condiscon=condiscon).values_list(
+                "credential_attribute_id", "id"
+            )
+        )
+        url = reverse(
+            "portal_backend:rp-update",
+            args=[self.organization.slug, "test-relying-party"],
+        )
+
+        # Keep the first, change the reason of the second, drop the third, add one
+        submitted = [
+            attributes[0],
+            {**attributes[1], "reason_en": "Other reason"},
+            attributes[3],
+        ]
+        response = self.client.patch(url, {"attributes": submitted}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        rows = {
+            row.credential_attribute_id: row
+            for row in CondisconAttribute.objects.filter(condiscon=condiscon)
+        }
+        self.assertEqual(
+            set(rows), {self.credential_attribute.id, extra[0].id, extra[2].id}
+        )
+        self.assertEqual(
+            rows[self.credential_attribute.id].id, stored[self.credential_attribute.id]
+        )
+        self.assertEqual(rows[extra[0].id].id, stored[extra[0].id])
+        self.assertEqual(rows[extra[0].id].reason_en, "Other reason")
+        condiscon.refresh_from_db()
+        self.assertEqual(
+            condiscon.condiscon["disclose"],
+            [[[self.credential_attribute.name_en, extra[0].name_en, extra[2].name_en]]],
+        )
+
+        # Submitting the same attributes again writes nothing
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {"attributes": submitted}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            [
+                query
+                for query in queries
+                if "condiscon" in query["sql"]
+                and not query["sql"].startswith(("SELECT", "SAVEPOINT", "RELEASE"))
+            ]
+        )
+
+    def test_create_rejects_duplicate_attributes(self):
+        """Test that an attribute can't be requested twice by a new relying party."""
+        url = reverse("portal_backend:rp-create", args=[self.organization.slug])
+        attribute = self.relying_party_data["attributes"][0]
+        data = {**self.relying_party_data, "attributes": [attribute, attribute]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Attribute 1: attribute", response.data["error"])
+        self.assertIn("is requested more than once", response.data["error"])
+
+    def test_patch_attributes_rejects_duplicates(self):
+        """Test that an update can't request an attribute twice."""
+        create_url = reverse("portal_backend:rp-create", args=[self.organization.slug])
+        self.assertEqual(
+            self.client.post(
+                create_url, self.relying_party_data, format="json"
+            ).status_code,
+            201,
+        )
+        condiscon = Condiscon.objects.get(relying_party__rp_slug="test-relying-party")
+        url = reverse(
+            "portal_backend:rp-update",
+            args=[self.organization.slug, "test-relying-party"],
+        )
+        attribute = {
+            **self.relying_party_data["attributes"][0],
+            "reason_en": "Other reason",
+        }
+
+        response = self.client.patch(
+            url, {"attributes": [attribute, attribute]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Attribute 1: attribute", response.data["error"])
+        self.assertIn("is requested more than once", response.data["error"])
+        # Nothing of the update is stored
+        self.assertEqual(
+            list(
+                CondisconAttribute.objects.filter(condiscon=condiscon).values_list(
+                    "reason_en", flat=True
+                )
+            ),
+            [self.relying_party_data["attributes"][0]["reason_en"]],
+        )
+
+    def batch_upload(self, name, content, **data):
+        url = reverse("portal_backend:rp-batch-create", args=[self.organization.slug])
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(url, {"file": upload, **data}, format="multipart")
+
+    def batch_line(self, rp_slug, *hostnames, **extra):
+        return json.dumps(
+            {
+                "rp_slug": rp_slug,
+                "hostnames": [{"hostname": hostname} for hostname in hostnames],
+                "context_description_en": "Context",
+                "context_description_nl": "Context",
+                "attributes": self.relying_party_data["attributes"],
+                **extra,
+            }
+        )
+
+    def test_batch_create_json_lines(self):
+        """Test that all relying parties of an upload are created in bulk."""
+        lines = [self.batch_line(f"batch-{i}", f"batch-{i}.nl") for i in range(20)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.batch_upload("rps.jsonl", "\n".join(lines))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 20)
+        self.assertLessEqual(len(queries), 25)
+        relying_party = RelyingParty.objects.get(rp_slug="batch-7")
+        self.assertEqual(relying_party.organization, self.organization)
+        self.assertEqual(
+            list(relying_party.hostnames.values_list("hostname", flat=True)),
+            ["batch-7.nl"],
+        )
+        self.assertEqual(
+            CondisconAttribute.objects.filter(
+                condiscon__relying_party=relying_party
+            ).count(),
+            1,
+        )
+        result = response.data["results"][7]
+        self.assertEqual(result["line"], 8)
+        self.assertEqual(result["status"], "created")
+        self.assertEqual(
+            result["hostnames"][0]["dns_challenge"],
+            relying_party.hostnames.get().dns_challenge,
+        )
+
+    def test_batch_create_reports_per_item(self):
+        """Test that valid relying parties are created and invalid ones reported."""
+        RelyingPartyHostname.objects.create(
+            relying_party=self.existing_rp, hostname="taken.nl"
+        )
+        lines = [
+            self.batch_line("batch-ok", "ok.nl"),
+            self.batch_line("batch-taken", "taken.nl"),
+            self.batch_line("batch-ok", "other.nl"),
+            "{not json",
+            self.batch_line(
+                "batch-attribute",
+                "attribute.nl",
+                attributes=[{"credential_id": 0, "credential_attribute_tag": "x"}],
+            ),
+        ]
+
+        response = self.batch_upload("rps.jsonl", "\n".join(lines))
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["failed"], 4)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created", "error", "error", "error", "error"],
+        )
+        self.assertIn("Hostname already exists: taken.nl", results[1]["errors"])
+        self.assertIn("rp_slug occurs more than once: batch-ok", results[2]["errors"])
+        self.assertIn("Invalid JSON", results[3]["errors"][0])
+        self.assertIn("credential 0 has no attribute x", results[4]["errors"][0])
+        self.assertEqual(
+            list(
+                RelyingParty.objects.filter(rp_slug__startswith="batch").values_list(
+                    "rp_slug", flat=True
+                )
+            ),
+            ["batch-ok"],
+        )
+
+    def test_batch_create_atomic(self):
+        """Test that nothing is created in all-or-nothing mode if an item fails."""
+        lines = [self.batch_line("batch-ok", "ok.nl"), self.batch_line("batch-bad")]
+
+        response = self.batch_upload("rps.jsonl", "\n".join(lines), atomic="true")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [result["status"] for result in response.data["results"]],
+            ["skipped", "error"],
+        )
+        self.assertFalse(RelyingParty.objects.filter(rp_slug="batch-ok").exists())
+
+    def test_batch_create_csv(self):
+        """Test that CSV rows with the same rp_slug form one relying party."""
+        attribute = self.credential_attribute.name_en
+        content = (
+            "rp_slug,hostname,credential_id,credential_attribute_tag,reason_en,"
+            "reason_nl,context_description_en,context_description_nl\n"
+            f"csv-rp,csv.nl,{self.credential.id},{attribute},Reason,Reden,Context,Context\n"
+            "csv-rp,www.csv.nl,,,,,,\n"
+        )
+
+        response = self.batch_upload("rps.csv", content)
+
+        self.assertEqual(response.status_code, 201)
+        relying_party = RelyingParty.objects.get(rp_slug="csv-rp")
+        self.assertEqual(
+            set(relying_party.hostnames.values_list("hostname", flat=True)),
+            {"csv.nl", "www.csv.nl"},
+        )
+        condiscon = relying_party.condiscons.get()
+        self.assertEqual(condiscon.context_description_en, "Context")
+        self.assertEqual(condiscon.condiscon["disclose"], [[[attribute]]])
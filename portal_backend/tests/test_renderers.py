@@ -0,0 +1,66 @@
+import datetime
+import decimal
+import io
+import uuid
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from django_countries.fields import Country  # type: ignore
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from portal_backend.views.renderers import (
+    FastJSONParser,
+    FastJSONRenderer,
+    PortalJSONEncoder,
+)
+
+
+class StdlibJSONRenderer(JSONRenderer):
+    encoder_class = PortalJSONEncoder
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    """Ensure that the orjson renderer is a drop-in replacement for DRF's renderer."""
+
+    data = {
+        "id": uuid.UUID("0b5d7a3c-27bb-4b4c-9d09-2d1a8e0d1b43"),
+        "created_at": datetime.datetime(
+            2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        ),
+        "local": timezone.make_aware(datetime.datetime(2025, 1, 2, 3, 4, 5)),
+        "deprecated_since": datetime.date(2025, 1, 2),
+        "time": datetime.time(3, 4, 5),
+        "amount": decimal.Decimal("1.50"),
+        "label": gettext_lazy("Organization"),
+        "country": Country("NL"),
+        "name": "Gemeente \u2028 Ünïcode",
+        "nested": [{"optional": True, "count": 3, "missing": None}],
+        "tags": ("a", "b"),
+    }
+
+    def test_matches_stdlib_renderer(self):
+        """Test that both renderers produce the same bytes."""
+        self.assertEqual(
+            FastJSONRenderer().render(self.data), StdlibJSONRenderer().render(self.data)
+        )
+
+    def test_country_is_rendered_as_code(self):
+        """Test that country values are rendered as their code."""
+        self.assertEqual(
+            FastJSONRenderer().render({"country": Country("NL")}), b'{"country":"NL"}'
+        )
+
+    def test_indented_output_uses_stdlib(self):
+        """Test that an indent requested by the client is honoured."""
+        output = FastJSONRenderer().render({"a": 1}, "application/json; indent=2", {})
+        self.assertEqual(output, b'{\n  "a": 1\n}')
+
+    def test_parser(self):
+        """Test that request bodies are parsed and invalid JSON is rejected."""
+        parser = FastJSONParser()
+        self.assertEqual(
+            parser.parse(io.BytesIO('{"name":"Ünïcode"}'.encode("utf-8"))),
+            {"name": "Ünïcode"},
+        )
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b"{invalid"))
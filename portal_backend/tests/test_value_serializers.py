@@ -0,0 +1,172 @@
+import datetime
+import os
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
+from portal_backend.models.model_serializers import (
+    CredentialListSerializer,
+    OrganizationSerializer,
+)
+from portal_backend.models.models import (
+    AttestationProvider,
+    Credential,
+    CredentialAttribute,
+    Organization,
+    RelyingParty,
+    TrustModel,
+    YiviTrustModelEnv,
+)
+from portal_backend.models.value_serializers import (
+    organization_values,
+    serialize_credentials,
+    serialize_organizations,
+)
+from portal_backend.scheme_utils.import_utils import load_logo_if_exists
+
+
+class ValueSerializersGoldenTest(APITestCase):
+    """Ensure that the values() based list serialization matches the serializers."""
+
+    def setUp(self):
+        self.client = APIClient()
+        yivi = TrustModel.objects.create(name="Yivi", description="Yivi Trust Model")
+        eudi = TrustModel.objects.create(
+            name="EUDI", description="EUDI Trust Model", eudi_compliant=True
+        )
+        environments = [
+            YiviTrustModelEnv.objects.create(
+                trust_model=yivi,
+                environment=environment,
+                timestamp_server="https://timestamp.example.com",
+                contact_website="https://contact.example.com",
+                name_en=environment,
+                name_nl=environment,
+                description_en=environment,
+                description_nl=environment,
+                url="https://yivi.example.com",
+            )
+            for environment in ("production", "demo", "staging")
+        ]
+
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        full = Organization.objects.create(
+            name_en="Gemeente Ünïcode",
+            name_nl="Gemeente Ünïcode",
+            slug="gemeente",
+            logo=load_logo_if_exists(os.path.join(current_dir, "test_logo.png")),
+            is_verified=True,
+            contact_number="+31612345678",
+            country="NL",
+            street="Straat",
+            house_number="1a",
+            postal_code="1234 AB",
+            city="Nijmegen",
+        )
+        full.trust_models.add(yivi, eudi)
+        sparse = Organization.objects.create(
+            name_en="Sparse", name_nl="Sparse", slug="sparse"
+        )
+        sparse.trust_models.add(yivi)
+
+        for i, (organization, environment) in enumerate(
+            [
+                (full, environments[0]),
+                (full, environments[1]),
+                (sparse, environments[2]),
+            ]
+        ):
+            ap = AttestationProvider.objects.create(
+                organization=organization,
+                yivi_tme=environment,
+                ap_slug=f"ap-{i}" if i else None,
+                version="1.0",
+                published=True,
+            )
+            credential = Credential.objects.create(
+                attestation_provider=ap,
+                credential_id=f"credential-{i}",
+                name_en="Same name",
+                name_nl=f"Credential {i}",
+                description_en="Line\u2028separator" if i == 0 else None,
+                issue_url="https://issue.example.com" if i else None,
+                deprecated_since=datetime.date(2024, 5, 1) if i == 2 else None,
+            )
+            for tag in ("b", "a", "c")[: i + 1]:
+                CredentialAttribute.objects.create(
+                    credential=credential,
+                    credential_attribute_tag=tag,
+                    name_en=f"Attribute {tag}",
+                    name_nl=f"Attribuut {tag}",
+                    description_en="",
+                    description_nl="",
+                    optional=tag == "a",
+                )
+        RelyingParty.objects.create(
+            organization=sparse,
+            yivi_tme=environments[0],
+            rp_slug="rp",
+            published=True,
+        )
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_organizations_match_serializer(self):
+        """Test that organization rows render to the same bytes as the serializer."""
+        organizations = Organization.objects.prefetch_related("trust_models").order_by(
+            "name_en", "id"
+        )
+        expected = OrganizationSerializer(organizations, many=True).data
+        rows = organization_values(organizations)
+        self.assertEqual(
+            self.render(serialize_organizations(rows)), self.render(expected)
+        )
+
+    def test_credentials_match_serializer(self):
+        """Test that credential rows render to the same bytes as the serializer."""
+        credentials = (
+            Credential.objects.select_related(
+                "attestation_provider__yivi_tme",
+                "attestation_provider__organization",
+            )
+            .prefetch_related("attributes")
+            .order_by("name_en", "id")
+        )
+        expected = CredentialListSerializer(credentials, many=True).data
+        with self.assertNumQueries(2):
+            actual = serialize_credentials(credentials)
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_list_views_match_serializer(self):
+        """Test that the public list views still return the serializer output."""
+        credentials = Credential.objects.order_by("name_en", "id")
+        response = self.client.get(reverse("portal_backend:credential-list"))
+        self.assertEqual(
+            response.content,
+            self.render(
+                {
+                    "credentials": CredentialListSerializer(
+                        credentials.filter(deprecated_since__isnull=True), many=True
+                    ).data
+                }
+            ),
+        )
+
+        response = self.client.get(
+            reverse("portal_backend:credentials-list-with-deprecated")
+        )
+        self.assertEqual(
+            response.content,
+            self.render(CredentialListSerializer(credentials, many=True).data),
+        )
+
+        response = self.client.get(reverse("portal_backend:organization-list"))
+        organizations = Organization.objects.filter(
+            is_rp=True
+        ) | Organization.objects.filter(is_ap=True)
+        self.assertEqual(
+            response.json()["results"],
+            OrganizationSerializer(
+                organizations.order_by("name_en", "id"), many=True
+            ).data,
+        )
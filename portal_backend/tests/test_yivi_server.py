@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from django.contrib.auth import get_user_model
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, override_settings
+from yivi_auth import async_views, yivi
+from yivi_auth.session_status import status_events
+from yivi_auth.stub import StubYiviServer
+from yivi_auth.yivi import (
+    AsyncYiviServer,
+    YiviException,
+    YiviServer,
+    close_async_client,
+)
+
+
+class YiviServerTest(SimpleTestCase):
+    """Ensure that Yivi server calls share connections and fail in time."""
+
+    def setUp(self):
+        self.stub = StubYiviServer().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        yivi.timings.reset()
+
+    def test_connections_are_reused(self):
+        """Test that the calls of a login flow share one connection."""
+        for _ in range(3):
+            # Views create a YiviServer per request
+            yivi_server = YiviServer(self.stub.url, token="secret")
+            session = yivi_server.start_session({"disclose": []})
+            yivi_server.session_status(session["token"])
+            result = yivi_server.session_result(session["token"])
+
+        self.assertEqual(result["disclosed"][0][0]["rawvalue"], "test@example.com")
+        self.assertEqual(self.stub.connections, 1)
+        self.assertEqual(len(self.stub.requests), 9)
+        timings = yivi.timings.snapshot()
+        self.assertEqual(timings["GET /session/<token>/result"]["count"], 3)
+        self.assertEqual(timings["POST /session/"]["count"], 3)
+
+    @override_settings(YIVI_SERVER_READ_TIMEOUT=0.1)
+    def test_read_timeout(self):
+        """Test that a slow Yivi server doesn't keep the worker waiting."""
+        self.stub.delay = 0.5
+        start = time.perf_counter()
+        with self.assertRaises(YiviException) as cm:
+            YiviServer(self.stub.url).start_session({"disclose": []})
+
+        self.assertEqual(cm.exception.http_status, 504)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(len(self.stub.requests), 1)
+
+    def test_connection_error(self):
+        """Test that an unreachable Yivi server is reported as a bad gateway."""
+        closed = StubYiviServer()
+        url = closed.url
+        closed.server_close()
+
+        with self.assertRaises(YiviException) as cm:
+            YiviServer(url).session_result("token")
+        self.assertEqual(cm.exception.http_status, 502)
+
+    def test_retries(self):
+        """Test that only idempotent calls are retried on an unavailable server."""
+        self.stub.fail_next = [503]
+        result = YiviServer(self.stub.url).session_result("token")
+        self.assertEqual(result["status"], "DONE")
+        self.assertEqual(len(self.stub.requests), 2)
+
+        self.stub.fail_next = [503]
+        with self.assertRaises(YiviException) as cm:
+            YiviServer(self.stub.url).start_session({"disclose": []})
+        self.assertEqual(cm.exception.http_status, 503)
+        self.assertEqual(cm.exception.reason, "STUB")
+        self.assertEqual(len(self.stub.requests), 3)
+
+
+class AsyncYiviServerTest(TestCase):
+    """Ensure that the async proxy views answer like the synchronous ones."""
+
+    def setUp(self):
+        self.stub = StubYiviServer().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        self.factory = AsyncRequestFactory()
+        settings_override = override_settings(YIVI_SERVER_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    async def test_connections_are_reused(self):
+        """Test that the calls in one event loop share one connection."""
+        try:
+            for _ in range(3):
+                yivi_server = AsyncYiviServer(self.stub.url)
+                session = await yivi_server.start_session({"disclose": []})
+                await yivi_server.session_status(session["token"])
+                await yivi_server.session_result(session["token"])
+        finally:
+            await close_async_client()
+
+        self.assertEqual(len(self.stub.requests), 9)
+        self.assertEqual(self.stub.connections, 1)
+
+    async def test_login(self):
+        """Test that a login through the async views returns the tokens."""
+        view = async_views.AsyncYiviSessionProxyStartView.as_view()
+        result_view = async_views.AsyncYiviSessionProxyResultView.as_view()
+        try:
+            response = await view(self.factory.post("/v1/session/"))
+            token = json.loads(response.content)["token"]
+            response = await result_view(
+                self.factory.get(f"/v1/token/{token}"), yivi_token=token
+            )
+        finally:
+            await close_async_client()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", json.loads(response.content))
+        self.assertTrue(response.cookies["refresh_token"]["httponly"])
+        self.assertTrue(
+            await get_user_model().objects.filter(email="test@example.com").aexists()
+        )
+        self.assertEqual(
+            self.stub.requests,
+            [("POST", "/session/"), ("GET", "/session/stub-token/result")],
+        )
+
+    async def test_demo_issuance(self):
+        """Test that demo sessions are started and Yivi server errors passed on."""
+        view = async_views.AsyncYiviIssueDemosView.as_view()
+        self.stub.fail_next = [400]
+        try:
+            response = await view(
+                self.factory.post(
+                    "/v1/demo-issuance",
+                    {"credential": "irma-demo.test", "attributes": {"a": "b"}},
+                    content_type="application/json",
+                )
+            )
+            self.assertEqual(response.status_code, 400)
+
+            response = await view(
+                self.factory.post(
+                    "/v1/demo-issuance",
+                    {"credential": "irma-demo.test", "attributes": {"a": "b"}},
+                    content_type="application/json",
+                )
+            )
+        finally:
+            await close_async_client()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["token"], "stub-token")
+
+    @override_settings(YIVI_SERVER_READ_TIMEOUT=0.1)
+    async def test_timeout_and_retries(self):
+        """Test that a slow server times out and that only GETs are retried."""
+        view = async_views.AsyncYiviDemoIssuanceResultView.as_view()
+        try:
+            self.stub.fail_next = [503]
+            response = await view(self.factory.get("/"), yivi_token="token")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(self.stub.requests), 2)
+
+            self.stub.delay = 0.5
+            response = await view(self.factory.get("/"), yivi_token="token")
+            self.assertEqual(response.status_code, 504)
+        finally:
+            await close_async_client()
+
+
+@override_settings(YIVI_SESSION_STATUS_POLL_INTERVAL=0.01)
+class SessionStatusEventsTest(SimpleTestCase):
+    """Ensure that all listeners of a session share one upstream poller."""
+
+    def setUp(self):
+        self.stub = StubYiviServer().__enter__()
+        self.addCleanup(self.stub.__exit__)
+        settings_override = override_settings(YIVI_SERVER_URL=self.stub.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    async def listen(self, token):
+        return [event async for event in status_events(token)]
+
+    async def test_listeners_share_poller(self):
+        """Test that every listener gets each status change once."""
+        self.stub.statuses = ["INITIALIZED", "INITIALIZED", "CONNECTED", "DONE"]
+        try:
+            first, second = await asyncio.gather(
+                self.listen("token"), self.listen("token")
+            )
+        finally:
+            await close_async_client()
+
+        expected = [
+            f'event: status\ndata: "{status}"\n\n'
+            for status in ("INITIALIZED", "CONNECTED", "DONE")
+        ]
+        self.assertEqual(first, expected)
+        self.assertEqual(second, expected)
+        self.assertEqual(self.stub.requests, [("GET", "/session/token/status")] * 4)
+
+    async def test_unknown_session(self):
+        """Test that an error of the Yivi server ends the stream."""
+        self.stub.fail_next = [400]
+        view = async_views.YiviSessionStatusEventsView.as_view()
+        try:
+            response = await view(AsyncRequestFactory().get("/"), yivi_token="token")
+            events = [event async for event in response.streaming_content]
+        finally:
+            await close_async_client()
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(len(events), 1)
+        self.assertTrue(events[0].startswith(b"event: error\n"))
@@ -7,6 +7,7 @@ class HostnameEntry(TypedDict):
 
 
 class AttributeEntry(TypedDict):
+    credential_id: int
     credential_attribute_tag: str
     reason_en: str
     reason_nl: str
@@ -26,6 +26,7 @@ from portal_backend.views.relying_party import (
     RelyingPartyHostnameStatusView,
     RelyingPartyListView,
     RelyingPartyCreateView,
+    RelyingPartyBatchCreateView,
     RelyingPartyUpdateView,
     RelyingPartyRetrieveView,
     RelyingPartyDeleteView,
@@ -96,6 +97,11 @@ urlpatterns = [
         RelyingPartyCreateView.as_view(),
         name="rp-create",
     ),
+    path(
+        "v1/yivi/organizations/<str:org_slug>/relying-party/batch-create/",
+        RelyingPartyBatchCreateView.as_view(),
+        name="rp-batch-create",
+    ),
     path(
         "v1/yivi/organizations/<str:org_slug>/relying-party/<str:rp_slug>/",
         RelyingPartyUpdateView.as_view(),
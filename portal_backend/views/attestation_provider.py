@@ -4,7 +4,11 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema  # type: ignore
-from portal_backend.models.models import AttestationProvider, Organization
+from portal_backend.models.models import (
+    AttestationProvider,
+    Organization,
+    RegistryVersion,
+)
 from portal_backend.models.model_serializers import (
     AttestationProviderSerializer,
 )
@@ -13,6 +17,11 @@ from rest_framework import permissions
 
 class AttestationProviderListView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.ATTESTATION_PROVIDERS,
+        RegistryVersion.TRUST_MODELS,
+    )
 
     def get(self, request: Request, org_slug: str) -> Response:
         organization = get_object_or_404(Organization, slug=org_slug)
@@ -35,6 +44,12 @@ class AttestationProviderListView(APIView):
 
 class AttestationProviderRetrieveView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.ATTESTATION_PROVIDERS,
+        RegistryVersion.TRUST_MODELS,
+        RegistryVersion.CREDENTIALS,
+    )
 
     @swagger_auto_schema(responses={200: "Success", 404: "Not Found"})
     def get(
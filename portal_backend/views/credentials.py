@@ -1,31 +1,43 @@
 from rest_framework.request import Request
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from portal_backend.models.models import Credential
-from portal_backend.models.model_serializers import (
-    CredentialListSerializer,
-)
+from portal_backend.models.models import Credential, RegistryVersion
+from portal_backend.models.value_serializers import serialize_credentials
 from rest_framework import permissions, status
+from .. import cache as registry_cache
 
 
 class CredentialListView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.ATTESTATION_PROVIDERS,
+        RegistryVersion.TRUST_MODELS,
+        RegistryVersion.CREDENTIALS,
+    )
 
     def get(self, request: Request) -> Response:
-        credentials = (
-            Credential.objects.select_related(
-                "attestation_provider__yivi_tme",
-                "attestation_provider__organization",
-            )
-            .prefetch_related("attributes")
-            .filter(deprecated_since__isnull=True)
-        ).order_by("name_en")
-        serializer = CredentialListSerializer(credentials, many=True)
-        return Response({"credentials": serializer.data})
+        credentials = Credential.objects.filter(deprecated_since__isnull=True).order_by(
+            "name_en", "id"
+        )
+        data = registry_cache.get_or_compute(
+            request,
+            "catalog",
+            self.registry_namespaces,
+            "current",
+            lambda: serialize_credentials(credentials),
+        )
+        return Response({"credentials": data})
 
 
 class CredentialsListViewWithDeprecated(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.ATTESTATION_PROVIDERS,
+        RegistryVersion.TRUST_MODELS,
+        RegistryVersion.CREDENTIALS,
+    )
 
     """
     This view returns all credentials for the attribute index page, including deprecated ones.
@@ -36,14 +48,12 @@ class CredentialsListViewWithDeprecated(APIView):
         request: Request,
     ) -> Response:
 
-        credentials = (
-            Credential.objects.select_related(
-                "attestation_provider",
-                "attestation_provider__organization",
-                "attestation_provider__yivi_tme",
-            )
-            .prefetch_related("attributes")
-            .order_by("name_en")
+        credentials = Credential.objects.order_by("name_en", "id")
+        data = registry_cache.get_or_compute(
+            request,
+            "catalog",
+            self.registry_namespaces,
+            "all",
+            lambda: serialize_credentials(credentials),
         )
-        serializer = CredentialListSerializer(credentials, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_200_OK)
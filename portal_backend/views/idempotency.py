@@ -0,0 +1,122 @@
+"""
+Idempotency-Key support for the create endpoints.
+
+A client that retries a request with the same Idempotency-Key header gets the stored
+response of the first attempt, instead of the request running again. Keys are scoped
+to the user and the path, remembered for IDEMPOTENCY_KEY_TTL seconds and swept by the
+``sweep_idempotency_keys`` cron job.
+"""
+
+import functools
+import hashlib
+import json
+from typing import Optional
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from ..models.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+
+def encode_value(value) -> str:
+    if isinstance(value, UploadedFile):
+        digest = hashlib.sha256()
+        for chunk in value.chunks():
+            digest.update(chunk)
+        value.seek(0)
+        return f"{value.name}:{digest.hexdigest()}"
+    return str(value)
+
+
+def request_fingerprint(request: Request) -> str:
+    """A hash of the method, path and data of a request, including uploaded files"""
+    data = request.data
+    if hasattr(data, "lists"):  # the QueryDict of a form or multipart request
+        data = dict(data.lists())
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(json.dumps(data, sort_keys=True, default=encode_value).encode())
+    return digest.hexdigest()
+
+
+def key_fields(request: Request, key: str) -> dict:
+    return {"email": request.user.email, "path": request.path, "key": key}
+
+
+def claim(
+    request: Request, key: str, fingerprint: str
+) -> tuple[bool, Optional[IdempotencyKey]]:
+    """
+    Stores the key as in progress. Returns whether it was stored, and otherwise the key
+    of the earlier request. Expired keys and keys of requests that never finished, e.g.
+    because the worker died, are claimed again.
+    """
+    fields = key_fields(request, key)
+    (IdempotencyKey.expired() | IdempotencyKey.abandoned()).filter(**fields).delete()
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(fingerprint=fingerprint, **fields)
+        return True, None
+    except IntegrityError:
+        return False, IdempotencyKey.objects.filter(**fields).first()
+
+
+def replay(existing: Optional[IdempotencyKey], fingerprint: str) -> Response:
+    if existing is not None and existing.fingerprint != fingerprint:
+        return Response(
+            {"error": f"This {HEADER} was already used for a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if existing is None or existing.status_code is None:
+        return Response(
+            {"error": f"A request with this {HEADER} is still being processed."},
+            status=status.HTTP_409_CONFLICT,
+        )
+    response = Response(existing.response, status=existing.status_code)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view_method):
+    """
+    Makes an APIView method replay its stored response for a repeated Idempotency-Key.
+    The method and storing its response share a transaction, so a key that is still in
+    progress never has committed changes behind it. Server errors aren't stored, so
+    they can be retried with the same key.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request: Request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"{HEADER} may be at most {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request)
+        claimed, existing = claim(request, key, fingerprint)
+        if not claimed:
+            return replay(existing, fingerprint)
+
+        stored = IdempotencyKey.objects.filter(**key_fields(request, key))
+        try:
+            with transaction.atomic():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code >= 500:
+                    stored.delete()
+                else:
+                    stored.update(
+                        status_code=response.status_code, response=response.data
+                    )
+        except Exception:
+            stored.delete()
+            raise
+        return response
+
+    return wrapper
@@ -0,0 +1,106 @@
+"""
+Media delivery with long-lived caching for content-addressed files.
+
+Logos and their variants are named after the SHA-256 of their content, so their URLs
+never change meaning and may be cached for good. ``MEDIA_SERVE_MODE`` selects who
+sends the bytes:
+
+- ``uwsgi`` (default): uWSGI serves MEDIA_ROOT with ``--static-map`` from its offload
+  threads and sets the same caching headers with ``--route`` rules (see
+  entrypoint.sh), this view is only routed when DEBUG is on
+- ``django``: this view streams the file
+- ``x-accel-redirect``: this view only sets the headers and nginx sends the file from
+  an ``internal`` location that maps ``MEDIA_ACCEL_REDIRECT_PREFIX`` to MEDIA_ROOT
+- ``x-sendfile``: the same for Apache (mod_xsendfile) or lighttpd, by file path
+"""
+
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# <sha256>.<ext> logos and CACHE/images/<sha256>/<spec hash>.<ext> logo variants, the
+# same pattern as CONTENT_ADDRESSED in entrypoint.sh
+CONTENT_ADDRESSED = re.compile(
+    r"^(?:CACHE/images/)?[0-9a-f]{64}(?:/[0-9a-f]+)?\.(?:png|jpe?g|webp)$"
+)
+# Precompressed siblings, in order of preference, like --static-gzip-all of uWSGI
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def is_content_addressed(path: str) -> bool:
+    return CONTENT_ADDRESSED.match(path) is not None
+
+
+def accepted_encodings(request) -> set:
+    """The content codings of Accept-Encoding, without the refused (q=0) ones"""
+    encodings = set()
+    for value in request.headers.get("Accept-Encoding", "").split(","):
+        encoding, _, params = value.partition(";")
+        name, _, quality = params.strip().partition("=")
+        try:
+            refused = name.strip() == "q" and float(quality) == 0
+        except ValueError:
+            refused = False
+        if not refused:
+            encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def select_precompressed(request, fullpath: str) -> tuple[str, str | None]:
+    """Returns the path to send and its Content-Encoding"""
+    accepted = accepted_encodings(request)
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            return fullpath + suffix, encoding
+    return fullpath, None
+
+
+def serve_media(request, path: str):
+    """Serves a file from MEDIA_ROOT in the configured MEDIA_SERVE_MODE"""
+    path = posixpath.normpath(path).lstrip("/")
+    fullpath = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(fullpath):
+        raise Http404(f"{path} does not exist")
+
+    mtime = os.stat(fullpath).st_mtime
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(fullpath)
+        content_type = content_type or "application/octet-stream"
+        mode = settings.MEDIA_SERVE_MODE
+        if mode == "x-accel-redirect":
+            # nginx picks precompressed files itself (gzip_static / brotli_static)
+            response = HttpResponse(content_type=content_type)
+            response.headers["X-Accel-Redirect"] = quote(
+                settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + path
+            )
+        else:
+            sendpath, encoding = select_precompressed(request, fullpath)
+            if mode == "x-sendfile":
+                response = HttpResponse(content_type=content_type)
+                response.headers["X-Sendfile"] = sendpath
+            else:
+                response = FileResponse(open(sendpath, "rb"), content_type=content_type)
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+            patch_vary_headers(response, ["Accept-Encoding"])
+        response.headers["Last-Modified"] = http_date(mtime)
+
+    if is_content_addressed(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        # e.g. the registry snapshot, which is rewritten under the same name
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
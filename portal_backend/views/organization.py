@@ -5,26 +5,29 @@ from rest_framework.response import Response
 from drf_yasg.utils import swagger_auto_schema  # type: ignore
 from rest_framework import status
 from portal_backend.services.organization import filter_organizations
+from portal_backend.services.mail import queue_maintainer_added_email
 from ..models.model_serializers import MaintainerSerializer, OrganizationSerializer
-from ..models.models import Organization
+from ..models.value_serializers import organization_values, serialize_organizations
+from ..models.models import Organization, RegistryVersion
 from rest_framework import permissions
 from rest_framework.parsers import FormParser, MultiPartParser
 from ..models.models import User
 from rest_framework.pagination import LimitOffsetPagination
-from .permissions import IsOrganizationMaintainerOrAdmin
+from .pagination import KeysetPagination
+from .idempotency import idempotent
+from .. import cache as registry_cache
+from .permissions import IsOrganizationMaintainerOrAdmin, can_maintain_organization
 from django.shortcuts import get_object_or_404
 from django.db import transaction
 from rest_framework.request import Request
 from ..swagger_specs.organization import (
+    organization_list_schema,
     organization_create_schema,
     organization_update_schema,
     organization_maintainer_create_schama,
     organization_maintainer_delete_schema,
 )
 from django.core.exceptions import ValidationError
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
-from django.conf import settings
 
 
 logger = logging.getLogger(__name__)
@@ -35,6 +38,7 @@ class OrganizationCreateView(APIView):
     parser_classes = [MultiPartParser, FormParser]
 
     @organization_create_schema
+    @idempotent
     @transaction.atomic
     def post(self, request: Request) -> Response:
         """Creates an organization."""
@@ -68,45 +72,59 @@ class OrganizationCreateView(APIView):
 
 class OrganizationListView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.TRUST_MODELS,
+    )
 
-    @swagger_auto_schema(responses={200: "Success", 404: "Not Found"})
+    @organization_list_schema
     def get(self, request: Request) -> Response:
         """Get all registered organizations"""
 
-        orgs = filter_organizations(request)
-        paginator = LimitOffsetPagination()
-        paginator.default_limit = 20
+        orgs = organization_values(filter_organizations(request))
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination()
+        else:
+            paginator = LimitOffsetPagination()
+            paginator.default_limit = 20
         result_page = paginator.paginate_queryset(orgs, request)
-        serializer = OrganizationSerializer(result_page, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(serialize_organizations(result_page))
 
 
 class OrganizationDetailView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.TRUST_MODELS,
+    )
 
     @swagger_auto_schema(responses={200: "Success", 404: "Not Found"})
     def get(self, request: Request, org_slug: str) -> Response:
         """Get organization by uuid"""
 
-        org = Organization.objects.with_role_annotations().filter(slug=org_slug)
+        org = Organization.objects.filter(slug=org_slug)
 
-        if (
-            request.user.is_authenticated
-            and IsOrganizationMaintainerOrAdmin().has_permission(request, self)
-        ):
+        logger.info(f"Fetching organization with slug: {org_slug}")
+        if can_maintain_organization(request, org_slug):
             org = org.first()
+            data = OrganizationSerializer(org).data if org else None
         else:
-            org = org.exclude(is_verified=False).first()
+            # Only the public view of verified organizations is shared in the cache
+            def compute():
+                public_org = org.exclude(is_verified=False).first()
+                return OrganizationSerializer(public_org).data if public_org else None
 
-        logger.info(f"Fetching organization with slug: {org_slug}")
-        if not org:
+            data = registry_cache.get_or_compute(
+                request, "organization", self.registry_namespaces, org_slug, compute
+            )
+
+        if not data:
             return Response(
                 {"error": "Organization not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        serializer = OrganizationSerializer(org)
-        return Response(serializer.data)
+        return Response(data)
 
 
 class OrganizationUpdateView(APIView):
@@ -159,6 +177,7 @@ class OrganizationMaintainersView(APIView):
         return Response(serializer.data)
 
     @organization_maintainer_create_schama
+    @idempotent
     @transaction.atomic
     def post(self, request: Request, org_slug: str) -> Response:
         """Add a maintainer to an organization"""
@@ -213,33 +232,8 @@ class OrganizationMaintainersView(APIView):
 
             user.organizations.add(organization)
 
-        # Send email notification to the maintainer that was just added
-        try:
-
-            html_content = render_to_string(
-                "email-template.html",
-                {
-                    "added_by": request.user.email,
-                    "organization_name": organization.name_en,
-                    "portal_url": "https://" + settings.YIVI_PORTAL_URL,
-                },
-            )
-
-            email_notification = EmailMessage(
-                "Yivi Portal - You have been added as a maintainer",
-                html_content,
-                settings.EMAIL_FROM,
-                [email],
-            )
-            email_notification.content_subtype = "html"
-            email_notification.send()
-        except Exception as e:
-            transaction.set_rollback(True)
-            logger.error(f"Error sending email notification: {e}")
-            return Response(
-                {"error": f"Failed to send email notification: {e}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        # Sent by the send_emails job once the maintainer addition is committed
+        queue_maintainer_added_email(email, organization, request.user.email)
 
         return Response(
             {"message": f"User {email} added to organization as maintainer"},
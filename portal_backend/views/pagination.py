@@ -0,0 +1,203 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from typing import Any, List, Optional
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Field, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Returns the planner's row estimate for a queryset on PostgreSQL, which avoids
+    running the full query. Other database backends fall back to an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.order_by().values("pk").query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on the full ordering of the queryset instead of
+    using OFFSET. The ordering must end in a unique field (e.g. ``("name_en", "id")``)
+    so every row has a distinct position and pages stay stable when rows are
+    inserted or deleted while a client is paging.
+
+    Cursors are opaque to clients: they encode the direction and the ordering
+    values of the last (or first) row of the page that produced them.
+    """
+
+    mode_query_param = "pagination"
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    total_query_param = "total"
+    default_page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    @classmethod
+    def is_requested(cls, request: Request) -> bool:
+        return (
+            request.query_params.get(cls.mode_query_param) == "cursor"
+            or cls.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> List[Any]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering: List[str] = [str(field) for field in queryset.query.order_by]
+        if not self.ordering:
+            raise ValueError("Keyset pagination requires an ordered queryset")
+
+        self.total: Optional[int] = None
+        if request.query_params.get(self.total_query_param) == "approximate":
+            self.total = estimate_count(queryset)
+
+        cursor = self.decode_cursor(request, queryset)
+        reverse = cursor is not None and cursor["direction"] == "previous"
+        if cursor is not None:
+            queryset = queryset.filter(self.seek_filter(cursor["position"], reverse))
+        if reverse:
+            queryset = queryset.order_by(*self.reversed_ordering())
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        # Paging backwards always leaves the page we came from as the next page.
+        self.has_next = has_more if not reverse else True
+        self.has_previous = cursor is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data: Any) -> Response:
+        response = OrderedDict(
+            [("next", self.get_next_link()), ("previous", self.get_previous_link())]
+        )
+        if self.total is not None:
+            response["count"] = self.total
+        response["results"] = data
+        return Response(response)
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.default_page_size
+        if page_size <= 0:
+            return self.default_page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor("next", self.page[-1])
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor("previous", self.page[0])
+
+    def field_names(self) -> List[str]:
+        return [field.lstrip("-") for field in self.ordering]
+
+    def reversed_ordering(self) -> List[str]:
+        return [
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        ]
+
+    def seek_filter(self, position: List[Any], reverse: bool) -> Q:
+        """
+        Builds the row comparison ``(f1, f2, ...) > (v1, v2, ...)`` as a disjunction
+        of equality prefixes, honouring the direction of every ordering field.
+        """
+        names = self.field_names()
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            descending = field.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            term = Q(**{f"{names[i]}__{lookup}": position[i]})
+            for name, value in zip(names[:i], position[:i]):
+                term &= Q(**{name: value})
+            condition |= term
+        return condition
+
+    def get_position(self, obj: Any) -> List[Any]:
+        # Rows of a values() queryset are dicts keyed by the full lookup
+        if isinstance(obj, dict):
+            return [obj[name] for name in self.field_names()]
+        position = []
+        for name in self.field_names():
+            value = obj
+            for attr in name.split("__"):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def encode_cursor(self, direction: str, obj: Any) -> str:
+        payload = json.dumps(
+            {"d": direction, "p": self.get_position(obj)}, default=str
+        ).encode("utf-8")
+        cursor = base64.urlsafe_b64encode(payload).decode("ascii")
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def ordering_fields(self, queryset: QuerySet) -> List[Field]:
+        """The model field or annotation output field of every ordering field"""
+        fields = []
+        for name in self.field_names():
+            if name in queryset.query.annotations:
+                fields.append(queryset.query.annotations[name].output_field)
+                continue
+            model = queryset.model
+            for attr in name.split("__"):
+                field = model._meta.get_field(attr)
+                model = field.related_model
+            fields.append(field.target_field if field.is_relation else field)
+        return fields
+
+    def decode_cursor(self, request: Request, queryset: QuerySet) -> Optional[dict]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            direction, position = payload["d"], payload["p"]
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if direction not in ("next", "previous") or not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        # Positions are compared in SQL, so every value must fit its field
+        try:
+            position = [
+                field.to_python(value)
+                for field, value in zip(self.ordering_fields(queryset), position)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return {"direction": direction, "position": position}
@@ -1,13 +1,73 @@
 import logging
+from dataclasses import dataclass, field
+from typing import Optional
 from rest_framework import permissions
 from rest_framework.request import Request
 from rest_framework.views import View
 from ..models.models import User
-from rest_framework_simplejwt.tokens import AccessToken  # type: ignore
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    The portal identity behind an authenticated request, resolved once per request
+    from the access token that JWTAuthentication already validated.
+    """
+
+    email: str
+    role: Optional[str]
+    organization_slugs: frozenset[str]
+    claims: dict = field(default_factory=dict, compare=False)
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+    def can_maintain(self, org_slug: Optional[str]) -> bool:
+        if org_slug is None:
+            return False
+        if self.is_admin:
+            return True
+        return self.role == "maintainer" and org_slug in self.organization_slugs
+
+
+def get_principal(request: Request) -> Optional[Principal]:
+    """Returns the request's principal, or None for anonymous requests"""
+
+    if hasattr(request, "_principal"):
+        return request._principal
+
+    principal = None
+    if request.user and request.user.is_authenticated:
+        claims = dict(getattr(request.auth, "payload", None) or {})
+        if "role" in claims:
+            role = claims["role"]
+        else:
+            # Tokens issued before the role claim was added fall back to the database
+            role = (
+                User.objects.filter(email=request.user.email)
+                .values_list("role", flat=True)
+                .first()
+            )
+        principal = Principal(
+            email=request.user.email,
+            role=role,
+            organization_slugs=frozenset(claims.get("organizationSlugs") or []),
+            claims=claims,
+        )
+
+    request._principal = principal
+    return principal
+
+
+def can_maintain_organization(request: Request, org_slug: Optional[str]) -> bool:
+    """Whether the request is made by an admin or a maintainer of the organization"""
+    principal = get_principal(request)
+    return principal is not None and principal.can_maintain(org_slug)
+
+
 class ORPermission(permissions.BasePermission):
     def __init__(self, *perms: permissions.BasePermission) -> None:
         self.perms: tuple[permissions.BasePermission, ...] = perms
@@ -27,25 +87,4 @@ class IsOrganizationMaintainerOrAdmin(permissions.BasePermission):
     )
 
     def has_permission(self, request: Request, view: View) -> bool:
-        request_org_slug: str | None = view.kwargs.get("org_slug")
-        if request_org_slug is None:  # checking if org slug is present in the request
-            return False
-
-        if hasattr(request, "auth"):
-            raw_token: AccessToken = str(request.auth)
-            token = AccessToken(raw_token)
-            token_org_slugs = token.get("organizationSlugs")
-
-        try:
-            user_obj = User.objects.get(email=request.user.email)
-        except User.DoesNotExist:
-            return False
-
-        if user_obj.role == "admin":
-            return True
-
-        if user_obj.role == "maintainer":
-            if request_org_slug in token_org_slugs:
-                return True
-
-        return False
+        return can_maintain_organization(request, view.kwargs.get("org_slug"))
@@ -3,29 +3,31 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import permissions
 from rest_framework import status
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from ..services.relying_party import (
     create_relying_party,
     create_hostnames,
-    create_condiscon,
-    create_condiscon_attributes,
-    make_condiscon_json,
+    create_condiscon_with_attributes,
     update_relying_party_hostnames,
     update_condiscon_context,
     update_condiscon_attributes,
     update_rp_environment,
     update_rp_slug,
 )
+from ..services.relying_party_batch import create_relying_parties, parse_upload
 from ..swagger_specs.relying_party import (
+    relying_party_batch_create_schema,
     relying_party_create_schema,
     relying_party_patch_schema,
     relying_party_delete_schema,
     relying_party_dns_status_schema,
     relying_party_list_schema,
 )
-from .permissions import IsOrganizationMaintainerOrAdmin
+from .idempotency import idempotent
+from .permissions import IsOrganizationMaintainerOrAdmin, can_maintain_organization
 from ..models.model_serializers import (
     CondisconSerializer,
     RelyingPartyHostnameSerializer,
@@ -36,6 +38,7 @@ from ..models.models import (
     Organization,
     Condiscon,
     CondisconAttribute,
+    RegistryVersion,
 )
 from django.core.exceptions import ValidationError
 
@@ -47,6 +50,7 @@ class RelyingPartyCreateView(APIView):
     ]
 
     @relying_party_create_schema
+    @idempotent
     @transaction.atomic
     def post(self, request: Request, org_slug: str) -> Response:
 
@@ -63,10 +67,9 @@ class RelyingPartyCreateView(APIView):
             contexts["en"] = request.data.get("context_description_en", "")
             contexts["nl"] = request.data.get("context_description_nl", "")
 
-            condiscon = create_condiscon(
+            create_condiscon_with_attributes(
                 request.data.get("attributes", []), contexts, relying_party
             )
-            create_condiscon_attributes(condiscon, request.data.get("attributes", []))
         except ValidationError as e:
             transaction.set_rollback(True)
             return Response(
@@ -98,18 +101,65 @@ class RelyingPartyCreateView(APIView):
         )
 
 
+class RelyingPartyBatchCreateView(APIView):
+    permission_classes = [
+        permissions.IsAuthenticated,
+        IsOrganizationMaintainerOrAdmin,
+    ]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @relying_party_batch_create_schema
+    @idempotent
+    def post(self, request: Request, org_slug: str) -> Response:
+        """Creates the relying parties of a JSON Lines or CSV upload."""
+
+        organization = get_object_or_404(Organization, slug=org_slug)
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "A file is required."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        atomic = str(request.data.get("atomic", "")).lower() == "true"
+
+        try:
+            items = parse_upload(upload)
+            results = create_relying_parties(organization, items, atomic=atomic)
+        except ValidationError as e:
+            return Response(
+                {"error": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        created = sum(result["status"] == "created" for result in results)
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {
+                "created": created,
+                "failed": sum(result["status"] == "error" for result in results),
+                "results": results,
+            },
+            status=response_status,
+        )
+
+
 class RelyingPartyListView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.RELYING_PARTIES,
+        RegistryVersion.TRUST_MODELS,
+    )
 
     @relying_party_list_schema
     def get(self, request: Request, org_slug: str) -> Response:
         organization = get_object_or_404(Organization, slug=org_slug)
         relying_parties = RelyingParty.objects.filter(organization=organization)
 
-        if not (
-            request.user.is_authenticated
-            and IsOrganizationMaintainerOrAdmin().has_permission(request, self)
-        ):
+        if not can_maintain_organization(request, org_slug):
             relying_parties = relying_parties.filter(published=True)
 
         return Response(
@@ -128,6 +178,12 @@ class RelyingPartyListView(APIView):
 
 class RelyingPartyRetrieveView(APIView):
     permission_classes = [permissions.AllowAny]
+    registry_namespaces = (
+        RegistryVersion.ORGANIZATIONS,
+        RegistryVersion.RELYING_PARTIES,
+        RegistryVersion.TRUST_MODELS,
+        RegistryVersion.CREDENTIALS,
+    )
 
     def get(
         self, request: Request, org_slug: str, environment: str, rp_slug: str
@@ -140,10 +196,7 @@ class RelyingPartyRetrieveView(APIView):
             rp_slug=rp_slug,
         )
 
-        if not (
-            request.user.is_authenticated
-            and IsOrganizationMaintainerOrAdmin().has_permission(request, self)
-        ):
+        if not can_maintain_organization(request, org_slug):
             if not relying_party.published:
                 return Response(
                     {"error": "You are not allowed to view this relying party."},
@@ -203,12 +256,7 @@ class RelyingPartyDeleteView(APIView):
             rp_slug=rp_slug,
             yivi_tme__environment=environment,
         )
-        RelyingPartyHostname.objects.filter(
-            relying_party=rp
-        ).delete()  # TODO: we may wanna do this with signals in the future
-        condiscons = Condiscon.objects.filter(relying_party=rp)
-        for c in condiscons:
-            CondisconAttribute.objects.filter(condiscon=c).delete()
+        # Also deletes its hostnames, condiscons and condiscon attributes
         rp.delete()
         return Response(
             status=status.HTTP_200_OK,
@@ -235,15 +283,14 @@ class RelyingPartyUpdateView(APIView):
             def update_context():
                 nonlocal condiscon
                 if condiscon is None:
-                    condiscon = create_condiscon(
-                        attributes=data["attributes"],
+                    condiscon = create_condiscon_with_attributes(
+                        attributes_data=data["attributes"],
                         contexts={
                             "en": data.get("context_description_en", ""),
                             "nl": data.get("context_description_nl", ""),
                         },
                         relying_party=relying_party,
                     )
-                    create_condiscon_attributes(condiscon, data["attributes"])
                 update_condiscon_context(condiscon, data)
                 updated_fields.add("context")
 
@@ -251,20 +298,16 @@ class RelyingPartyUpdateView(APIView):
                 nonlocal condiscon
 
                 if condiscon is None:
-                    condiscon = create_condiscon(
-                        attributes=data["attributes"],
+                    condiscon = create_condiscon_with_attributes(
+                        attributes_data=data["attributes"],
                         contexts={
                             "en": data.get("context_description_en", ""),
                             "nl": data.get("context_description_nl", ""),
                         },
                         relying_party=relying_party,
                     )
-                    create_condiscon_attributes(condiscon, data["attributes"])
                 else:
                     update_condiscon_attributes(condiscon, data["attributes"])
-                    condiscon.condiscon = make_condiscon_json(data["attributes"])
-                    condiscon.full_clean()
-                    condiscon.save()
 
                 updated_fields.add("attributes")
 
@@ -0,0 +1,81 @@
+import codecs
+import orjson
+from typing import Any, Optional
+from django.conf import settings
+from django_countries.fields import Country  # type: ignore
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# DRF escapes these for JavaScript compatibility, orjson leaves them as is
+LINE_SEPARATOR = "\u2028".encode("utf-8")
+PARAGRAPH_SEPARATOR = "\u2029".encode("utf-8")
+
+
+class PortalJSONEncoder(JSONEncoder):
+    """DRF's encoder, which also encodes django_countries values as their code"""
+
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, Country):
+            return obj.code
+        return super().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson, falling back to DRF's stdlib based renderer for indented
+    or ASCII-only output. The output is byte-identical to ``JSONRenderer`` with the
+    default (compact, unicode, strict) settings: values that orjson doesn't encode the
+    same way, like datetimes, ``Decimal``, lazy translation strings and countries, go
+    through the same encoder as the fallback.
+    """
+
+    encoder_class = PortalJSONEncoder
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def __init__(self) -> None:
+        self.default = self.encoder_class().default
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[dict] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        if (
+            self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.default, option=self.options)
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b"\\u2028")
+            ret = ret.replace(PARAGRAPH_SEPARATOR, b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """Parses UTF-8 JSON request bodies with orjson, other encodings with DRF's parser"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(
+        self,
+        stream: Any,
+        media_type: Optional[str] = None,
+        parser_context: Optional[dict] = None,
+    ) -> Any:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -10,6 +10,8 @@ export interface Organization {
   city: string;
   is_verified: boolean;
   logo: string;
+  logo_variants?: logo_variants | null;
+  logo_pending?: boolean;
   created_at: string;
   last_updated_at: string;
   is_RP: boolean;
@@ -18,6 +20,8 @@ export interface Organization {
   verification_status: string;
   contact_number: string;
 }
+// Scaled logo URLs by file extension and width
+export type logo_variants = Record<"webp" | "png", Record<string, string>>;
 export type trust_model = {
   name: string;
 };
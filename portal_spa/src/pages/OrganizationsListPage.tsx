@@ -378,16 +378,24 @@ export default function OrganizationsListPage() {
                     <TableCell>
                       {org.logo ? (
                         <div className="relative h-8 w-8 rounded-full overflow-hidden border border-gray-200">
-                          <img
-                            src={`${apiEndpoint}${org.logo}`}
-                            width={32}
-                            height={32}
-                            alt={`${org.name_en} logo`}
-                            className="object-cover w-full h-full"
-                            onError={(e) => {
-                              e.currentTarget.src = "/logo-placeholder.svg";
-                            }}
-                          />
+                          <picture>
+                            {org.logo_variants && (
+                              <source
+                                type="image/webp"
+                                srcSet={`${apiEndpoint}${org.logo_variants.webp["64"]}`}
+                              />
+                            )}
+                            <img
+                              src={`${apiEndpoint}${org.logo_variants?.png["64"] ?? org.logo}`}
+                              width={32}
+                              height={32}
+                              alt={`${org.name_en} logo`}
+                              className="object-cover w-full h-full"
+                              onError={(e) => {
+                                e.currentTarget.src = "/logo-placeholder.svg";
+                              }}
+                            />
+                          </picture>
                         </div>
                       ) : (
                         <div className="h-8 w-8 rounded-full bg-gray-100 flex items-center justify-center">
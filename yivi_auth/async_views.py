@@ -0,0 +1,118 @@
+"""
+Async versions of the Yivi session proxy views.
+
+The proxy views mostly wait for the Yivi server, which blocks a uWSGI worker thread
+for every login. Served by an ASGI server (see ``yivi_portal.asgi``) these views wait
+on a shared httpx connection pool instead, so a login surge doesn't take the workers
+of the other endpoints. They answer the same as the DRF views in ``yivi_auth.views``.
+"""
+
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from yivi_auth.session_status import status_events
+from yivi_auth.views import (
+    LOGIN_SESSION_REQUEST,
+    demo_issuance_request,
+    login_tokens,
+    set_refresh_cookie,
+)
+from yivi_auth.yivi import AsyncYiviServer, YiviException
+
+
+def yivi_server() -> AsyncYiviServer:
+    return AsyncYiviServer(settings.YIVI_SERVER_URL, token=settings.YIVI_SERVER_TOKEN)
+
+
+def error_response(e: YiviException) -> JsonResponse:
+    return JsonResponse(e.msg, status=e.http_status, safe=False)
+
+
+@sync_to_async
+def login_response(email: str) -> JsonResponse:
+    refresh = login_tokens(email)
+    response = JsonResponse({"access": str(refresh.access_token)})
+    set_refresh_cookie(response, refresh)
+    return response
+
+
+# Like DRF's APIView, the proxy views don't use the session cookie, so CSRF doesn't apply
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncYiviIssueDemosView(View):
+    async def post(self, request: HttpRequest) -> JsonResponse:
+        """Start a Yivi session as proxy to the Yivi server to issue demo credentials."""
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"detail": "JSON parse error"}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"detail": "Expected a JSON object"}, status=400)
+
+        session_request = demo_issuance_request(
+            data.get("credential", None), data.get("attributes", None)
+        )
+        try:
+            response = await yivi_server().start_session(session_request)
+        except YiviException as e:
+            return error_response(e)
+
+        if response is None:
+            raise RuntimeError("Yivi server did not return a response.")
+
+        return JsonResponse(response, safe=False)
+
+
+class AsyncYiviDemoIssuanceResultView(View):
+    async def get(self, request: HttpRequest, yivi_token: str) -> JsonResponse:
+        try:
+            result = await yivi_server().session_result(yivi_token)
+        except YiviException as e:
+            return error_response(e)
+        if result is None:
+            return JsonResponse("Invalid Yivi token", status=400, safe=False)
+        return JsonResponse(result, safe=False)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncYiviSessionProxyStartView(View):
+    async def post(self, request: HttpRequest) -> JsonResponse:
+        """Start a Yivi session as proxy to the Yivi server."""
+        try:
+            response = await yivi_server().start_session(LOGIN_SESSION_REQUEST)
+        except YiviException as e:
+            return error_response(e)
+
+        if response is None:
+            raise RuntimeError("Yivi server did not return a response.")
+
+        return JsonResponse(response, safe=False)
+
+
+class AsyncYiviSessionProxyResultView(View):
+    async def get(self, request: HttpRequest, yivi_token: str) -> JsonResponse:
+        """Get the result of a Yivi session as proxy to the Yivi server."""
+        try:
+            result = await yivi_server().session_result(yivi_token)
+        except YiviException as e:
+            return error_response(e)
+        if result is None:
+            return JsonResponse("Invalid Yivi session token.", status=400, safe=False)
+
+        email = result.get("disclosed")[0][0]["rawvalue"]
+        return await login_response(email)
+
+
+class YiviSessionStatusEventsView(View):
+    async def get(self, request: HttpRequest, yivi_token: str) -> StreamingHttpResponse:
+        """Stream the status changes of a Yivi session as Server-Sent Events."""
+        response = StreamingHttpResponse(
+            status_events(yivi_token), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Keeps nginx from buffering the events
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,112 @@
+"""
+Server-Sent Events of the status of a Yivi session.
+
+All listeners of a session token share one ``SessionWatcher``, which polls the status
+at the Yivi server every YIVI_SESSION_STATUS_POLL_INTERVAL seconds and passes changes
+on. The watcher stops when the session has ended or when its last listener is gone.
+Watchers live in the event loop of the ASGI server, so listeners of a session are only
+shared within one process.
+"""
+
+import asyncio
+import json
+import weakref
+from typing import AsyncIterator, Optional
+from django.conf import settings
+from yivi_auth.yivi import AsyncYiviServer, YiviException
+
+# Statuses after which the session doesn't change anymore
+FINAL_STATUSES = {"DONE", "CANCELLED", "TIMEOUT"}
+# Seconds between comments that keep idle connections open through proxies
+KEEPALIVE_INTERVAL = 15
+
+_watchers = weakref.WeakKeyDictionary()
+
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class SessionWatcher:
+    """Polls the status of one Yivi session for all of its listeners"""
+
+    def __init__(self, token: str):
+        self.token = token
+        self.listeners: set[asyncio.Queue] = set()
+        self.last_event: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        if self.last_event is not None:
+            queue.put_nowait(self.last_event)
+        self.listeners.add(queue)
+        if self.task is None:
+            self.task = asyncio.create_task(self.poll())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self.listeners.discard(queue)
+        if not self.listeners and self.task is not None:
+            # A new listener of the session gets a new watcher
+            self.discard()
+            self.task.cancel()
+
+    def discard(self) -> None:
+        watchers = _watchers.get(asyncio.get_running_loop(), {})
+        if watchers.get(self.token) is self:
+            del watchers[self.token]
+
+    def publish(self, event: Optional[str]) -> None:
+        """Passes an event on to the listeners, None ends their streams"""
+        for queue in self.listeners:
+            queue.put_nowait(event)
+
+    async def poll(self) -> None:
+        yivi_server = AsyncYiviServer(
+            settings.YIVI_SERVER_URL, token=settings.YIVI_SERVER_TOKEN
+        )
+        status = None
+        try:
+            while True:
+                try:
+                    new_status = await yivi_server.session_status(self.token)
+                except YiviException as e:
+                    self.publish(format_event("error", {"error": e.msg}))
+                    break
+                if new_status != status:
+                    status = new_status
+                    self.last_event = format_event("status", status)
+                    self.publish(self.last_event)
+                if status in FINAL_STATUSES:
+                    break
+                await asyncio.sleep(settings.YIVI_SESSION_STATUS_POLL_INTERVAL)
+        finally:
+            self.discard()
+            self.publish(None)
+
+
+def get_watcher(token: str) -> SessionWatcher:
+    watchers = _watchers.setdefault(asyncio.get_running_loop(), {})
+    watcher = watchers.get(token)
+    if watcher is None:
+        watcher = watchers[token] = SessionWatcher(token)
+    return watcher
+
+
+async def status_events(token: str) -> AsyncIterator[str]:
+    """The events of a session's status, until the session has ended"""
+    watcher = get_watcher(token)
+    queue = watcher.subscribe()
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield event
+    finally:
+        watcher.unsubscribe(queue)
@@ -0,0 +1,109 @@
+"""A local stand-in for the Yivi server, used by the tests and benchmark_yivi_server."""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_RESULT = {
+    "token": "stub-token",
+    "status": "DONE",
+    "type": "disclosing",
+    "proofStatus": "VALID",
+    "disclosed": [[{"id": "pbdf.pbdf.email.email", "rawvalue": "test@example.com"}]],
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keeps connections alive and writes without delay, like the Yivi server
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_call(self, routes):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path))
+            status = self.server.fail_next.pop(0) if self.server.fail_next else None
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if status is not None:
+            return self.respond(status, {"error": "STUB", "description": "Stub error"})
+        for pattern, data in routes:
+            if re.fullmatch(pattern, self.path):
+                return self.respond(200, data)
+        self.respond(404, {"error": "SESSION_UNKNOWN", "description": "Unknown"})
+
+    def do_POST(self):
+        self.handle_call(
+            [
+                (
+                    r"/session/?",
+                    {
+                        "token": "stub-token",
+                        "sessionPtr": {"u": "stub-session", "irmaqr": "disclosing"},
+                    },
+                )
+            ]
+        )
+
+    def do_GET(self):
+        with self.server.lock:
+            statuses = self.server.statuses
+            status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        self.handle_call(
+            [
+                (r"/session/[^/]+/status", status),
+                (r"/session/[^/]+/result", SESSION_RESULT),
+            ]
+        )
+
+
+class StubYiviServer(ThreadingHTTPServer):
+    """
+    Answers the session endpoints on a free local port, after ``delay`` seconds. The
+    statuses in ``fail_next`` are returned instead, one per request. Status requests
+    get the session statuses in ``statuses`` one by one, the last one is repeated.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        self.fail_next = []
+        self.statuses = ["DONE"]
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
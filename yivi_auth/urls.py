@@ -1,22 +1,45 @@
+from django.conf import settings
 from django.urls import path
 
-from yivi_auth import views
+from yivi_auth import async_views, views
 
 app_name = "yivi_auth"
 
+# Under ASGI the Yivi session proxies are served by async views, see yivi_portal.asgi
+if settings.YIVI_ASYNC_VIEWS:
+    session_start_view = async_views.AsyncYiviSessionProxyStartView
+    session_result_view = async_views.AsyncYiviSessionProxyResultView
+    demo_issuance_view = async_views.AsyncYiviIssueDemosView
+    demo_issuance_result_view = async_views.AsyncYiviDemoIssuanceResultView
+else:
+    session_start_view = views.YiviSessionProxyStartView
+    session_result_view = views.YiviSessionProxyResultView
+    demo_issuance_view = views.YiviIssueDemosView
+    demo_issuance_result_view = views.YiviDemoIssuanceResultView
+
 urlpatterns = [
-    path("v1/session/", views.YiviSessionProxyStartView.as_view(), name="start"),
+    path("v1/session/", session_start_view.as_view(), name="start"),
     path(
         "v1/token/<str:yivi_token>",
-        views.YiviSessionProxyResultView.as_view(),
+        session_result_view.as_view(),
         name="token_obtain_pair",
     ),
     path("v1/refreshtoken", views.RefreshTokenView.as_view(), name="token_refresh"),
     path("v1/logout", views.LogoutView.as_view(), name="logout"),
-    path("v1/demo-issuance", views.YiviIssueDemosView.as_view(), name="demo_issuance"),
+    path("v1/demo-issuance", demo_issuance_view.as_view(), name="demo_issuance"),
     path(
         "v1/demo-issuance/token/<str:yivi_token>",
-        views.YiviDemoIssuanceResultView.as_view(),
+        demo_issuance_result_view.as_view(),
         name="demo_issuance_token",
     ),
 ]
+
+# Streaming the session status needs an event loop that outlives the request
+if settings.YIVI_ASYNC_VIEWS:
+    urlpatterns.append(
+        path(
+            "v1/session/<str:yivi_token>/status-events",
+            async_views.YiviSessionStatusEventsView.as_view(),
+            name="session_status_events",
+        )
+    )
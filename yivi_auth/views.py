@@ -18,6 +18,50 @@ import time
 logger = logging.getLogger(__name__)
 
 
+LOGIN_SESSION_REQUEST = {
+    "@context": "https://irma.app/ld/request/disclosure/v2",
+    "disclose": [[["pbdf.pbdf.email.email"], ["pbdf.sidn-pbdf.email.email"]]],
+}
+
+
+def demo_issuance_request(credential: str, attributes: dict) -> dict:
+    # UNIX timestamp in the future, 6 months from now
+    validity = int(time.time()) + 6 * 30 * 24 * 60 * 60
+    return {
+        "@context": "https://irma.app/ld/request/issuance/v2",
+        "credentials": [
+            {
+                "credential": credential,
+                "validity": validity,
+                "attributes": attributes,
+            }
+        ],
+    }
+
+
+def login_tokens(email: str) -> RefreshToken:
+    """Returns the refresh token of the user with the disclosed email, creating it"""
+    User = get_user_model()
+    user, created = User.objects.get_or_create(username=email, email=email)
+    return CustomTokenObtainPairSerializer.get_token(user)
+
+
+def set_refresh_cookie(response, refresh: RefreshToken) -> None:
+    # Cookie expires when refresh token does
+    refresh_lifetime = settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"]
+    expires_at = datetime.now(timezone.utc) + refresh_lifetime
+
+    response.set_cookie(
+        key="refresh_token",
+        value=str(refresh),
+        httponly=True,
+        secure=not settings.DEBUG,  # Set True in production
+        samesite="Lax",  # Or "Lax" depending on your app flow
+        expires=expires_at,
+        path="/",
+    )
+
+
 class YiviIssueDemosView(APIView):
     permission_classes = [AllowAny]
 
@@ -37,20 +81,8 @@ class YiviIssueDemosView(APIView):
             settings.YIVI_SERVER_URL,
             token=settings.YIVI_SERVER_TOKEN,
         )
-        # UNIX timestamp in the future, 6 months from now
-        validity = int(time.time()) + 6 * 30 * 24 * 60 * 60
-
         try:
-            session_request = {
-                "@context": "https://irma.app/ld/request/issuance/v2",
-                "credentials": [
-                    {
-                        "credential": credential,
-                        "validity": validity,
-                        "attributes": attributes,
-                    }
-                ],
-            }
+            session_request = demo_issuance_request(credential, attributes)
             response = yivi_server.start_session(session_request)
         except YiviException as e:
             return Response(status=e.http_status, data=e.msg)
@@ -85,6 +117,10 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         # # Add custom claims
         token["email"] = user.email
 
+        # The role is cached in the token so permission checks don't need to look
+        # the user up on every request, see portal_backend.views.permissions
+        token["role"] = None
+        token["organizationSlugs"] = []
         db_usr = User.objects.filter(email=user.email).first()
         if db_usr is not None:
             token["role"] = db_usr.role
@@ -112,13 +148,7 @@ class YiviSessionProxyStartView(APIView):
             settings.YIVI_SERVER_URL, token=settings.YIVI_SERVER_TOKEN
         )
         try:
-            session_request = {
-                "@context": "https://irma.app/ld/request/disclosure/v2",
-                "disclose": [
-                    [["pbdf.pbdf.email.email"], ["pbdf.sidn-pbdf.email.email"]]
-                ],
-            }
-            response = yivi_server.start_session(session_request)
+            response = yivi_server.start_session(LOGIN_SESSION_REQUEST)
         except YiviException as e:
             return Response(status=e.http_status, data=e.msg)
 
@@ -144,26 +174,9 @@ class YiviSessionProxyResultView(APIView):
                 return Response(status=400, data="Invalid Yivi session token.")
 
             email = yivi_session_result.get("disclosed")[0][0]["rawvalue"]
-
-            User = get_user_model()
-            user, created = User.objects.get_or_create(username=email, email=email)
-
-            refresh = CustomTokenObtainPairSerializer.get_token(user)
-            access_token = str(refresh.access_token)
-            response = Response({"access": access_token}, status=200)
-            # Cookie expires when refresh token does
-            refresh_lifetime = settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"]
-            expires_at = datetime.now(timezone.utc) + refresh_lifetime
-
-            response.set_cookie(
-                key="refresh_token",
-                value=str(refresh),
-                httponly=True,
-                secure=not settings.DEBUG,  # Set True in production
-                samesite="Lax",  # Or "Lax" depending on your app flow
-                expires=expires_at,
-                path="/",
-            )
+            refresh = login_tokens(email)
+            response = Response({"access": str(refresh.access_token)}, status=200)
+            set_refresh_cookie(response, refresh)
             return response
 
         except YiviException as e:
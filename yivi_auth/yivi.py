@@ -1,6 +1,35 @@
+"""
+Client of the Yivi server (irmago) API.
+
+All calls share one keep-alive connection pool per process, so polling a session
+doesn't pay a TCP and TLS handshake per request. The pool is created on first use, after
+uWSGI has forked the workers. Calls time out after YIVI_SERVER_CONNECT_TIMEOUT and
+YIVI_SERVER_READ_TIMEOUT seconds, and idempotent calls are retried with backoff on
+connection errors and 502/503/504 responses. Every call is timed, see ``timings``.
+
+AsyncYiviServer makes the same calls with httpx, for the async views served by ASGI.
+"""
+
+import asyncio
 import json
+import logging
+import re
+import threading
+import time
+import weakref
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 
+import httpx
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (502, 503, 504)
 
 
 class YiviException(Exception):
@@ -21,12 +50,137 @@ class YiviException(Exception):
         )
 
 
+class CallTimings:
+    """Number of calls and their total and slowest duration per endpoint, per process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def record(self, endpoint, seconds):
+        with self.lock:
+            timing = self.calls[endpoint]
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+
+    def snapshot(self):
+        """Returns {endpoint: {"count": n, "mean_ms": ms, "max_ms": ms}}"""
+        with self.lock:
+            return {
+                endpoint: {
+                    "count": timing["count"],
+                    "mean_ms": round(timing["total"] / timing["count"] * 1000, 3),
+                    "max_ms": round(timing["max"] * 1000, 3),
+                }
+                for endpoint, timing in self.calls.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.calls = defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0})
+
+
+timings = CallTimings()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def make_session():
+    retries = Retry(
+        total=settings.YIVI_SERVER_RETRIES,
+        backoff_factor=settings.YIVI_SERVER_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        # Starting a session is not idempotent, so a POST is only retried when the
+        # connection couldn't be made and the request never reached the server
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        # Return the last response, which is turned into a YiviException below
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.YIVI_SERVER_POOL_SIZE,
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """The connection pool of this process"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def endpoint_name(method, url):
+    # Session tokens give access to the session, so they are kept out of the logs
+    path = re.sub(r"/session/[^/]+", "/session/<token>", urlsplit(url).path)
+    return f"{method} {path}"
+
+
+def timeout_error(endpoint):
+    return YiviException(
+        504, -1, "%s:\n %s" % (endpoint, "Timed out"), reason="Gateway Timeout"
+    )
+
+
+def connection_error(endpoint):
+    return YiviException(
+        502, -1, "%s:\n %s" % (endpoint, "Connection failed"), reason="Bad Gateway"
+    )
+
+
+def parse_response(response):
+    """
+    Returns the JSON of a requests or httpx response, or None if it isn't JSON. Raises
+    a YiviException for error responses.
+    """
+    if response.status_code >= 400:
+        try:
+            json_response = response.json()
+            reason = json_response.get("error", None)
+            msg = json_response.get("description")
+        except ValueError:
+            reason = None
+            msg = response.text or None
+        raise YiviException(
+            response.status_code,
+            -1,
+            "%s:\n %s" % (response.url, msg),
+            reason=reason,
+            headers=response.headers,
+        )
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+@contextmanager
+def timed(endpoint):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings.record(endpoint, elapsed)
+        logger.debug("Yivi server %s took %.1f ms", endpoint, elapsed * 1000)
+
+
 class YiviServer:
     """Connection to a Yivi server."""
 
-    def __init__(self, prefix, token=None):
+    def __init__(self, prefix, token=None, session=None):
         self.prefix = prefix
         self.token = token
+        self.session = session
 
     def _auth_headers(self):
         if self.token is None:
@@ -34,44 +188,43 @@ class YiviServer:
         else:
             return {"Authorization": self.token}
 
-    def _internal_call(self, method, url, payload, params):
-        args = {"params": params}
-
+    def _prepare(self, url, payload, params):
+        """Returns the URL, headers and request body of a call"""
         if not url.startswith("http"):
             url = self.prefix + url
 
         headers = self._auth_headers()
+        data = None
 
-        if "content_type" in args["params"]:
-            headers["Content-Type"] = args["params"]["content_type"]
-            del args["params"]["content_type"]
+        if "content_type" in params:
+            headers["Content-Type"] = params["content_type"]
+            del params["content_type"]
             if payload:
-                args["data"] = payload
+                data = payload
         else:
             headers["Content-Type"] = "application/json"
             if payload:
-                args["data"] = json.dumps(payload)
+                data = json.dumps(payload)
+        return url, headers, data
 
+    def _internal_call(self, method, url, payload, params):
+        url, headers, data = self._prepare(url, payload, params)
+        session = self.session if self.session is not None else get_session()
+        timeout = (
+            settings.YIVI_SERVER_CONNECT_TIMEOUT,
+            settings.YIVI_SERVER_READ_TIMEOUT,
+        )
+        endpoint = endpoint_name(method, url)
         try:
-            response = requests.request(method, url, headers=headers, **args)
-            response.raise_for_status()
-            results = response.json()
-        except requests.exceptions.HTTPError as http_error:
-            response = http_error.response
-            try:
-                json_response = response.json()
-                reason = json_response.get("error", None)
-                msg = json_response.get("description")
-            except ValueError:
-                reason = None
-                msg = response.text or None
-            raise YiviException(
-                response.status_code,
-                -1,
-                "%s:\n %s" % (response.url, msg),
-                reason=reason,
-                headers=response.headers,
-            )
+            with timed(endpoint):
+                response = session.request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    timeout=timeout,
+                )
         except requests.exceptions.RetryError as retry_error:
             request = retry_error.request
             try:
@@ -81,10 +234,12 @@ class YiviServer:
             raise YiviException(
                 429, -1, "%s:\n %s" % (request.path_url, "Max Retries"), reason=reason
             )
-        except ValueError:
-            results = None
+        except requests.exceptions.Timeout:
+            raise timeout_error(endpoint)
+        except requests.exceptions.ConnectionError:
+            raise connection_error(endpoint)
 
-        return results
+        return parse_response(response)
 
     def _get(self, url, args=None, payload=None, **kwargs):
         if args:
@@ -120,3 +275,71 @@ class YiviServer:
 
     def session_result(self, token):
         return self._get(f"/session/{token}/result")
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def make_async_client():
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.YIVI_SERVER_READ_TIMEOUT,
+            connect=settings.YIVI_SERVER_CONNECT_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.YIVI_SERVER_ASYNC_POOL_SIZE,
+            max_keepalive_connections=settings.YIVI_SERVER_ASYNC_POOL_SIZE,
+        ),
+        # Only retries connections that couldn't be made
+        transport=httpx.AsyncHTTPTransport(retries=settings.YIVI_SERVER_RETRIES),
+    )
+
+
+def get_async_client():
+    """
+    The connection pool of the running event loop. Under an ASGI server that is one
+    client per process; a client can't be shared between event loops.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = make_async_client()
+    return client
+
+
+async def close_async_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncYiviServer(YiviServer):
+    """Connection to a Yivi server for async views, its calls return coroutines."""
+
+    async def _internal_call(self, method, url, payload, params):
+        url, headers, data = self._prepare(url, payload, params)
+        client = self.session if self.session is not None else get_async_client()
+        endpoint = endpoint_name(method, url)
+        for retry in range(settings.YIVI_SERVER_RETRIES + 1):
+            if retry:
+                # The same backoff as urllib3 for the synchronous client
+                await asyncio.sleep(
+                    settings.YIVI_SERVER_RETRY_BACKOFF * 2 ** (retry - 1)
+                    if retry > 1
+                    else 0
+                )
+            try:
+                with timed(endpoint):
+                    response = await client.request(
+                        method, url, params=params, content=data, headers=headers
+                    )
+            except httpx.TimeoutException:
+                raise timeout_error(endpoint)
+            except httpx.TransportError:
+                raise connection_error(endpoint)
+            if (
+                response.status_code not in RETRY_STATUSES
+                or method not in Retry.DEFAULT_ALLOWED_METHODS
+            ):
+                break
+        return parse_response(response)
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "yivi_portal.settings.production")
+# The ASGI server runs next to uWSGI for the Yivi session proxy endpoints, which only
+# wait for the Yivi server, so it serves the async versions of those views
+os.environ.setdefault("YIVI_ASYNC_VIEWS", "true")
 
 application = get_asgi_application()
@@ -1,6 +1,7 @@
 import os
 from datetime import timedelta
 from pathlib import Path
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -14,6 +15,16 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",  # Restrict access to authenticated users
     ],
+    # orjson based, byte-identical to DRF's JSONRenderer
+    "DEFAULT_RENDERER_CLASSES": [
+        "portal_backend.views.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "portal_backend.views.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SIMPLE_JWT = {
@@ -54,8 +65,19 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "portal_backend.middleware.RegistryConditionalGetMiddleware",
 ]
 
+# A database table cache is shared by all workers and containers without running
+# another service. Create the table with `python manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "portal_cache",
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
 ROOT_URLCONF = "yivi_portal.urls"
 
 TEMPLATES = [
@@ -114,6 +136,23 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 YIVI_SERVER_URL = os.environ.get("YIVI_SERVER_URL")
 YIVI_SERVER_TOKEN = os.environ.get("YIVI_SERVER_TOKEN")
+# Seconds to wait for a connection to and a response of the Yivi server
+YIVI_SERVER_CONNECT_TIMEOUT = float(os.environ.get("YIVI_SERVER_CONNECT_TIMEOUT", 3))
+YIVI_SERVER_READ_TIMEOUT = float(os.environ.get("YIVI_SERVER_READ_TIMEOUT", 10))
+# Retries of failed connections and of GETs answered with 502/503/504, with a backoff of
+# YIVI_SERVER_RETRY_BACKOFF * 2^(retry - 1) seconds in between
+YIVI_SERVER_RETRIES = int(os.environ.get("YIVI_SERVER_RETRIES", 2))
+YIVI_SERVER_RETRY_BACKOFF = float(os.environ.get("YIVI_SERVER_RETRY_BACKOFF", 0.2))
+# Kept-alive connections per process, uWSGI runs 2 threads per process
+YIVI_SERVER_POOL_SIZE = int(os.environ.get("YIVI_SERVER_POOL_SIZE", 4))
+# An ASGI process serves many logins at once, see yivi_auth.async_views
+YIVI_SERVER_ASYNC_POOL_SIZE = int(os.environ.get("YIVI_SERVER_ASYNC_POOL_SIZE", 100))
+# Route the Yivi session endpoints to the async views, yivi_portal.asgi turns this on
+YIVI_ASYNC_VIEWS = os.environ.get("YIVI_ASYNC_VIEWS", "false").lower() == "true"
+# Seconds between status requests for the session status events of the async views
+YIVI_SESSION_STATUS_POLL_INTERVAL = float(
+    os.environ.get("YIVI_SESSION_STATUS_POLL_INTERVAL", 1)
+)
 
 
 LOGGING = {
@@ -148,4 +187,29 @@ EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
 EMAIL_FROM = os.environ.get("EMAIL_FROM")
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
+# Seconds to wait for the mail relay
+EMAIL_TIMEOUT = int(os.environ.get("EMAIL_TIMEOUT", 10))
 YIVI_PORTAL_URL = os.environ.get("YIVI_PORTAL_URL")
+
+# Directory the public registry snapshot is written to, defaults to MEDIA_ROOT/registry
+REGISTRY_SNAPSHOT_ROOT = os.environ.get("REGISTRY_SNAPSHOT_ROOT")
+
+# Seconds an Idempotency-Key of a create request is remembered
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+# Seconds after which a key of a request that never finished may be used again,
+# longer than any request runs
+IDEMPOTENCY_KEY_LEASE = int(os.environ.get("IDEMPOTENCY_KEY_LEASE", 5 * 60))
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
+# Limits checked before an uploaded logo is accepted for processing
+LOGO_MAX_UPLOAD_SIZE = int(os.environ.get("LOGO_MAX_UPLOAD_SIZE", 5 * 1024 * 1024))
+LOGO_MAX_PIXELS = int(os.environ.get("LOGO_MAX_PIXELS", 4096 * 4096))
+
+# Who sends media files: "uwsgi" (static map, see entrypoint.sh), "django", or a
+# fronting web server through "x-accel-redirect" (nginx) or "x-sendfile" (Apache)
+MEDIA_SERVE_MODE = os.environ.get("MEDIA_SERVE_MODE", "uwsgi").lower()
+# Internal nginx location that maps to MEDIA_ROOT, for x-accel-redirect
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get(
+    "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"
+)
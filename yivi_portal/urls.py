@@ -1,13 +1,22 @@
+import re
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic import RedirectView
+from portal_backend.views.media import serve_media
 
 urlpatterns = [
     path("admin/logout/", RedirectView.as_view(url="/logout", query_string=True)),
     path("admin/", admin.site.urls),
     path("", include("portal_backend.urls")),
     path("", include("yivi_auth.urls")),
-    # Serve media files separately
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+# Serve media files separately, uWSGI does that itself in the default mode
+if settings.MEDIA_URL and (settings.DEBUG or settings.MEDIA_SERVE_MODE != "uwsgi"):
+    urlpatterns.append(
+        re_path(
+            r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+            serve_media,
+        )
+    )